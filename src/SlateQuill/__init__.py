@@ -9,24 +9,43 @@ This package provides:
 - Beautiful CLI interface with progress reporting
 """
 
+from importlib import import_module
+from typing import Any, List
+
 __version__ = "0.1.0"
 __author__ = "Niklas Skulll"
 __license__ = "MIT"
 
-# Public API exports - using try/except to handle missing dependencies during development
-try:
-    from .core import convert_file
-    from .config import Config, ConversionConfig
-    from .exceptions import SlateQuillError, ConversionError, SecurityError
-    
-    __all__ = [
-        "convert_file",
-        "Config", 
-        "ConversionConfig",
-        "SlateQuillError",
-        "ConversionError", 
-        "SecurityError",
-    ]
-except ImportError:
-    # During development, dependencies might not be installed yet
-    __all__ = []
+# Public API exports, imported on first access: importing the package (e.g.
+# for --version) must not load the converters, bs4 or pydantic
+_LAZY_EXPORTS = {
+    "convert_file": ".core",
+    "Config": ".config",
+    "ConversionConfig": ".config",
+    "SlateQuillError": ".exceptions",
+    "ConversionError": ".exceptions",
+    "SecurityError": ".exceptions",
+}
+
+__all__ = [
+    "convert_file",
+    "Config",
+    "ConversionConfig",
+    "SlateQuillError",
+    "ConversionError",
+    "SecurityError",
+]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    # Cache it, so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
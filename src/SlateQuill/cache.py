@@ -0,0 +1,208 @@
+"""
+SlateQuill conversion result cache.
+
+This module provides a persistent, content-addressed cache of conversion
+results. Entries are keyed by a hash of the input bytes plus a fingerprint of
+the configuration that affects the output, expire after a TTL and are evicted
+least-recently-used once the cache grows beyond its size cap.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+
+from .config import Config
+from .plan import fingerprint_settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    markdown TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS stats (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    total_size INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stats (id, total_size) VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE stats SET total_size = total_size + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE stats SET total_size = total_size - OLD.size WHERE id = 0;
+END;
+"""
+
+
+def default_cache_dir() -> Path:
+    """Return the per-user cache directory for SlateQuill."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "slatequill"
+
+
+def config_fingerprint(config: Config) -> str:
+    """
+    Fingerprint the configuration that affects conversion output.
+
+    Conversions use the fingerprint of their ConversionPlan, which is the same.
+    """
+    return fingerprint_settings(config.conversion, config.security, config.performance.single_parse)
+
+
+def content_key(content: bytes, fingerprint: str, converter_name: str = "") -> str:
+    """Build the cache key for content converted with a given configuration."""
+    digest = hashlib.sha256(content)
+    digest.update(b"\0")
+    digest.update(fingerprint.encode("ascii"))
+    digest.update(b"\0")
+    digest.update(converter_name.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """
+    On-disk conversion cache backed by SQLite.
+
+    SQLite in WAL mode makes the cache safe to share between the worker
+    processes of a batch run and between concurrent SlateQuill invocations.
+    Cache failures (locked or read-only databases, ...) never fail a
+    conversion; they are treated as cache misses.
+    """
+
+    def __init__(self, cache_dir: Path, ttl: int = 3600, max_size: int = 512 * 1024 * 1024) -> None:
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_size = max_size
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def path(self) -> Path:
+        """Path of the cache database."""
+        return self.cache_dir / "cache.sqlite3"
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections must not be shared across fork(), so reconnect per process
+        if self._connection is None or self._pid != os.getpid():
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached Markdown for key, or None if missing or expired."""
+        try:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT markdown, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            now = time.time()
+            markdown, created = row
+            if self.ttl > 0 and now - created > self.ttl:
+                connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+
+            connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            return str(markdown)
+        except (sqlite3.Error, OSError):
+            return None
+
+    def put(self, key: str, markdown: str) -> None:
+        """Store a conversion result and evict old entries beyond the size cap."""
+        size = len(markdown.encode("utf-8"))
+        if size > self.max_size:
+            return
+
+        try:
+            connection = self._connect()
+            now = time.time()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                connection.execute(
+                    "INSERT INTO entries (key, markdown, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, markdown, size, now, now)
+                )
+                self._evict(connection, now)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        except (sqlite3.Error, OSError):
+            pass
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, then least-recently-used ones over the cap."""
+        (total_size,) = connection.execute("SELECT total_size FROM stats WHERE id = 0").fetchone()
+        if total_size <= self.max_size:
+            return
+
+        if self.ttl > 0:
+            connection.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl,))
+
+        # Evict down to 90% of the cap so that eviction doesn't run on every put
+        target = int(self.max_size * 0.9)
+        (total_size,) = connection.execute("SELECT total_size FROM stats WHERE id = 0").fetchone()
+        if total_size > target:
+            # The least recently used entries whose sizes add up to the excess
+            connection.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM "
+                "(SELECT key, size, SUM(size) OVER (ORDER BY accessed, key) AS freed FROM entries) "
+                "WHERE freed - size < ?)",
+                (total_size - target,)
+            )
+
+    def clear(self) -> None:
+        """Remove all cache entries."""
+        try:
+            self._connect().execute("DELETE FROM entries")
+        except (sqlite3.Error, OSError):
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count and total size of the cache."""
+        try:
+            connection = self._connect()
+            (entries,) = connection.execute("SELECT COUNT(*) FROM entries").fetchone()
+            (total_size,) = connection.execute("SELECT total_size FROM stats WHERE id = 0").fetchone()
+        except (sqlite3.Error, OSError):
+            entries, total_size = 0, 0
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "total_size": total_size,
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+        }
+
+
+# One cache instance per (directory, ttl, size cap) and process
+_caches: Dict[tuple[str, int, int], ConversionCache] = {}
+
+
+def get_cache(config: Config) -> Optional[ConversionCache]:
+    """Return the conversion cache for a configuration, or None if disabled."""
+    performance = config.performance
+    if not performance.cache_results:
+        return None
+
+    cache_dir = Path(performance.cache_dir).expanduser() if performance.cache_dir else default_cache_dir()
+    cache_key = (str(cache_dir), performance.cache_ttl, performance.cache_max_size)
+    cache = _caches.get(cache_key)
+    if cache is None:
+        cache = ConversionCache(cache_dir, performance.cache_ttl, performance.cache_max_size)
+        _caches[cache_key] = cache
+    return cache
@@ -0,0 +1,104 @@
+"""
+SlateQuill input character encoding detection.
+
+Documents are decoded once, with the encoding given by a byte order mark or
+declared in a <meta charset> (or http-equiv Content-Type) tag within the
+first 1024 bytes, like browsers do. Undeclared documents are decoded as
+UTF-8, falling back to windows-1252 for legacy pages that are not valid
+UTF-8.
+"""
+
+import codecs
+import mmap
+import re
+from typing import NamedTuple, Optional, Union
+
+from .exceptions import SecurityError
+
+# Any object supporting the buffer protocol (bytes, mmap, memoryview)
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+# Number of bytes searched for a <meta> charset declaration
+PRESCAN_BYTES = 1024
+
+DEFAULT_ENCODING = "utf-8"
+FALLBACK_ENCODING = "cp1252"
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+)
+
+_META_CHARSET_RE = re.compile(
+    rb"""<meta\s[^>]*?charset\s*=\s*["']?\s*([A-Za-z0-9_.:+-]+)""",
+    re.IGNORECASE,
+)
+
+
+class DetectedEncoding(NamedTuple):
+    """Encoding of a document and where it came from."""
+
+    # Python codec name
+    encoding: str
+    # Length of the byte order mark to skip
+    bom_length: int
+    # Whether the document declares its encoding (BOM or <meta>)
+    declared: bool
+
+
+def detect_encoding(data: Buffer) -> DetectedEncoding:
+    """Detect the encoding of an HTML document from its first bytes."""
+    head = bytes(data[:PRESCAN_BYTES])
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return DetectedEncoding(encoding, len(bom), True)
+
+    match = _META_CHARSET_RE.search(head)
+    if match is not None:
+        encoding = _codec_name(match.group(1).decode("ascii"))
+        if encoding is not None:
+            return DetectedEncoding(encoding, 0, True)
+    return DetectedEncoding(DEFAULT_ENCODING, 0, False)
+
+
+def decode_html(data: Buffer) -> str:
+    """
+    Decode an HTML document read as bytes.
+
+    The buffer is decoded directly, without copying it first, so data can be
+    a memory-mapped file.
+
+    Raises:
+        SecurityError: If the document is not valid in its declared encoding
+    """
+    encoding, bom_length, declared = detect_encoding(data)
+    view = memoryview(data)[bom_length:] if bom_length else data
+    try:
+        return str(view, encoding)
+    except UnicodeDecodeError:
+        if declared and encoding != FALLBACK_ENCODING:
+            raise SecurityError(f"Content contains invalid {encoding} encoding")
+    finally:
+        if bom_length:
+            view.release()
+    try:
+        return str(data, FALLBACK_ENCODING)
+    except UnicodeDecodeError:
+        # The few bytes windows-1252 leaves undefined map to C1 controls
+        return str(data, "latin-1")
+
+
+def _codec_name(label: str) -> Optional[str]:
+    """Python codec for a declared charset label, as browsers interpret it."""
+    try:
+        name = codecs.lookup(label).name
+    except LookupError:
+        return None
+    # A <meta> tag can only be read if the document is ASCII compatible
+    if name.startswith(("utf-16", "utf-32")):
+        return DEFAULT_ENCODING
+    # Browsers decode these labels as windows-1252
+    if name in ("ascii", "iso8859-1", "latin-1"):
+        return FALLBACK_ENCODING
+    return name
@@ -6,19 +6,25 @@ offering a beautiful and user-friendly experience for converting files.
 """
 
 import asyncio
+import json
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional
 
 import typer
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, SpinnerColumn, TaskID, TextColumn
 from rich.table import Table
 
 from . import __version__
-from .config import Config, load_config
-from .core import convert_file, convert_directory, batch_convert, list_supported_formats
 from .exceptions import SlateQuillError
 
+# The conversion modules (and with them bs4, markdownify and pydantic) are
+# imported by the commands that use them, so --help and --version stay fast
+if TYPE_CHECKING:
+    from .config import Config
+    from .engine import BatchReport, ConversionResult
+    from .profiling import StageProfile
+
 app = typer.Typer(
     name="SlateQuill",
     help="A robust Python CLI tool for converting HTML documents to clean, standards-compliant Markdown",
@@ -84,6 +90,26 @@ def convert(
         "-l",
         help="Maximum line length for output"
     ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Print per-stage timings (converts in-process)"
+    ),
+    profile_json: Optional[Path] = typer.Option(
+        None,
+        "--profile-json",
+        help="Write per-stage timings to this JSON file (implies --profile)"
+    ),
+    profile_dump: Optional[Path] = typer.Option(
+        None,
+        "--profile-dump",
+        help="Write cProfile output for the slowest files to this directory (implies --profile)"
+    ),
+    profile_top: int = typer.Option(
+        5,
+        "--profile-top",
+        help="Number of slowest files to list and profile"
+    ),
     verbose: bool = typer.Option(
         False,
         "--verbose",
@@ -93,8 +119,12 @@ def convert(
 ) -> None:
     """Convert a single HTML file to Markdown."""
     
+    from .config import load_config
+    from .core import convert_file
+    
     # Load configuration
     config = load_config(config_file)
+    stage_profile = _start_profile(config, profile or profile_json is not None or profile_dump is not None)
     
     # Override config with command line options
     if markdown_flavor:
@@ -118,14 +148,17 @@ def convert(
         ) as progress:
             task = progress.add_task("Converting file...", total=None)
             
-            result = asyncio.run(convert_file(input_file, output_file, config))
+            # Large files are streamed straight to the output file
+            asyncio.run(convert_file(input_file, output_file, config, return_content=False))
             
             progress.update(task, description="✅ Conversion completed!")
         
         console.print(f"✅ Successfully converted [bold]{input_file}[/bold] to [bold]{output_file}[/bold]")
         
         if verbose:
-            console.print(f"📊 Output length: {len(result)} characters")
+            console.print(f"📊 Output size: {output_file.stat().st_size} bytes")
+        
+        _report_profile(stage_profile, config, profile_top, profile_json, profile_dump)
             
     except SlateQuillError as e:
         console.print(f"❌ Error: {e.message}", style="bold red")
@@ -152,11 +185,31 @@ def batch_convert_cmd(
         "-c",
         help="Configuration file path"
     ),
-    max_concurrent: int = typer.Option(
-        5,
+    max_concurrent: Optional[int] = typer.Option(
+        None,
         "--max-concurrent",
         "-j",
-        help="Maximum number of concurrent conversions"
+        help="Number of worker processes (default: performance.max_workers, 0 = one per CPU)"
+    ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Print per-stage timings (converts in-process)"
+    ),
+    profile_json: Optional[Path] = typer.Option(
+        None,
+        "--profile-json",
+        help="Write per-stage timings to this JSON file (implies --profile)"
+    ),
+    profile_dump: Optional[Path] = typer.Option(
+        None,
+        "--profile-dump",
+        help="Write cProfile output for the slowest files to this directory (implies --profile)"
+    ),
+    profile_top: int = typer.Option(
+        5,
+        "--profile-top",
+        help="Number of slowest files to list and profile"
     ),
     verbose: bool = typer.Option(
         False,
@@ -167,24 +220,31 @@ def batch_convert_cmd(
 ) -> None:
     """Convert multiple files to Markdown."""
     
+    from .config import load_config
+    from .core import iter_batch_convert
+    from .engine import BatchReport
+    
     # Load configuration
     config = load_config(config_file)
+    stage_profile = _start_profile(config, profile or profile_json is not None or profile_dump is not None)
     
     # Convert files
     try:
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console
-        ) as progress:
+        with _batch_progress() as progress:
             task = progress.add_task(f"Converting {len(input_files)} files...", total=len(input_files))
             
-            results = asyncio.run(batch_convert(input_files, output_dir, config, max_concurrent))
+            report = BatchReport()
+            if stage_profile is not None:
+                max_concurrent = 1
+            asyncio.run(_collect_results(
+                iter_batch_convert(input_files, output_dir, config, max_concurrent), report, progress, task
+            ))
+            results = report.converted
             
-            progress.update(task, completed=len(results), description="✅ Batch conversion completed!")
+            progress.update(task, description="✅ Batch conversion completed!")
         
         # Display results
-        if results:
+        if report.total:
             table = Table(title="Conversion Results")
             table.add_column("Input File", style="cyan")
             table.add_column("Output File", style="green")
@@ -192,11 +252,17 @@ def batch_convert_cmd(
             
             for input_path, output_path in results:
                 table.add_row(str(input_path), str(output_path), "✅ Success")
+            for input_path, error in report.failed:
+                table.add_row(str(input_path), "", f"❌ {error.message}")
             
             console.print(table)
             console.print(f"✅ Successfully converted {len(results)} out of {len(input_files)} files")
+            _print_deduplicated(report)
+            _print_scheduling(report)
         else:
             console.print("⚠️  No files were converted", style="yellow")
+        
+        _report_profile(stage_profile, config, profile_top, profile_json, profile_dump)
             
     except SlateQuillError as e:
         console.print(f"❌ Error: {e.message}", style="bold red")
@@ -229,6 +295,58 @@ def convert_dir(
         "-r",
         help="Process subdirectories recursively"
     ),
+    max_workers: Optional[int] = typer.Option(
+        None,
+        "--workers",
+        "-j",
+        help="Number of worker processes (default: performance.max_workers, 0 = one per CPU)"
+    ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        "-i",
+        help="Skip files unchanged since the last run (uses a manifest in the output directory)"
+    ),
+    prune: bool = typer.Option(
+        False,
+        "--prune",
+        help="With --incremental, delete outputs whose input file was removed"
+    ),
+    include: Optional[List[str]] = typer.Option(
+        None,
+        "--include",
+        help="Only convert files matching this glob (repeatable; globs with / match the relative path)"
+    ),
+    exclude: Optional[List[str]] = typer.Option(
+        None,
+        "--exclude",
+        help="Skip files and directories matching this glob (repeatable)"
+    ),
+    shard_spec: Optional[str] = typer.Option(
+        None,
+        "--shard",
+        help="Only convert shard i/n of the files (e.g. 2/8), partitioned by path; combine the shards with merge"
+    ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Print per-stage timings (converts in-process)"
+    ),
+    profile_json: Optional[Path] = typer.Option(
+        None,
+        "--profile-json",
+        help="Write per-stage timings to this JSON file (implies --profile)"
+    ),
+    profile_dump: Optional[Path] = typer.Option(
+        None,
+        "--profile-dump",
+        help="Write cProfile output for the slowest files to this directory (implies --profile)"
+    ),
+    profile_top: int = typer.Option(
+        5,
+        "--profile-top",
+        help="Number of slowest files to list and profile"
+    ),
     verbose: bool = typer.Option(
         False,
         "--verbose",
@@ -238,24 +356,39 @@ def convert_dir(
 ) -> None:
     """Convert all supported files in a directory to Markdown."""
     
+    from .config import load_config
+    from .core import iter_convert_directory
+    from .engine import BatchReport
+    from .shard import Shard
+    
     # Load configuration
     config = load_config(config_file)
+    stage_profile = _start_profile(config, profile or profile_json is not None or profile_dump is not None)
     
     # Convert directory
     try:
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console
-        ) as progress:
-            task = progress.add_task("Scanning directory...", total=None)
+        shard = Shard.parse(shard_spec) if shard_spec is not None else None
+        
+        with _batch_progress() as progress:
+            # The number of files is unknown while the directory is being scanned
+            task = progress.add_task("Converting directory...", total=None)
             
-            results = asyncio.run(convert_directory(input_dir, output_dir, config, recursive))
+            report = BatchReport()
+            if stage_profile is not None:
+                max_workers = 1
+            asyncio.run(_collect_results(
+                iter_convert_directory(
+                    input_dir, output_dir, config, recursive, max_workers, incremental, prune,
+                    include or (), exclude or (), shard
+                ),
+                report, progress, task
+            ))
+            results = report.converted
             
-            progress.update(task, description="✅ Directory conversion completed!")
+            progress.update(task, total=report.total + len(report.skipped), description="✅ Directory conversion completed!")
         
         # Display results
-        if results:
+        if report.total:
             table = Table(title="Directory Conversion Results")
             table.add_column("Input File", style="cyan")
             table.add_column("Output File", style="green")
@@ -265,8 +398,21 @@ def convert_dir(
             
             console.print(table)
             console.print(f"✅ Successfully converted {len(results)} files")
+            _print_deduplicated(report)
+            _print_scheduling(report)
+            _print_failures(report)
+        elif report.skipped:
+            console.print("✅ All files are up to date")
         else:
             console.print("⚠️  No supported files found in directory", style="yellow")
+        
+        _print_incremental_summary(report)
+        if shard is not None:
+            console.print(
+                f"🧩 Shard {shard} report written to [bold]{output_dir / shard.report_name}[/bold] "
+                "(combine the shards with merge)"
+            )
+        _report_profile(stage_profile, config, profile_top, profile_json, profile_dump)
             
     except SlateQuillError as e:
         console.print(f"❌ Error: {e.message}", style="bold red")
@@ -278,11 +424,217 @@ def convert_dir(
         raise typer.Exit(1)
 
 
+def _batch_progress() -> Progress:
+    """Progress display for batch commands: spinner, description, bar and file count."""
+    return Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        console=console
+    )
+
+
+async def _collect_results(
+    results: "AsyncIterator[ConversionResult]",
+    report: "BatchReport",
+    progress: Progress,
+    task: TaskID
+) -> None:
+    """Add batch results to report as they complete, advancing the progress display."""
+    async for result in results:
+        report.add(result)
+        # Orphaned and pruned outputs are not files of this run
+        if result.status in ("converted", "failed", "skipped"):
+            progress.advance(task)
+
+
+def _start_profile(config: "Config", enabled: bool) -> Optional["StageProfile"]:
+    """Start collecting per-stage timings if profiling was requested."""
+    if not enabled:
+        return None
+    
+    from .profiling import StageProfile, add_collector
+    
+    # Spans are collected in this process, so conversions must run here too
+    # (not on workers, which resource budgets would require)
+    config.performance.max_workers = 1
+    config.performance.max_cpu_time = config.performance.max_wall_time = 0
+    config.performance.max_memory = 0
+    stage_profile = StageProfile()
+    add_collector(stage_profile)
+    return stage_profile
+
+
+def _report_profile(
+    stage_profile: Optional["StageProfile"],
+    config: "Config",
+    top: int,
+    json_file: Optional[Path],
+    dump_dir: Optional[Path]
+) -> None:
+    """Print the collected timings and write the requested profile outputs."""
+    if stage_profile is None:
+        return
+    
+    from .profiling import profile_files, remove_collector
+    
+    remove_collector(stage_profile)
+    
+    table = Table(title="Stage Timings (ms)")
+    table.add_column("Stage", style="cyan")
+    for column in ("Count", "Total", "Mean", "p50", "p90", "p99", "Max"):
+        table.add_column(column, style="magenta", justify="right")
+    for stage, stats in stage_profile.summary().items():
+        table.add_row(
+            stage,
+            str(stats["count"]),
+            *(f"{stats[key] * 1000:.2f}" for key in ("total", "mean", "p50", "p90", "p99", "max"))
+        )
+    console.print(table)
+    
+    slowest = stage_profile.slowest(top)
+    if len(stage_profile.files) > 1 and slowest:
+        files_table = Table(title=f"Slowest Files (top {len(slowest)})")
+        files_table.add_column("Input File", style="cyan")
+        files_table.add_column("Total (ms)", style="magenta", justify="right")
+        for input_path, seconds in slowest:
+            files_table.add_row(str(input_path), f"{seconds * 1000:.2f}")
+        console.print(files_table)
+    
+    if json_file is not None:
+        json_file.write_text(json.dumps(stage_profile.to_dict(top), indent=2), encoding="utf-8")
+        console.print(f"📝 Wrote stage timings to [bold]{json_file}[/bold]")
+    
+    if dump_dir is not None and slowest:
+        written = asyncio.run(profile_files([input_path for input_path, _ in slowest], config, dump_dir))
+        console.print(f"📝 Wrote {len(written)} cProfile dump(s) to [bold]{dump_dir}[/bold] (view with python -m pstats)")
+
+
+def _print_failures(report: "BatchReport") -> None:
+    """Print the files that failed during a batch run."""
+    if not report.failed:
+        return
+    
+    table = Table(title="Failed Conversions")
+    table.add_column("Input File", style="cyan")
+    table.add_column("Error", style="red")
+    
+    for input_path, error in report.failed:
+        table.add_row(str(input_path), error.message)
+    
+    console.print(table)
+    console.print(f"❌ {len(report.failed)} files failed to convert", style="bold red")
+
+
+def _print_deduplicated(report: "BatchReport") -> None:
+    """Print how many conversions were saved by reusing the outputs of identical inputs."""
+    if report.deduplicated:
+        console.print(f"♻️  Saved {len(report.deduplicated)} conversions by reusing the outputs of identical inputs")
+
+
+def _print_scheduling(report: "BatchReport") -> None:
+    """Print the time spent ordering the files of a batch for the worker processes."""
+    if report.scheduling_overhead:
+        console.print(f"🗂️  Scheduled files largest first in {report.scheduling_overhead * 1000:.1f} ms")
+
+
+def _print_incremental_summary(report: "BatchReport") -> None:
+    """Print skipped, orphaned and pruned files of an incremental run."""
+    if report.skipped:
+        console.print(f"⏭️  Skipped {len(report.skipped)} unchanged files")
+    if report.orphaned:
+        console.print(
+            f"⚠️  {len(report.orphaned)} outputs have no input file anymore (use --prune to delete them):",
+            style="yellow"
+        )
+        for output_path in report.orphaned:
+            console.print(f"   {output_path}")
+    if report.pruned:
+        console.print(f"🧹 Pruned {len(report.pruned)} outputs whose input file was removed")
+
+
+@app.command()
+def merge(
+    paths: List[Path] = typer.Argument(..., help="Shard reports, or output directories containing them"),
+    json_output: Optional[Path] = typer.Option(
+        None,
+        "--json",
+        help="Write the merged summary to this JSON file"
+    )
+) -> None:
+    """Combine the reports of a sharded convert-dir run and check that every file was converted once."""
+    
+    from .shard import find_shard_reports, merge_shard_reports
+    
+    try:
+        merged = merge_shard_reports(find_shard_reports(paths))
+    except SlateQuillError as e:
+        console.print(f"❌ Error: {e.message}", style="bold red")
+        raise typer.Exit(1)
+    
+    table = Table(title=f"Sharded Run ({len(merged.reports)} of {merged.shard_count} shards)")
+    table.add_column("Shard", style="cyan")
+    table.add_column("Converted", justify="right", style="green")
+    table.add_column("Skipped", justify="right")
+    table.add_column("Failed", justify="right", style="red")
+    table.add_column("Deduplicated", justify="right")
+    table.add_column("Time", justify="right")
+    for report in sorted(merged.reports, key=lambda report: report.shard.index):
+        table.add_row(
+            f"{report.shard}" + ("" if report.complete else " (interrupted)"),
+            str(report.count("converted")),
+            str(report.count("skipped")),
+            str(report.count("failed")),
+            str(report.deduplicated),
+            f"{report.elapsed:.1f}s"
+        )
+    console.print(table)
+    
+    counts = merged.counts
+    console.print(
+        f"✅ Converted {counts.get('converted', 0)} files, skipped {counts.get('skipped', 0)}, "
+        f"failed {counts.get('failed', 0)}"
+    )
+    if merged.failed:
+        failures = Table(title="Failed Conversions")
+        failures.add_column("Input File", style="cyan")
+        failures.add_column("Error", style="red")
+        for rel_key, error in merged.failed:
+            failures.add_row(rel_key, error)
+        console.print(failures)
+    
+    for problem in merged.problems:
+        console.print(f"❌ {problem}", style="bold red")
+    if merged.missing_shards:
+        console.print(f"❌ Missing shards: {', '.join(map(str, merged.missing_shards))}", style="bold red")
+    if merged.duplicate_shards:
+        console.print(f"❌ Shards reported more than once: {', '.join(map(str, merged.duplicate_shards))}", style="bold red")
+    if merged.gaps:
+        console.print(f"❌ {merged.gaps} input files were not processed by any shard", style="bold red")
+    if merged.overlaps:
+        console.print(f"❌ {len(merged.overlaps)} input files were processed by more than one shard:", style="bold red")
+        for rel_key in merged.overlaps[:20]:
+            console.print(f"   {rel_key}")
+        if len(merged.overlaps) > 20:
+            console.print(f"   ... and {len(merged.overlaps) - 20} more")
+    
+    if json_output is not None:
+        json_output.write_text(json.dumps(merged.to_dict(), indent=2), encoding="utf-8")
+        console.print(f"📝 Wrote the merged summary to [bold]{json_output}[/bold]")
+    
+    if not merged.complete:
+        raise typer.Exit(1)
+
+
 @app.command()
 def formats() -> None:
     """List all supported file formats."""
     
+    from .plugins.registry import discover_plugins, list_supported_formats, plugin_errors
+    
     supported = list_supported_formats()
+    plugins = discover_plugins()
     
     if supported:
         table = Table(title="Supported File Formats")
@@ -296,12 +648,192 @@ def formats() -> None:
         }
         
         for fmt in supported:
-            description = format_descriptions.get(fmt, "Supported format")
+            if fmt in plugins:
+                description = f"{plugins[fmt].name} plugin ({plugins[fmt].distribution})"
+            else:
+                description = format_descriptions.get(fmt, "Supported format")
             table.add_row(fmt, description)
         
         console.print(table)
     else:
         console.print("⚠️  No supported formats found", style="yellow")
+    
+    for name, error in plugin_errors().items():
+        console.print(f"⚠️  Plugin {name} is not available: {error}", style="yellow")
+
+
+@app.command()
+def parsers(
+    benchmark: bool = typer.Option(
+        False,
+        "--benchmark",
+        "-b",
+        help="Measure the throughput of each installed parser"
+    )
+) -> None:
+    """List the HTML parser backends, the default and the one auto mode uses."""
+    
+    from .parsers import DEFAULT_PARSER, INCREMENTAL_PARSERS, PARSERS, available_parsers, benchmark_parsers, resolve_parser
+    
+    auto = resolve_parser("auto")
+    throughput = benchmark_parsers() if benchmark else {}
+    
+    table = Table(title="HTML Parsers")
+    table.add_column("Parser", style="cyan")
+    table.add_column("Installed", style="green")
+    table.add_column("Streaming", style="green")
+    if benchmark:
+        table.add_column("Throughput", style="magenta")
+    
+    installed = available_parsers()
+    for name in PARSERS:
+        notes = [note for note, applies in (("default", name == DEFAULT_PARSER), ("auto", name == auto)) if applies]
+        label = f"{name} ({', '.join(notes)})" if notes else name
+        row = [
+            label,
+            "✅" if name in installed else "❌",
+            "✅" if name in INCREMENTAL_PARSERS else "❌",
+        ]
+        if benchmark:
+            row.append(f"{throughput[name]:.2f} MB/s" if name in throughput else "-")
+        table.add_row(*row)
+    
+    console.print(table)
+
+
+@app.command()
+def scan(
+    input_file: Path = typer.Argument(..., help="Input HTML file to scan"),
+    config_file: Optional[Path] = typer.Option(
+        None,
+        "--config",
+        "-c",
+        help="Configuration file path"
+    )
+) -> None:
+    """List the markup that sanitization would remove or rewrite."""
+    
+    from .charset import decode_html
+    from .config import load_config
+    from .security import DANGEROUS_FINDINGS, scan_html
+    
+    config = load_config(config_file)
+    try:
+        content = decode_html(input_file.read_bytes())
+    except (OSError, SlateQuillError) as e:
+        console.print(f"❌ Error: Failed to read input file: {e}", style="red")
+        raise typer.Exit(1)
+    
+    report = scan_html(content, config.security)
+    if report.clean:
+        console.print("✅ No findings: the document skips sanitization", style="green")
+        return
+    
+    table = Table(title=f"Scan Findings ({len(report.findings)})")
+    table.add_column("Line", style="cyan", justify="right")
+    table.add_column("Kind", style="magenta")
+    table.add_column("Construct", style="green")
+    for finding in report.findings:
+        style = "bold red" if finding.kind in DANGEROUS_FINDINGS else None
+        table.add_row(str(finding.line), finding.kind, finding.construct, style=style)
+    console.print(table)
+    
+    if report.dangerous:
+        console.print(f"⚠️  {len(report.dangerous)} finding(s) indicate active content", style="yellow")
+
+
+@app.command()
+def serve(
+    config_file: Optional[Path] = typer.Option(
+        None,
+        "--config",
+        "-c",
+        help="Configuration file path (reloaded when it changes)"
+    ),
+    socket_path: Optional[Path] = typer.Option(
+        None,
+        "--socket",
+        "-s",
+        help="Unix domain socket to listen on (default without --port: slatequill.sock in the per-user runtime directory)"
+    ),
+    port: Optional[int] = typer.Option(
+        None,
+        "--port",
+        "-p",
+        help="Serve HTTP on this localhost port"
+    ),
+    workers: Optional[int] = typer.Option(
+        None,
+        "--workers",
+        "-j",
+        help="Number of worker processes (default: performance.max_workers, 0 = one per CPU)"
+    ),
+    max_queue: int = typer.Option(
+        1024,
+        "--max-queue",
+        help="Maximum number of documents accepted at once; further requests are rejected as busy"
+    ),
+    roots: Optional[List[Path]] = typer.Option(
+        None,
+        "--root",
+        "-r",
+        help="Directory requests may read and write files in (repeatable; default: the working directory)"
+    )
+) -> None:
+    """Run a conversion server with a pool of warm workers."""
+    
+    from .server import serve as run_server
+    
+    try:
+        asyncio.run(run_server(config_file, socket_path, port, workers=workers, max_queue=max_queue, roots=roots))
+    except SlateQuillError as e:
+        console.print(f"❌ Error: {e.message}", style="bold red")
+        raise typer.Exit(1)
+    except OSError as e:
+        console.print(f"❌ Failed to start server: {e}", style="bold red")
+        raise typer.Exit(1)
+
+
+@app.command()
+def cache(
+    config_file: Optional[Path] = typer.Option(
+        None,
+        "--config",
+        "-c",
+        help="Configuration file path"
+    ),
+    clear: bool = typer.Option(
+        False,
+        "--clear",
+        help="Remove all cached conversion results"
+    )
+) -> None:
+    """Show or clear the conversion result cache."""
+    
+    from .cache import get_cache
+    from .config import load_config
+    
+    config = load_config(config_file)
+    conversion_cache = get_cache(config)
+    
+    if conversion_cache is None:
+        console.print("⚠️  Result caching is disabled (performance.cache_results = false)", style="yellow")
+        return
+    
+    if clear:
+        conversion_cache.clear()
+        console.print(f"🧹 Cleared cache at [bold]{conversion_cache.path}[/bold]")
+        return
+    
+    stats = conversion_cache.stats()
+    table = Table(title="Conversion Cache")
+    table.add_column("Setting", style="cyan")
+    table.add_column("Value", style="green")
+    table.add_row("Location", stats["path"])
+    table.add_row("Entries", str(stats["entries"]))
+    table.add_row("Size", f"{stats['total_size']} / {stats['max_size']} bytes")
+    table.add_row("TTL", f"{stats['ttl']} seconds")
+    console.print(table)
 
 
 @app.command()
@@ -323,8 +855,11 @@ allow_external_links = true
 
 [performance]
 use_streaming = true
+streaming_threshold = 8388608  # 8MB
 max_workers = 4
 cache_results = true
+cache_ttl = 3600
+cache_max_size = 536870912  # 512MB
 """
     
     console.print("[bold]Example .slateQuill.toml configuration:[/bold]")
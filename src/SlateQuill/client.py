@@ -0,0 +1,312 @@
+"""
+SlateQuill conversion server client.
+
+An asyncio client for the conversion daemon (see SlateQuill.server), over
+its Unix domain socket or its localhost HTTP port:
+
+    async with SlateQuillClient() as client:
+        markdown = await client.convert("<h1>Hello</h1>")
+        results = await client.convert_batch([{"input": "a.html", "output": "a.md"}])
+
+A client holds one connection and sends one request at a time on it; use a
+client per concurrent task, or batch requests.
+
+The socket lives in a per-user runtime directory that only its owner can
+enter. HTTP requests carry the server's token, which the server writes to
+that directory when it starts; clients of the same user read it from there.
+"""
+
+import asyncio
+import json
+import os
+from pathlib import Path
+import stat
+import tempfile
+from typing import Any, Dict, List, Optional, Type
+
+from . import exceptions
+from .exceptions import SecurityError, SlateQuillError
+
+# Where the server listens by default. Defined here, not in the server
+# module, so that clients don't import the conversion pipeline.
+DEFAULT_HOST = "127.0.0.1"
+SOCKET_NAME = "slatequill.sock"
+
+
+def runtime_dir(create: bool = False) -> Path:
+    """
+    Return the per-user directory holding the server's socket and tokens.
+
+    This is $XDG_RUNTIME_DIR/slatequill, or a slatequill-<uid> directory in
+    the temp dir where there is no runtime directory.
+
+    Raises:
+        SecurityError: If the directory belongs to another user or others
+            can access it
+    """
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    uid = os.getuid() if hasattr(os, "getuid") else None
+    if base:
+        path = Path(base) / "slatequill"
+    else:
+        path = Path(tempfile.gettempdir()) / (f"slatequill-{uid}" if uid is not None else "slatequill")
+
+    if create:
+        path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    try:
+        info = path.lstat()
+    except FileNotFoundError:
+        return path
+    if uid is not None and (
+        not stat.S_ISDIR(info.st_mode) or info.st_uid != uid or stat.S_IMODE(info.st_mode) & 0o077
+    ):
+        raise SecurityError(
+            f"Runtime directory {path} must be a directory owned by the current user with mode 0700"
+        )
+    return path
+
+
+def default_socket_path() -> Path:
+    """Socket the server listens on by default."""
+    return runtime_dir() / SOCKET_NAME
+
+
+def token_path(port: int) -> Path:
+    """File holding the token of the server on an HTTP port."""
+    return runtime_dir() / f"http-{port}.token"
+
+
+def read_token(port: int) -> str:
+    """
+    Read the token of the server on an HTTP port.
+
+    Raises:
+        SecurityError: If there is no token for the port
+    """
+    try:
+        return token_path(port).read_text(encoding="ascii").strip()
+    except OSError as e:
+        raise SecurityError(f"No token for the server on port {port}: {e}")
+
+
+def raise_for_result(result: Dict[str, Any]) -> None:
+    """
+    Raise the error of a failed result as its SlateQuillError subclass.
+
+    Raises:
+        SlateQuillError: If the result is not ok
+    """
+    if result.get("ok"):
+        return
+    error = result.get("error") or {}
+    error_type: Type[SlateQuillError] = getattr(exceptions, error.get("type", ""), SlateQuillError)
+    if not (isinstance(error_type, type) and issubclass(error_type, SlateQuillError)):
+        error_type = SlateQuillError
+    raise error_type(error.get("message", "Conversion failed"), error.get("details"))
+
+
+class SlateQuillClient:
+    """Client for a SlateQuill conversion server."""
+
+    def __init__(
+        self,
+        socket_path: Optional[Path] = None,
+        port: Optional[int] = None,
+        host: str = DEFAULT_HOST,
+        timeout: Optional[float] = None,
+        token: Optional[str] = None
+    ) -> None:
+        """
+        Args:
+            socket_path: Unix domain socket of the server (default:
+                default_socket_path() unless port is given)
+            port: HTTP port of the server, used instead of a socket
+            host: HTTP host of the server
+            timeout: Seconds to wait for each response (default: no limit)
+            token: Token of the HTTP server (default: read from the runtime
+                directory on connecting)
+        """
+        if socket_path is None and port is None:
+            socket_path = default_socket_path()
+        self.socket_path = socket_path
+        self.port = port
+        self.host = host
+        self.timeout = timeout
+        self.token = token
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "SlateQuillClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    async def connect(self) -> None:
+        """Open the connection (done automatically by the first request)."""
+        if self._writer is not None:
+            return
+        if self.port is not None:
+            if self.token is None:
+                self.token = read_token(self.port)
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port, limit=2**31 - 1)
+        else:
+            self._reader, self._writer = await asyncio.open_unix_connection(str(self.socket_path), limit=2**31 - 1)
+
+    async def close(self) -> None:
+        """Close the connection."""
+        if self._writer is not None:
+            writer, self._writer, self._reader = self._writer, None, None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a raw request and return the server's result object."""
+        async with self._lock:
+            await self.connect()
+            try:
+                if self.port is not None:
+                    exchange = self._http_exchange(payload)
+                else:
+                    exchange = self._socket_exchange(payload)
+                return await asyncio.wait_for(exchange, self.timeout)
+            except BaseException:
+                # The connection may hold a partial response now
+                await self.close()
+                raise
+
+    async def convert(
+        self,
+        html: Optional[str] = None,
+        input_path: Optional[Path] = None,
+        output_path: Optional[Path] = None,
+        config: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Convert inline HTML or a file on the server.
+
+        Args:
+            html: HTML document to convert
+            input_path: File to convert instead of html (a path on the server)
+            output_path: Where the server writes the Markdown of input_path
+            config: Configuration overrides for this request
+
+        Returns:
+            Markdown content (empty if output_path is given)
+
+        Raises:
+            SlateQuillError: The error the conversion failed with
+        """
+        result = await self.request(_conversion_request(html, input_path, output_path, config))
+        raise_for_result(result)
+        return result.get("markdown", "")
+
+    async def convert_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Convert several documents in one request.
+
+        Args:
+            requests: Request objects in the NDJSON worker format
+
+        Returns:
+            One result object per request, in order; failed conversions are
+            reported in their result rather than raised
+
+        Raises:
+            ServerBusyError: If the server has no room for the batch
+        """
+        result = await self.request({"batch": requests})
+        if "results" not in result:
+            raise_for_result(result)
+        return result["results"]
+
+    async def health(self) -> Dict[str, Any]:
+        """Return the server health."""
+        return await self._operation("health")
+
+    async def stats(self) -> Dict[str, Any]:
+        """Return the server counters."""
+        return await self._operation("stats")
+
+    async def reload(self) -> bool:
+        """Make the server load its configuration file again."""
+        return bool((await self._operation("reload"))["reloaded"])
+
+    async def _operation(self, op: str) -> Dict[str, Any]:
+        if self.port is not None:
+            result = await self._http_operation(op)
+        else:
+            result = await self.request({"op": op})
+        raise_for_result(result)
+        return result
+
+    async def _http_operation(self, op: str) -> Dict[str, Any]:
+        method = "POST" if op == "reload" else "GET"
+        async with self._lock:
+            await self.connect()
+            try:
+                return await asyncio.wait_for(self._http_send(method, f"/{op}", b""), self.timeout)
+            except BaseException:
+                await self.close()
+                raise
+
+    async def _socket_exchange(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        assert self._reader is not None and self._writer is not None
+        self._writer.write(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        await self._writer.drain()
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by the server")
+        return json.loads(line)
+
+    async def _http_exchange(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._http_send("POST", "/convert", json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+    async def _http_send(self, method: str, path: str, body: bytes) -> Dict[str, Any]:
+        assert self._reader is not None and self._writer is not None
+        head = (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            f"Authorization: Bearer {self.token}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n"
+        )
+        self._writer.write(head.encode("latin-1") + body)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by the server")
+        headers: Dict[str, str] = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = await self._reader.readexactly(int(headers.get("content-length", "0")))
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return json.loads(body)
+
+
+def _conversion_request(
+    html: Optional[str],
+    input_path: Optional[Path],
+    output_path: Optional[Path],
+    config: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    if (html is None) == (input_path is None):
+        raise ValueError("Pass either html or input_path")
+    request: Dict[str, Any] = {"html": html} if html is not None else {"input": str(input_path)}
+    if output_path is not None:
+        request["output"] = str(output_path)
+    if config:
+        request["config"] = config
+    return request
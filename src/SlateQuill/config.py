@@ -22,6 +22,8 @@ class ConversionConfig(BaseModel):
     heading_style: str = Field(default="atx", description="Heading style: atx (#) or setext (===)")
     emphasis_style: str = Field(default="asterisk", description="Emphasis style: asterisk (*) or underscore (_)")
     clean_whitespace: bool = Field(default=True, description="Whether to clean extra whitespace")
+    emitter: str = Field(default="native", description="Markdown emitter: native (tree walker) or markdownify")
+    parser: str = Field(default="html.parser", description="HTML parser: html.parser, lxml, html5lib or auto (the faster of lxml and html.parser, by benchmark)")
     
     @validator("markdown_flavor")
     def validate_markdown_flavor(cls, v: str) -> str:
@@ -43,6 +45,20 @@ class ConversionConfig(BaseModel):
         if v not in valid_styles:
             raise ValueError(f"Invalid emphasis style: {v}. Must be one of {valid_styles}")
         return v
+    
+    @validator("emitter")
+    def validate_emitter(cls, v: str) -> str:
+        valid_emitters = ["native", "markdownify"]
+        if v not in valid_emitters:
+            raise ValueError(f"Invalid emitter: {v}. Must be one of {valid_emitters}")
+        return v
+    
+    @validator("parser")
+    def validate_parser(cls, v: str) -> str:
+        valid_parsers = ["auto", "html.parser", "lxml", "html5lib"]
+        if v not in valid_parsers:
+            raise ValueError(f"Invalid parser: {v}. Must be one of {valid_parsers}")
+        return v
 
 
 class SecurityConfig(BaseModel):
@@ -58,9 +74,39 @@ class PerformanceConfig(BaseModel):
     """Configuration for performance settings."""
     
     use_streaming: bool = Field(default=True, description="Whether to use streaming processing")
-    max_workers: int = Field(default=4, description="Maximum number of worker threads")
+    streaming_threshold: int = Field(default=8_388_608, description="Files of at least this many bytes are converted block by block with bounded memory")
+    single_parse: bool = Field(default=False, description="Parse each document once and sanitize the parsed tree instead of running a separate bleach pass")
+    max_workers: int = Field(default=4, description="Number of worker processes for batch conversions (0 = one per CPU)")
+    mmap_threshold: int = Field(default=1_048_576, description="Input files of at least this many bytes are memory-mapped instead of read into memory (0 = never)")
+    scan_workers: int = Field(default=8, description="Number of threads listing directories when converting a directory (1 = scan sequentially)")
+    batch_window: int = Field(default=0, description="Maximum number of files converting or queued on the worker processes of a batch at a time (0 = four per worker)")
+    schedule: str = Field(default="largest_first", description="Order in which the worker processes of a batch start files: largest_first (by size, or by the time they took in the previous run) or fifo")
+    schedule_window: int = Field(default=0, description="Number of upcoming files ordered at a time by the largest_first schedule (0 = the batch window)")
+    read_ahead: int = Field(default=4, description="Number of upcoming input files read ahead while converting a batch")
+    write_queue: int = Field(default=16, description="Maximum number of converted files waiting to be written in the background")
+    deduplicate: bool = Field(default=True, description="Convert byte-identical inputs of a batch once and reuse the output for their duplicates")
+    dedup_method: str = Field(default="reflink", description="How duplicate outputs are created: reflink (clone, or copy where unsupported), hardlink or copy")
+    max_cpu_time: float = Field(default=0.0, description="CPU seconds a batch may spend on one file before its worker is killed (0 = unlimited)")
+    max_wall_time: float = Field(default=0.0, description="Seconds a batch may spend on one file before its worker is killed (0 = unlimited)")
+    max_memory: int = Field(default=0, description="Resident memory in bytes a batch worker may add while converting one file before it is killed (0 = unlimited)")
     cache_results: bool = Field(default=True, description="Whether to cache results")
-    cache_ttl: int = Field(default=3600, description="Cache TTL in seconds")
+    cache_ttl: int = Field(default=3600, description="Cache TTL in seconds (0 = never expire)")
+    cache_dir: Optional[str] = Field(default=None, description="Cache directory (default: ~/.cache/slatequill)")
+    cache_max_size: int = Field(default=536_870_912, description="Maximum cache size in bytes (512MB)")
+    
+    @validator("schedule")
+    def validate_schedule(cls, v: str) -> str:
+        valid_schedules = ["largest_first", "fifo"]
+        if v not in valid_schedules:
+            raise ValueError(f"Invalid schedule: {v}. Must be one of {valid_schedules}")
+        return v
+    
+    @validator("dedup_method")
+    def validate_dedup_method(cls, v: str) -> str:
+        valid_methods = ["reflink", "hardlink", "copy"]
+        if v not in valid_methods:
+            raise ValueError(f"Invalid dedup method: {v}. Must be one of {valid_methods}")
+        return v
 
 
 class OutputConfig(BaseModel):
@@ -128,19 +174,31 @@ class Config(BaseModel):
             tomli_w.dump(data, f)
 
 
+# Configuration files looked up in the working directory, in order
+DEFAULT_CONFIG_PATHS = [
+    Path(".slateQuill.toml"),
+    Path("slateQuill.toml"),
+    Path("pyproject.toml"),  # Look for [tool.slateQuill] section
+]
+
+
+def find_config_file(config_path: Optional[Path] = None) -> Optional[Path]:
+    """Return the configuration file load_config would read first, if any."""
+    if config_path and config_path.exists():
+        return config_path
+    for path in DEFAULT_CONFIG_PATHS:
+        if path.exists():
+            return path
+    return None
+
+
 def load_config(config_path: Optional[Path] = None) -> Config:
     """Load configuration from file or return default configuration."""
     if config_path and config_path.exists():
         return Config.from_file(config_path)
     
     # Look for default config files
-    default_paths = [
-        Path(".slateQuill.toml"),
-        Path("slateQuill.toml"),
-        Path("pyproject.toml"),  # Look for [tool.slateQuill] section
-    ]
-    
-    for path in default_paths:
+    for path in DEFAULT_CONFIG_PATHS:
         if path.exists():
             try:
                 return Config.from_file(path)
@@ -7,40 +7,33 @@ for converting various file formats to Markdown.
 
 import asyncio
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
-from .config import Config, ConversionConfig, SecurityConfig
-from .exceptions import ConversionError, SecurityError
-from .html2md import convert_html_file
-from .plugins.base import BaseConverter, HTMLConverter
-from .security import validate_input
-
-
-# Registry of available converters
-_converters: Dict[str, BaseConverter] = {}
-
-
-def register_converter(converter: BaseConverter) -> None:
-    """Register a converter for use in the conversion process."""
-    for format_ext in converter.supported_formats:
-        _converters[format_ext.lower()] = converter
+import aiofiles.os
 
-
-def get_converter(file_path: Path) -> Optional[BaseConverter]:
-    """Get the appropriate converter for a file based on its extension."""
-    file_ext = file_path.suffix.lower()
-    return _converters.get(file_ext)
-
-
-def list_supported_formats() -> List[str]:
-    """List all supported file formats."""
-    return sorted(list(_converters.keys()))
+from .cache import content_key, get_cache
+from .config import Config, ConversionConfig, SecurityConfig
+from .engine import BatchReport, ConversionEngine, ConversionResult
+from .exceptions import ConversionError, PluginError, SecurityError, SlateQuillError
+from .fileio import BackgroundWriter, SizedJob, read_input, release_input, write_file
+from .manifest import MANIFEST_NAME, BuildManifest
+from .plan import ConversionPlan, compile_plan
+from .plugins.base import BaseConverter
+from .plugins.registry import get_converter, list_supported_formats, register_converter  # noqa: F401
+from .profiling import file_span, span
+from .scanner import scan_directory
+from .security import validate_file_path, validate_file_size, validate_input
+from .shard import Shard, ShardReport
 
 
 async def convert_file(
     input_path: Path,
     output_path: Path,
-    config: Optional[Config] = None
+    config: Optional[Config] = None,
+    return_content: bool = True,
+    content: Optional[bytes] = None,
+    writer: Optional[BackgroundWriter] = None,
+    plan: Optional[ConversionPlan] = None
 ) -> str:
     """
     Convert a file to Markdown.
@@ -49,6 +42,15 @@ async def convert_file(
         input_path: Path to input file
         output_path: Path to output Markdown file
         config: Conversion configuration
+        return_content: Whether the caller needs the Markdown returned. If
+            False, files above the streaming threshold are streamed to the
+            output file with bounded memory and an empty string is returned.
+        content: Content of input_path if the caller has already read it (bytes,
+            or another buffer such as an mmap)
+        writer: Background writer to queue the output on; write errors are
+            then collected by the writer instead of raised here
+        plan: Plan compiled from config (see compile_plan); pass it when
+            converting many files with the same config
     
     Returns:
         Markdown content
@@ -57,11 +59,27 @@ async def convert_file(
         ConversionError: If conversion fails
         SecurityError: If security validation fails
     """
+    with file_span(input_path):
+        return await _convert_file(input_path, output_path, config, return_content, content, writer, plan)
+
+
+async def _convert_file(
+    input_path: Path,
+    output_path: Path,
+    config: Optional[Config],
+    return_content: bool,
+    content: Optional[Any],
+    writer: Optional[BackgroundWriter],
+    plan: Optional[ConversionPlan]
+) -> str:
+    """Convert a file to Markdown (see convert_file)."""
     if config is None:
         config = Config()
+    if plan is None:
+        plan = compile_plan(config)
     
     # Validate input file exists
-    if not input_path.exists():
+    if content is None and not await aiofiles.os.path.exists(input_path):
         raise ConversionError(f"Input file not found: {input_path}")
     
     # Get appropriate converter
@@ -69,41 +87,306 @@ async def convert_file(
     if converter is None:
         raise ConversionError(f"No converter available for file type: {input_path.suffix}")
     
-    # Read input file
+    if content is None:
+        if not return_content and await _should_stream(input_path, converter, config):
+            _validate_path_and_size(input_path, plan)
+            with span("stream"):
+                await converter.convert_stream(input_path, output_path, plan if converter.accepts_plan else config)
+            return ''
+        
+        # Read input file (large files are memory-mapped)
+        with span("read"):
+            content = await read_input(input_path, config.performance.mmap_threshold)
+        try:
+            return await _convert_content(input_path, output_path, config, content, converter, writer, plan)
+        finally:
+            release_input(content)
+    
+    return await _convert_content(input_path, output_path, config, content, converter, writer, plan)
+
+
+async def _convert_content(
+    input_path: Path,
+    output_path: Path,
+    config: Config,
+    content: Any,
+    converter: BaseConverter,
+    writer: Optional[BackgroundWriter],
+    plan: ConversionPlan
+) -> str:
+    """Convert the content read from input_path (see convert_file)."""
+    cached, document, cache_key = _prepare_document(input_path, content, converter, config, plan)
+    if cached is not None:
+        await _write_output(output_path, cached, writer)
+        return cached
+    
+    # Convert to markdown
+    single_parse = plan.single_parse and converter.sanitizes_tree
+    markdown_content = await _run_converter(
+        converter, document, _converter_options(converter, config, plan, single_parse)
+    )
+    
+    _cache_result(config, cache_key, markdown_content)
+    await _write_output(output_path, markdown_content, writer)
+    
+    return markdown_content
+
+
+async def convert_batch(
+    jobs: Sequence[Tuple[Path, Path]],
+    config: Optional[Config] = None,
+    plan: Optional[ConversionPlan] = None
+) -> List[Optional[SlateQuillError]]:
+    """
+    Convert files of the same type with a single convert_many() call.
+    
+    Each file is read, looked up in the result cache and validated as by
+    convert_file; the documents that are not cached are then converted
+    together, which lets converters amortize setup across documents (see
+    BaseConverter.batch_size). Files large enough to be streamed are
+    converted on their own.
+    
+    Args:
+        jobs: (input_path, output_path) tuples of files with the same converter
+        config: Conversion configuration
+        plan: Plan compiled from config (see compile_plan)
+    
+    Returns:
+        The error of each job, or None if it was converted
+    """
+    if config is None:
+        config = Config()
+    if plan is None:
+        plan = compile_plan(config)
+    
+    errors: List[Optional[SlateQuillError]] = [None] * len(jobs)
+    converter = get_converter(jobs[0][0]) if jobs else None
+    if converter is None:
+        return [ConversionError(f"No converter available for file type: {input_path.suffix}") for input_path, _ in jobs]
+    
+    # (index, document, cache key) of the documents to convert
+    pending: List[Tuple[int, Any, Optional[str]]] = []
+    for index, (input_path, output_path) in enumerate(jobs):
+        try:
+            if await _should_stream(input_path, converter, config):
+                await convert_file(input_path, output_path, config, return_content=False, plan=plan)
+                continue
+            with span("read", input_path):
+                content = await read_input(input_path, config.performance.mmap_threshold)
+            try:
+                cached, document, cache_key = _prepare_document(input_path, content, converter, config, plan)
+            finally:
+                release_input(content)
+            if cached is not None:
+                await _write_output(output_path, cached)
+            else:
+                pending.append((index, document, cache_key))
+        except SlateQuillError as e:
+            errors[index] = e
+        except Exception as e:
+            errors[index] = ConversionError(f"Failed to convert {input_path}: {e}")
+    
+    if not pending:
+        return errors
+    
+    single_parse = plan.single_parse and converter.sanitizes_tree
+    options = _converter_options(converter, config, plan, single_parse)
     try:
-        with open(input_path, 'rb') as f:
-            content = f.read()
+        outputs: List[Union[str, Exception]] = converter.convert_many([document for _, document, _ in pending], options)
     except Exception as e:
-        raise ConversionError(f"Failed to read input file: {e}")
+        outputs = [e] * len(pending)
+    if len(outputs) != len(pending):
+        error = PluginError(f"{converter.name} returned {len(outputs)} results for {len(pending)} documents")
+        outputs = [error] * len(pending)
+    
+    for (index, _, cache_key), output in zip(pending, outputs):
+        input_path, output_path = jobs[index]
+        try:
+            if isinstance(output, Exception):
+                raise output
+            _cache_result(config, cache_key, output)
+            await _write_output(output_path, output)
+        except SlateQuillError as e:
+            errors[index] = e
+        except Exception as e:
+            errors[index] = ConversionError(f"Failed to convert {input_path}: {e}")
+    return errors
+
+
+def _prepare_document(
+    input_path: Optional[Path],
+    content: Any,
+    converter: BaseConverter,
+    config: Config,
+    plan: ConversionPlan,
+    text: Optional[str] = None
+) -> Tuple[Optional[str], Any, Optional[str]]:
+    """
+    Look up and validate content read from input_path.
+    
+    In-memory documents have no input_path; their text is passed along
+    with its UTF-8 encoding as content, and the size limit applies to that.
+    
+    Returns the cached Markdown if the content was converted before with
+    the same settings, otherwise the document to pass to the converter;
+    and the cache key to store the result under.
+    """
+    if input_path is None and len(content) > plan.security.max_file_size:
+        raise SecurityError(
+            f"Content size {len(content)} bytes exceeds maximum allowed size "
+            f"{plan.security.max_file_size} bytes"
+        )
+    
+    # Serve identical content converted with the same settings from the cache
+    cache = get_cache(config)
+    cache_key = None
+    if cache is not None:
+        with span("cache"):
+            cache_key = content_key(content, plan.fingerprint, converter.name)
+            cached = cache.get(cache_key)
+        if cached is not None:
+            if input_path is not None:
+                _validate_path_and_size(input_path, plan)
+            return cached, None, cache_key
     
-    # Validate input
-    if not converter.validate_input(content):
-        raise SecurityError(f"Input validation failed for file: {input_path}")
+    # Validate input; text converters validate by decoding, which is done once.
+    # Cached results were validated when they were converted.
+    document: Union[bytes, str]
+    if converter.accepts_text:
+        if text is not None:
+            document = text
+        else:
+            with span("decode"):
+                document = converter.decode(content)
+    else:
+        if not isinstance(content, bytes):
+            content = bytes(content)
+        if not converter.validate_input(content):
+            raise SecurityError(f"Input validation failed for file: {input_path}")
+        document = content
+    
+    # Single-parse pipeline: the converter sanitizes its own parsed tree
+    single_parse = plan.single_parse and converter.sanitizes_tree
     
     # Security validation
-    content_str = validate_input(content, input_path, config.security)
+    content_str = validate_input(
+        document, input_path, plan.security, sanitize=not single_parse, parser=plan.parser
+    )
+    return None, content_str if converter.accepts_text else content_str.encode('utf-8'), cache_key
+
+
+async def _run_converter(converter: BaseConverter, document: Any, options: Any) -> str:
+    """Convert a document, synchronously if the converter implements convert_sync()."""
+    if type(converter).convert_sync is not BaseConverter.convert_sync:
+        return converter.convert_sync(document, options)
+    return await converter.convert(document, options)
+
+
+def _cache_result(config: Config, cache_key: Optional[str], markdown_content: str) -> None:
+    """Store a conversion result under the key returned by _prepare_document."""
+    cache = get_cache(config)
+    if cache is not None and cache_key is not None:
+        with span("cache"):
+            cache.put(cache_key, markdown_content)
+
+
+async def convert_html(
+    html: str,
+    config: Optional[Config] = None,
+    plan: Optional[ConversionPlan] = None
+) -> str:
+    """
+    Convert an HTML document held in memory to Markdown.
     
-    # Convert to markdown
-    markdown_content = await converter.convert(content_str.encode('utf-8'), config.conversion)
+    The document goes through the same size limit, sanitization, result
+    cache and converter as a file passed to convert_file.
     
-    # Create output directory if it doesn't exist
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    Args:
+        html: HTML document
+        config: Conversion configuration
+        plan: Plan compiled from config (see compile_plan)
     
-    # Write output file
-    try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
-    except Exception as e:
-        raise ConversionError(f"Failed to write output file: {e}")
+    Returns:
+        Markdown content
     
+    Raises:
+        ConversionError: If conversion fails
+        SecurityError: If security validation fails
+    """
+    if config is None:
+        config = Config()
+    if plan is None:
+        plan = compile_plan(config)
+    
+    converter = get_converter(Path('document.html'))
+    if converter is None:
+        raise ConversionError("No converter available for file type: .html")
+    
+    cached, document, cache_key = _prepare_document(None, html.encode('utf-8'), converter, config, plan, html)
+    if cached is not None:
+        return cached
+    
+    single_parse = plan.single_parse and converter.sanitizes_tree
+    markdown_content = await _run_converter(
+        converter, document, _converter_options(converter, config, plan, single_parse)
+    )
+    
+    _cache_result(config, cache_key, markdown_content)
     return markdown_content
 
 
+def _converter_options(converter: BaseConverter, config: Config, plan: ConversionPlan, single_parse: bool) -> Any:
+    """Options argument of converter.convert() for a document."""
+    if converter.accepts_plan:
+        return plan
+    # Single-parse converters get the full config to sanitize with
+    return config if single_parse else config.conversion
+
+
+def _validate_path_and_size(input_path: Path, plan: ConversionPlan) -> None:
+    """Run the file checks of validate_input for content that skips it."""
+    with span("validate_path"):
+        validate_file_path(input_path)
+    with span("validate_size"):
+        validate_file_size(input_path, plan.security.max_file_size)
+
+
+async def _should_stream(input_path: Path, converter: BaseConverter, config: Config) -> bool:
+    """Check whether a file is large enough to be streamed instead of read whole."""
+    performance = config.performance
+    if not performance.use_streaming or not converter.supports_streaming:
+        return False
+    try:
+        return (await aiofiles.os.stat(input_path)).st_size >= performance.streaming_threshold
+    except OSError:
+        return False
+
+
+async def _write_output(
+    output_path: Path,
+    markdown_content: str,
+    writer: Optional[BackgroundWriter] = None
+) -> None:
+    """Write Markdown to the output path (or queue it on writer), creating parent directories."""
+    if writer is not None:
+        await writer.submit(output_path, markdown_content)
+    else:
+        with span("write"):
+            await write_file(output_path, markdown_content)
+
+
 async def convert_directory(
     input_dir: Path,
     output_dir: Path,
     config: Optional[Config] = None,
-    recursive: bool = True
+    recursive: bool = True,
+    max_workers: Optional[int] = None,
+    report: Optional[BatchReport] = None,
+    incremental: bool = False,
+    prune: bool = False,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    shard: Optional[Shard] = None
 ) -> List[tuple[Path, Path]]:
     """
     Convert all supported files in a directory to Markdown.
@@ -113,10 +396,78 @@ async def convert_directory(
         output_dir: Output directory path
         config: Conversion configuration
         recursive: Whether to process subdirectories
+        max_workers: Number of worker processes (default: performance.max_workers)
+        report: Optional batch report that collects converted and failed files
+        incremental: Skip inputs unchanged since the last run, using the build
+            manifest kept in the output directory
+        prune: In incremental mode, delete outputs whose input no longer exists
+            (otherwise they are only reported)
+        include: If given, only convert files matching one of these globs
+        exclude: Skip files and directories matching one of these globs (see
+            SlateQuill.scanner.compile_globs)
+        shard: Only convert the files of this shard (see SlateQuill.shard)
     
     Returns:
         List of (input_path, output_path) tuples for converted files
     """
+    print_failures = report is None
+    if report is None:
+        report = BatchReport()
+    
+    async for result in iter_convert_directory(
+        input_dir, output_dir, config, recursive, max_workers, incremental, prune, include, exclude, shard
+    ):
+        report.add(result)
+    
+    if print_failures:
+        _print_failures(report)
+    
+    return report.converted
+
+
+async def iter_convert_directory(
+    input_dir: Path,
+    output_dir: Path,
+    config: Optional[Config] = None,
+    recursive: bool = True,
+    max_workers: Optional[int] = None,
+    incremental: bool = False,
+    prune: bool = False,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    shard: Optional[Shard] = None
+) -> AsyncIterator[ConversionResult]:
+    """
+    Convert all supported files in a directory, yielding a result per file as it completes.
+    
+    The directory is scanned by performance.scan_workers threads while
+    files are converted, and only a bounded window of files is in flight,
+    so memory use does not grow with the number of files (see
+    SlateQuill.scanner and ConversionEngine.iter_run).
+    
+    Args:
+        input_dir: Input directory path
+        output_dir: Output directory path
+        config: Conversion configuration
+        recursive: Whether to process subdirectories
+        max_workers: Number of worker processes (default: performance.max_workers)
+        incremental: Skip inputs unchanged since the last run, using the build
+            manifest kept in the output directory
+        prune: In incremental mode, delete outputs whose input no longer exists
+        include: If given, only convert files matching one of these globs
+        exclude: Skip files and directories matching one of these globs
+        shard: Only convert the files of this shard. The shard keeps its own
+            manifest and writes a report to the output directory, for
+            SlateQuill.shard.merge_shard_reports.
+    
+    Yields:
+        Converted and failed files in completion order. Incremental runs also
+        yield unchanged files as skipped and, after all files are done, the
+        outputs of deleted inputs as orphaned (or pruned).
+    
+    Raises:
+        ConversionError: If the input directory does not exist
+    """
     if config is None:
         config = Config()
     
@@ -125,79 +476,172 @@ async def convert_directory(
     
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    converted_files = []
-    supported_formats = set(list_supported_formats())
+    engine = ConversionEngine(config, max_workers)
+    manifest = None
+    if incremental:
+        manifest_name = shard.manifest_name if shard is not None else MANIFEST_NAME
+        manifest = BuildManifest.load(output_dir, engine.plan.fingerprint, manifest_name)
+        # Start the files that took longest last time first
+        engine.estimate = manifest.cost_estimator(input_dir)
+    shard_report = ShardReport(shard, engine.plan.fingerprint) if shard is not None else None
+    # Inputs found by the scan (incremental runs only)
+    seen: Set[str] = set()
     
-    # Find all supported files
-    pattern = "**/*" if recursive else "*"
-    for file_path in input_dir.glob(pattern):
-        if file_path.is_file() and file_path.suffix.lower() in supported_formats:
-            # Calculate relative path and output path
+    def jobs() -> Iterator[Union[tuple[Path, Path], ConversionResult]]:
+        entries = scan_directory(
+            input_dir, list_supported_formats(), recursive, include, exclude, config.performance.scan_workers
+        )
+        for entry in entries:
+            file_path = Path(entry.path)
             rel_path = file_path.relative_to(input_dir)
+            rel_key = rel_path.as_posix()
+            if shard_report is not None and not shard_report.scan(rel_key):
+                continue
             output_path = output_dir / rel_path.with_suffix('.md')
             
+            if manifest is not None:
+                seen.add(rel_key)
             try:
-                await convert_file(file_path, output_path, config)
-                converted_files.append((file_path, output_path))
-            except Exception as e:
-                print(f"Failed to convert {file_path}: {e}")
+                # The directory entry caches the stat result
+                stat = entry.stat()
+            except OSError:
+                # Reported by the conversion
+                yield file_path, output_path
+                continue
+            
+            if manifest is not None and manifest.is_unchanged(rel_key, file_path, stat, output_path):
+                yield ConversionResult(file_path, output_path, "skipped")
+                continue
+            
+            # The scheduler and deduplication use the size without another stat call
+            yield SizedJob(file_path, output_path, stat.st_size)
     
-    return converted_files
+    results = engine.iter_run(jobs())
+    complete = False
+    try:
+        async for result in results:
+            if manifest is not None:
+                await _record_result(manifest, input_dir, result)
+            if shard_report is not None:
+                shard_report.add(result.input_path.relative_to(input_dir).as_posix(), result)
+            yield result
+        
+        # Orphans are only known once the whole directory was scanned
+        if manifest is not None:
+            for result in _orphaned_outputs(manifest, input_dir, seen, recursive, prune):
+                if shard_report is not None:
+                    shard_report.add(result.input_path.relative_to(input_dir).as_posix(), result)
+                yield result
+        complete = True
+    finally:
+        await results.aclose()
+        # Keep what was recorded, also if the caller stopped early
+        if manifest is not None:
+            manifest.save()
+        if shard_report is not None:
+            shard_report.finish(complete)
+            shard_report.save(output_dir)
+
+
+async def _record_result(manifest: BuildManifest, input_dir: Path, result: ConversionResult) -> None:
+    """Record a converted file in the build manifest; failed inputs are retried on the next run."""
+    if result.status == "converted":
+        # Hashing the input and output reads both files; keep it off the loop feeding the workers
+        await asyncio.to_thread(
+            manifest.record,
+            result.input_path.relative_to(input_dir).as_posix(), result.input_path, result.output_path, result.seconds
+        )
+    elif result.status == "failed":
+        manifest.forget(result.input_path.relative_to(input_dir).as_posix())
+
+
+def _orphaned_outputs(
+    manifest: BuildManifest,
+    input_dir: Path,
+    seen: Set[str],
+    recursive: bool,
+    prune: bool
+) -> Iterator[ConversionResult]:
+    """Find manifest entries whose input was deleted, pruning their outputs if requested."""
+    for rel_key in list(manifest.entries):
+        if rel_key in seen or (not recursive and '/' in rel_key):
+            continue
+        
+        # The input was deleted since the last run
+        output_path = Path(manifest.entries[rel_key].output)
+        if prune:
+            output_path.unlink(missing_ok=True)
+            manifest.forget(rel_key)
+            yield ConversionResult(input_dir / rel_key, output_path, "pruned")
+        else:
+            yield ConversionResult(input_dir / rel_key, output_path, "orphaned")
 
 
 async def batch_convert(
     input_files: List[Path],
     output_dir: Path,
     config: Optional[Config] = None,
-    max_concurrent: int = 5
+    max_concurrent: Optional[int] = None,
+    report: Optional[BatchReport] = None
 ) -> List[tuple[Path, Path]]:
     """
-    Convert multiple files to Markdown concurrently.
+    Convert multiple files to Markdown in parallel worker processes.
     
     Args:
         input_files: List of input file paths
         output_dir: Output directory path
         config: Conversion configuration
-        max_concurrent: Maximum number of concurrent conversions
+        max_concurrent: Number of worker processes (default: performance.max_workers)
+        report: Optional batch report that collects converted and failed files
     
     Returns:
         List of (input_path, output_path) tuples for converted files
     """
-    if config is None:
-        config = Config()
+    print_failures = report is None
+    if report is None:
+        report = BatchReport()
     
-    output_dir.mkdir(parents=True, exist_ok=True)
+    async for result in iter_batch_convert(input_files, output_dir, config, max_concurrent):
+        report.add(result)
     
-    semaphore = asyncio.Semaphore(max_concurrent)
-    converted_files = []
+    if print_failures:
+        _print_failures(report)
     
-    async def convert_single(input_path: Path) -> Optional[tuple[Path, Path]]:
-        async with semaphore:
-            try:
-                output_path = output_dir / f"{input_path.stem}.md"
-                await convert_file(input_path, output_path, config)
-                return (input_path, output_path)
-            except Exception as e:
-                print(f"Failed to convert {input_path}: {e}")
-                return None
+    return report.converted
+
+
+def iter_batch_convert(
+    input_files: Iterable[Path],
+    output_dir: Path,
+    config: Optional[Config] = None,
+    max_concurrent: Optional[int] = None
+) -> AsyncIterator[ConversionResult]:
+    """
+    Convert files to Markdown, yielding a result per file as it completes.
     
-    # Execute conversions concurrently
-    tasks = [convert_single(path) for path in input_files]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    Input paths are pulled from input_files only as capacity frees up, so it
+    can be a generator of any length; memory use is bounded by the window of
+    files in flight (see ConversionEngine.iter_run).
     
-    # Filter out None results and exceptions
-    converted_files = [result for result in results if result is not None and not isinstance(result, Exception)]
+    Args:
+        input_files: Iterable of input file paths
+        output_dir: Output directory path
+        config: Conversion configuration
+        max_concurrent: Number of worker processes (default: performance.max_workers)
     
-    return converted_files
-
-
-# Initialize default converters
-def _initialize_converters() -> None:
-    """Initialize the default converter registry."""
-    # Register HTML converter
-    html_converter = HTMLConverter()
-    register_converter(html_converter)
+    Returns:
+        Async iterator of results, in completion order
+    """
+    if config is None:
+        config = Config()
+    
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    jobs = ((input_path, output_dir / f"{input_path.stem}.md") for input_path in input_files)
+    return ConversionEngine(config, max_concurrent).iter_run(jobs)
 
 
-# Initialize converters on module import
-_initialize_converters()
+def _print_failures(report: BatchReport) -> None:
+    """Surface failures on stdout for callers that did not pass a report."""
+    for input_path, error in report.failed:
+        print(f"Failed to convert {input_path}: {error}")
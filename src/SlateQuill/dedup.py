@@ -0,0 +1,156 @@
+"""
+SlateQuill batch deduplication.
+
+Site mirrors contain many byte-identical pages (print views, locale
+fallbacks, mirrored paths). All files of a batch are converted with the same
+configuration, so identical inputs of the same type produce identical
+outputs: each distinct input is converted once and its output is reused for
+the duplicates by reflink, hard link or copy (see fileio.link_file).
+
+Inputs are only hashed once another input of the same type and size shows
+up, so a batch without duplicates costs at most one stat call per file (none
+for files found by the directory scan, whose size is known). Inputs are
+hashed as jobs are pulled, on the engine's job thread (see fileio.JobFeed),
+and duplicate outputs are linked on a thread as well.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .engine import ConversionResult
+from .exceptions import ConversionError
+from .fileio import Job, input_size, link_file
+from .manifest import file_digest
+
+
+@dataclass(eq=False)
+class _Original:
+    """The first input with its content, converted on behalf of its duplicates."""
+
+    job: Job
+    size: int
+    digest: Optional[str] = None
+    # Whether the output was written
+    converted: bool = False
+    # Duplicates waiting for the output
+    duplicates: List[Job] = field(default_factory=list)
+
+    @property
+    def suffix(self) -> str:
+        return self.job[0].suffix.lower()
+
+
+class Deduplicator:
+    """
+    Convert each distinct input of a batch once.
+
+    filter() passes on the jobs whose content was not seen before and holds
+    back the others; resolve() is given the result of every job and creates
+    the outputs of the duplicates of converted inputs. Duplicates of inputs
+    that failed are not held back any further but collected in retry, to be
+    converted themselves.
+
+    One entry is kept per distinct input size and per hashed input.
+    """
+
+    def __init__(self, method: str = "reflink") -> None:
+        self.method = method
+        # First input of each (suffix, size), or None once inputs of that size are hashed
+        self._by_size: Dict[Tuple[str, int], Optional[_Original]] = {}
+        self._by_digest: Dict[Tuple[str, str], _Original] = {}
+        # Originals whose result is pending
+        self._converting: Dict[Job, _Original] = {}
+        self.retry: List[Job] = []
+
+    def filter(self, jobs: Iterable[Union[Job, ConversionResult]]) -> Iterator[Union[Job, ConversionResult]]:
+        """
+        Pass on jobs with new content; duplicates of converted inputs become results right away.
+
+        Items that already are results are passed through.
+        """
+        for job in jobs:
+            if isinstance(job, ConversionResult):
+                yield job
+                continue
+
+            original = self._find_original(job)
+            if original is None:
+                yield job
+            elif original.converted:
+                yield self._reuse(original, job)
+            else:
+                original.duplicates.append(job)
+
+    async def resolve(self, result: ConversionResult) -> List[ConversionResult]:
+        """Return the results of the duplicates that were waiting for result."""
+        original = self._converting.pop((result.input_path, result.output_path), None)
+        if original is None:
+            return []
+
+        duplicates, original.duplicates = original.duplicates, []
+        if result.status == "converted":
+            original.converted = True
+            if not duplicates:
+                return []
+            return await asyncio.to_thread(lambda: [self._reuse(original, job) for job in duplicates])
+
+        # The failure may be specific to the original (e.g. its output path):
+        # forget it, so the next duplicate is converted on its own
+        if original.digest is not None:
+            del self._by_digest[(original.suffix, original.digest)]
+        elif self._by_size.get((original.suffix, original.size)) is original:
+            del self._by_size[(original.suffix, original.size)]
+        self.retry.extend(duplicates)
+        return []
+
+    def _find_original(self, job: Job) -> Optional[_Original]:
+        """Return the original of a duplicate, or register job as an original and return None."""
+        input_path = job[0]
+        suffix = input_path.suffix.lower()
+        try:
+            size = input_size(job)
+        except OSError:
+            # Reported by the conversion
+            return None
+
+        size_key = (suffix, size)
+        if size_key not in self._by_size:
+            self._by_size[size_key] = self._register(_Original(job, size))
+            return None
+
+        first = self._by_size[size_key]
+        if first is not None:
+            # A second input of this size: from now on, inputs of this size are told apart by hash
+            self._by_size[size_key] = None
+            try:
+                first.digest = file_digest(first.job[0])
+                self._by_digest[(suffix, first.digest)] = first
+            except OSError:
+                pass
+
+        try:
+            digest = file_digest(input_path)
+        except OSError:
+            return None
+
+        original = self._by_digest.get((suffix, digest))
+        if original is None:
+            self._by_digest[(suffix, digest)] = self._register(_Original(job, size, digest))
+        return original
+
+    def _register(self, original: _Original) -> _Original:
+        self._converting[original.job] = original
+        return original
+
+    def _reuse(self, original: _Original, job: Job) -> ConversionResult:
+        """Create the output of a duplicate from the output of its original."""
+        source_path, source_output = original.job
+        input_path, output_path = job
+        if output_path != source_output:
+            try:
+                link_file(source_output, output_path, self.method)
+            except OSError as e:
+                error = ConversionError(f"Failed to write output file: {e}")
+                return ConversionResult(input_path, output_path, "failed", error)
+        return ConversionResult(input_path, output_path, "converted", duplicate_of=source_path)
@@ -0,0 +1,502 @@
+"""
+SlateQuill multi-process conversion engine.
+
+This module runs batch conversions on a pool of worker processes so that the
+CPU-bound parsing and Markdown generation work scales across all cores.
+Inputs are pulled from the job iterable as capacity frees up and a compact
+result is produced per file as soon as it completes, so a batch of any size
+runs in bounded memory. With per-file resource budgets configured, files are
+converted on supervised workers that are killed when a file exceeds its
+budget (see SlateQuill.supervisor). Files of converters that convert
+documents in batches (see BaseConverter.batch_size) are handed to the workers
+batch_size at a time.
+"""
+
+import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import itertools
+import os
+from pathlib import Path
+import time
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterable, Iterator, List, Literal, Optional, Tuple, Union
+
+from .config import Config, PerformanceConfig
+from .exceptions import ConversionError, SlateQuillError
+from .fileio import BackgroundWriter, Job, JobFeed, ReadAhead
+from .plan import ConversionPlan, compile_plan
+from .plugins.registry import get_converter
+from .scheduler import CostEstimator, LargestFirstScheduler
+from .supervisor import ResourceBudget, SupervisedPool
+
+
+# What happened to a file of a batch. Orphaned and pruned results are
+# outputs of incremental runs whose input file was deleted.
+ResultStatus = Literal["converted", "failed", "skipped", "orphaned", "pruned"]
+
+
+@dataclass(frozen=True, slots=True)
+class ConversionResult:
+    """Outcome of one file of a batch, produced as soon as the file is done."""
+
+    input_path: Path
+    output_path: Path
+    status: ResultStatus
+    error: Optional[SlateQuillError] = None
+    # Identical input whose output was reused instead of converting this one
+    duplicate_of: Optional[Path] = None
+    # Seconds the conversion took, and the share of the batch's scheduling overhead
+    seconds: Optional[float] = None
+    scheduling: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """Whether the file did not fail."""
+        return self.status != "failed"
+
+
+def _result(
+    job: Job,
+    error: Optional[SlateQuillError],
+    seconds: Optional[float] = None,
+    scheduling: float = 0.0
+) -> ConversionResult:
+    """Result of a converted or failed job."""
+    status: ResultStatus = "converted" if error is None else "failed"
+    return ConversionResult(job[0], job[1], status, error, seconds=seconds, scheduling=scheduling)
+
+
+@dataclass
+class BatchReport:
+    """Outcome of a batch conversion run."""
+
+    converted: List[Tuple[Path, Path]] = field(default_factory=list)
+    failed: List[Tuple[Path, SlateQuillError]] = field(default_factory=list)
+    # Incremental runs: unchanged inputs, and outputs whose input was deleted
+    skipped: List[Tuple[Path, Path]] = field(default_factory=list)
+    orphaned: List[Path] = field(default_factory=list)
+    pruned: List[Path] = field(default_factory=list)
+    # Converted files that reused the output of an identical input, as (input_path, duplicate_of)
+    deduplicated: List[Tuple[Path, Path]] = field(default_factory=list)
+    # Seconds spent ordering the files of the batch (see SlateQuill.scheduler)
+    scheduling_overhead: float = 0.0
+
+    @property
+    def total(self) -> int:
+        """Number of files that were attempted."""
+        return len(self.converted) + len(self.failed)
+
+    def add(self, result: ConversionResult) -> None:
+        """Record the result of a file."""
+        self.scheduling_overhead += result.scheduling
+        if result.status == "converted":
+            self.converted.append((result.input_path, result.output_path))
+            if result.duplicate_of is not None:
+                self.deduplicated.append((result.input_path, result.duplicate_of))
+        elif result.status == "failed":
+            assert result.error is not None
+            self.failed.append((result.input_path, result.error))
+        elif result.status == "skipped":
+            self.skipped.append((result.input_path, result.output_path))
+        elif result.status == "orphaned":
+            self.orphaned.append(result.output_path)
+        else:
+            self.pruned.append(result.output_path)
+
+
+# Per-process state of pool workers, populated by _initialize_worker
+_worker_config: Optional[Config] = None
+_worker_plan: Optional[ConversionPlan] = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def resolve_worker_count(config: Config, max_workers: Optional[int] = None) -> int:
+    """Resolve the number of worker processes to use for a batch."""
+    workers = max_workers if max_workers is not None else config.performance.max_workers
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def _read_ahead_limit(performance: PerformanceConfig) -> Optional[int]:
+    """Size from which inputs are streamed or memory-mapped rather than read ahead."""
+    limits = [performance.mmap_threshold] if performance.mmap_threshold > 0 else []
+    if performance.use_streaming:
+        limits.append(performance.streaming_threshold)
+    return min(limits) if limits else None
+
+
+def _initialize_worker(config: Config, plan: ConversionPlan) -> None:
+    """Prepare a pool worker: import the pipeline and keep it warm."""
+    global _worker_config, _worker_plan, _worker_loop
+
+    # Importing core registers the converters once per worker process
+    from . import core  # noqa: F401
+
+    _worker_config = config
+    _worker_plan = plan
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+
+
+def _convert_job(input_path: Path, output_path: Path) -> Tuple[Optional[SlateQuillError], float]:
+    """Convert one file inside a pool worker and return its error, if any, and the seconds it took."""
+    from .core import convert_file
+
+    assert _worker_loop is not None and _worker_config is not None
+    start = time.perf_counter()
+    error: Optional[SlateQuillError] = None
+    try:
+        _worker_loop.run_until_complete(
+            convert_file(input_path, output_path, _worker_config, return_content=False, plan=_worker_plan)
+        )
+    except SlateQuillError as e:
+        error = e
+    except Exception as e:
+        error = ConversionError(f"Failed to convert {input_path}: {e}")
+    return error, time.perf_counter() - start
+
+
+def _convert_batch_job(jobs: List[Job]) -> List[Tuple[Optional[SlateQuillError], float]]:
+    """Convert a batch of files inside a pool worker; their time is the batch's, shared evenly."""
+    from .core import convert_batch
+
+    assert _worker_loop is not None and _worker_config is not None
+    start = time.perf_counter()
+    try:
+        errors = _worker_loop.run_until_complete(convert_batch(jobs, _worker_config, _worker_plan))
+    except Exception as e:
+        errors = [ConversionError(f"Failed to convert {input_path}: {e}") for input_path, _ in jobs]
+    seconds = (time.perf_counter() - start) / len(jobs)
+    return [(error, seconds) for error in errors]
+
+
+def _batch_jobs(jobs: Iterator[Union[Job, ConversionResult]]) -> Iterator[Union[Job, List[Job], ConversionResult]]:
+    """
+    Group the jobs of converters that convert documents in batches into lists of batch_size jobs.
+
+    Other jobs and results are passed through right away; incomplete
+    batches follow once jobs run out.
+    """
+    batches: Dict[int, List[Job]] = {}
+    for job in jobs:
+        if not isinstance(job, tuple):
+            yield job
+            continue
+        try:
+            converter = get_converter(job[0])
+        except SlateQuillError:
+            # Reported by the conversion
+            converter = None
+        if converter is None or converter.batch_size <= 1:
+            yield job
+            continue
+
+        batch = batches.setdefault(id(converter), [])
+        batch.append(job)
+        if len(batch) >= converter.batch_size:
+            del batches[id(converter)]
+            yield batch
+    yield from batches.values()
+
+
+class ConversionEngine:
+    """
+    Process-pool executor for batch conversions.
+
+    Each worker process is initialized once with the configuration, its
+    compiled plan and the converter registry, so per-file work is limited to
+    the conversion itself.
+    Small batches (or a single worker) are converted in-process to avoid the
+    cost of starting the pool, unless resource budgets require isolation.
+    """
+
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        max_workers: Optional[int] = None,
+        window: Optional[int] = None
+    ) -> None:
+        self.config = config or Config()
+        self.plan = compile_plan(self.config)
+        self.max_workers = resolve_worker_count(self.config, max_workers)
+        # Files handed to the worker processes at a time
+        if window is None:
+            window = self.config.performance.batch_window
+        self.window = window if window > 0 else 4 * self.max_workers
+        # Estimates the cost of files for the scheduler, e.g. from a previous run
+        # (see BuildManifest.cost_estimator); by default their size is used
+        self.estimate: Optional[CostEstimator] = None
+
+    async def run(
+        self,
+        jobs: Iterable[Tuple[Path, Path]],
+        report: Optional[BatchReport] = None
+    ) -> BatchReport:
+        """
+        Convert all (input_path, output_path) jobs.
+
+        Args:
+            jobs: Iterable of (input_path, output_path) tuples
+            report: Optional report to populate (a new one is created otherwise)
+
+        Returns:
+            Report listing converted and failed files, in the order they completed
+        """
+        if report is None:
+            report = BatchReport()
+
+        async for result in self.iter_run(jobs):
+            report.add(result)
+
+        return report
+
+    async def iter_run(
+        self,
+        jobs: Iterable[Union[Job, ConversionResult]]
+    ) -> AsyncIterator[ConversionResult]:
+        """
+        Convert (input_path, output_path) jobs, yielding a result per file as it completes.
+
+        Jobs are pulled from the iterable only as capacity frees up: at most
+        window files are handed to the worker processes at a time (read_ahead
+        and write_queue bound an in-process run), so jobs can come from a
+        generator of any length. Results come in completion order. Items
+        that already are results (e.g. skipped files) are passed through.
+
+        With performance.deduplicate, inputs identical to an earlier input of
+        the batch are not converted again; their output is created from the
+        earlier output (see SlateQuill.dedup).
+
+        Args:
+            jobs: Iterable of (input_path, output_path) tuples
+
+        Yields:
+            One result per job
+        """
+        from .dedup import Deduplicator
+
+        performance = self.config.performance
+        dedup = Deduplicator(performance.dedup_method) if performance.deduplicate else None
+        pending: Iterable[Union[Job, ConversionResult]] = jobs
+        while True:
+            results = self._iter_jobs(dedup.filter(pending) if dedup is not None else iter(pending))
+            try:
+                async for result in results:
+                    yield result
+                    if dedup is not None:
+                        for duplicate in await dedup.resolve(result):
+                            yield duplicate
+            finally:
+                await results.aclose()
+
+            if dedup is None or not dedup.retry:
+                return
+            # Duplicates of inputs that failed: the first of each is converted on its own
+            pending, dedup.retry = dedup.retry, []
+
+    async def _iter_jobs(self, job_iter: Iterator[Union[Job, ConversionResult]]) -> AsyncIterator[ConversionResult]:
+        """Convert jobs in-process or on the pool, depending on their number."""
+        # Only start the pool if there are jobs for more than one worker;
+        # skipped files pass through as results right away and don't count
+        feed = JobFeed(job_iter)
+        head: List[Job] = []
+        while len(head) < self.max_workers and not feed.exhausted:
+            for item in await feed.take(self.max_workers - len(head)):
+                if isinstance(item, ConversionResult):
+                    yield item
+                else:
+                    head.append(item)
+        if not head:
+            return
+
+        workers = min(self.max_workers, len(head))
+        remaining = itertools.chain(head, job_iter)
+        budget = ResourceBudget.from_config(self.config.performance)
+        if budget.enabled:
+            # Files are isolated in worker processes even if there is only one
+            results = self._iter_supervised(remaining, workers, budget)
+        elif workers <= 1:
+            results = self._iter_inline(remaining)
+        else:
+            results = self._iter_pool(remaining, workers)
+
+        try:
+            async for result in results:
+                yield result
+        finally:
+            await results.aclose()
+
+    async def _iter_inline(self, jobs: Iterator[Union[Job, ConversionResult]]) -> AsyncIterator[ConversionResult]:
+        """
+        Convert jobs sequentially in the current process.
+
+        Upcoming inputs are read ahead and outputs written in the background,
+        so file I/O overlaps with conversion. A file's result is produced once
+        its output is written.
+        """
+        from .core import convert_batch, convert_file
+
+        performance = self.config.performance
+        written: Deque[ConversionResult] = deque()
+        # Jobs whose output is queued on the writer, in submission order, with the time they started
+        queued: Deque[Tuple[Job, float]] = deque()
+
+        def on_written(path: Path, error: Optional[SlateQuillError]) -> None:
+            job, start = queued.popleft()
+            written.append(_result(job, error, time.perf_counter() - start))
+
+        read_ahead = ReadAhead(
+            _batch_jobs(jobs),
+            performance.read_ahead,
+            # Files that will be streamed or memory-mapped are left to the converter
+            max_size=_read_ahead_limit(performance)
+        )
+        try:
+            async with BackgroundWriter(performance.write_queue, on_written) as writer:
+                async for job, content in read_ahead:
+                    if isinstance(job, ConversionResult):
+                        yield job
+                        continue
+                    if isinstance(job, list):
+                        start = time.perf_counter()
+                        errors = await convert_batch(job, self.config, self.plan)
+                        seconds = (time.perf_counter() - start) / len(job)
+                        for batch_job, error in zip(job, errors):
+                            yield _result(batch_job, error, seconds)
+                        continue
+
+                    input_path, output_path = job
+                    submitted = writer.submitted
+                    start = time.perf_counter()
+                    queued.append((job, start))
+                    error: Optional[SlateQuillError] = None
+                    try:
+                        await convert_file(
+                            input_path, output_path, self.config,
+                            return_content=False, content=content, writer=writer, plan=self.plan
+                        )
+                    except SlateQuillError as e:
+                        error = e
+                    except Exception as e:
+                        error = ConversionError(f"Failed to convert {input_path}: {e}")
+
+                    if writer.submitted == submitted:
+                        # Failed, or streamed straight to the output file
+                        queued.pop()
+                        yield _result(job, error, time.perf_counter() - start)
+                    while written:
+                        yield written.popleft()
+            while written:
+                yield written.popleft()
+        finally:
+            read_ahead.close()
+
+    async def _iter_pool(
+        self,
+        jobs: Iterator[Union[Job, ConversionResult]],
+        workers: int
+    ) -> AsyncIterator[ConversionResult]:
+        """Convert jobs on a pool of warm worker processes, window files at a time."""
+        loop = asyncio.get_running_loop()
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_initialize_worker,
+            initargs=(self.config, self.plan)
+        ) as executor:
+            results = self._iter_window(
+                jobs,
+                lambda job: loop.run_in_executor(executor, _convert_job, *job),
+                lambda batch: loop.run_in_executor(executor, _convert_batch_job, batch)
+            )
+            try:
+                async for result in results:
+                    yield result
+            finally:
+                await results.aclose()
+
+    async def _iter_supervised(
+        self,
+        jobs: Iterator[Union[Job, ConversionResult]],
+        workers: int,
+        budget: ResourceBudget
+    ) -> AsyncIterator[ConversionResult]:
+        """Convert jobs on supervised worker processes that are killed when a file exceeds the budget."""
+        with SupervisedPool(workers, self.config, self.plan, budget) as pool:
+            results = self._iter_window(jobs, lambda job: asyncio.wrap_future(pool.submit(job)))
+            try:
+                async for result in results:
+                    yield result
+            finally:
+                await results.aclose()
+
+    async def _iter_window(
+        self,
+        jobs: Iterator[Union[Job, ConversionResult]],
+        submit: Callable[[Job], "asyncio.Future[Tuple[Optional[SlateQuillError], float]]"],
+        submit_batch: Optional[Callable[[List[Job]], "asyncio.Future[List[Tuple[Optional[SlateQuillError], float]]]"]] = None
+    ) -> AsyncIterator[ConversionResult]:
+        """
+        Run jobs with submit, keeping window files in flight, in the configured schedule.
+
+        With submit_batch, jobs of converters that convert documents in
+        batches are grouped and run with it.
+        """
+        performance = self.config.performance
+        scheduler: Optional[LargestFirstScheduler] = None
+        if performance.schedule == "largest_first":
+            scheduler = LargestFirstScheduler(performance.schedule_window or self.window, self.estimate)
+            jobs = scheduler.order(jobs)
+        # Scheduling overhead not yet attributed to a result
+        reported = 0.0
+
+        items: Iterator[Union[Job, List[Job], ConversionResult]] = jobs
+        if submit_batch is not None:
+            items = _batch_jobs(jobs)
+        # Scanning, ordering and batching happen on a thread
+        feed = JobFeed(items)
+
+        # Jobs of each future, and whether it is a batch
+        in_flight: Dict["asyncio.Future[Any]", Tuple[List[Job], bool]] = {}
+        files = 0
+        try:
+            while True:
+                while files < self.window and not feed.exhausted:
+                    for item in await feed.take(self.window - files):
+                        if isinstance(item, ConversionResult):
+                            yield item
+                        elif isinstance(item, list):
+                            assert submit_batch is not None
+                            in_flight[submit_batch(item)] = (item, True)
+                            files += len(item)
+                        else:
+                            in_flight[submit(item)] = ([item], False)
+                            files += 1
+
+                if not in_flight:
+                    break
+
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    batch, batched = in_flight.pop(future)
+                    files -= len(batch)
+                    scheduling = 0.0
+                    if scheduler is not None:
+                        scheduling, reported = scheduler.overhead - reported, scheduler.overhead
+                    exception = future.exception()
+                    if exception is None:
+                        outcomes = future.result() if batched else [future.result()]
+                        for job, (error, seconds) in zip(batch, outcomes):
+                            yield _result(job, error, seconds, scheduling)
+                            scheduling = 0.0
+                    else:
+                        # The worker itself died (e.g. BrokenProcessPool)
+                        for job in batch:
+                            error = ConversionError(f"Worker failed while converting {job[0]}: {exception}")
+                            yield _result(job, error, scheduling=scheduling)
+                            scheduling = 0.0
+        finally:
+            for future in in_flight:
+                future.cancel()
@@ -15,6 +15,10 @@ class SlateQuillError(Exception):
         super().__init__(message)
         self.message = message
         self.details = details or {}
+    
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Keep details intact when errors cross process boundaries
+        return (self.__class__, (self.message, self.details))
 
 
 class ConversionError(SlateQuillError):
@@ -45,3 +49,8 @@ class ConfigurationError(SlateQuillError):
 class FileProcessingError(SlateQuillError):
     """Raised when file processing fails."""
     pass
+
+
+class ServerBusyError(SlateQuillError):
+    """Raised when the conversion server has no room for more requests."""
+    pass
@@ -0,0 +1,350 @@
+"""
+SlateQuill asynchronous file I/O.
+
+This module keeps file system access off the event loop. Inputs and outputs
+are read and written with aiofiles. During a batch, upcoming inputs are read
+ahead while earlier ones are converting, and outputs are handed to a bounded
+background writer, so that disk latency overlaps with conversion work. The
+job iterators of a batch, which scan directories and stat inputs, are
+advanced on a thread as well.
+"""
+
+import asyncio
+from collections import deque
+from contextlib import suppress
+import errno
+import itertools
+import mmap
+import os
+from pathlib import Path
+import shutil
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple, Union
+
+import aiofiles
+import aiofiles.os
+
+from .exceptions import ConversionError, SlateQuillError
+from .profiling import current_file, span
+
+
+async def read_file(path: Path) -> bytes:
+    """
+    Read a file without blocking the event loop.
+
+    Raises:
+        ConversionError: If the file cannot be read
+    """
+    try:
+        async with aiofiles.open(path, "rb") as f:
+            return await f.read()
+    except OSError as e:
+        raise ConversionError(f"Failed to read input file: {e}")
+
+
+async def read_input(path: Path, mmap_threshold: int = 0) -> Union[bytes, mmap.mmap]:
+    """
+    Read an input file, memory-mapping it if it has at least mmap_threshold bytes.
+
+    A mapped file is decoded straight from the page cache instead of being
+    copied into a bytes object first. The caller must close returned mmaps
+    (see release_input).
+
+    Raises:
+        ConversionError: If the file cannot be read
+    """
+    if mmap_threshold > 0:
+        try:
+            size = (await aiofiles.os.stat(path)).st_size
+        except OSError as e:
+            raise ConversionError(f"Failed to read input file: {e}")
+        if size >= mmap_threshold:
+            try:
+                return await asyncio.to_thread(_map_file, path)
+            except (OSError, ValueError) as e:
+                raise ConversionError(f"Failed to read input file: {e}")
+    return await read_file(path)
+
+
+def _map_file(path: Path) -> mmap.mmap:
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def release_input(content: object) -> None:
+    """Close content returned by read_input if it is a memory-mapped file."""
+    if isinstance(content, mmap.mmap):
+        content.close()
+
+
+async def read_text(path: Path) -> str:
+    """
+    Read a UTF-8 text file (with universal newlines) without blocking the event loop.
+
+    Raises:
+        ConversionError: If the file cannot be read or decoded
+    """
+    try:
+        async with aiofiles.open(path, "r", encoding="utf-8") as f:
+            return await f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        raise ConversionError(f"Failed to read input file: {e}")
+
+
+async def write_file(path: Path, text: str) -> None:
+    """
+    Write a UTF-8 text file without blocking the event loop.
+
+    Parent directories are created as needed. An existing file that shares
+    its data with other outputs (see link_file) is replaced rather than
+    overwritten.
+
+    Raises:
+        ConversionError: If the file cannot be written
+    """
+    try:
+        await aiofiles.os.makedirs(path.parent, exist_ok=True)
+        await asyncio.to_thread(unshare_file, path)
+        async with aiofiles.open(path, "w", encoding="utf-8") as f:
+            await f.write(text)
+    except OSError as e:
+        raise ConversionError(f"Failed to write output file: {e}")
+
+
+def unshare_file(path: Path) -> None:
+    """Remove path if it is a hard link, so that writing it leaves the other links intact."""
+    try:
+        if os.stat(path).st_nlink > 1:
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+# Linux ioctl cloning a file's extents (reflink) on copy-on-write file systems
+_FICLONE = 0x40049409
+
+
+def link_file(source: Path, target: Path, method: str = "reflink") -> None:
+    """
+    Make target a file with the content of source.
+
+    Methods:
+        reflink: Clone source where the file system supports it (btrfs, XFS,
+            ...), otherwise copy it
+        hardlink: Hard-link target to source; both then share one file
+        copy: Copy source
+
+    The target is replaced atomically and its parent directories are
+    created as needed.
+
+    Raises:
+        OSError: If the file cannot be linked or copied
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        if method == "hardlink":
+            os.link(source, tmp_path)
+        elif method == "reflink":
+            try:
+                _clone_file(source, tmp_path)
+            except OSError:
+                shutil.copyfile(source, tmp_path)
+        else:
+            shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, target)
+    except BaseException:
+        with suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+def _clone_file(source: Path, target: Path) -> None:
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError(errno.EOPNOTSUPP, "Cloning files is not supported on this platform")
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+
+
+# (input_path, output_path) of a batch
+Job = Tuple[Path, Path]
+
+
+class SizedJob(tuple):
+    """A job whose input size is already known, e.g. from the directory scan."""
+
+    size: int
+
+    def __new__(cls, input_path: Path, output_path: Path, size: int) -> "SizedJob":
+        job = super().__new__(cls, (input_path, output_path))
+        job.size = size
+        return job
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (SizedJob, (self[0], self[1], self.size))
+
+
+def input_size(job: Job) -> int:
+    """
+    Size of the input file of a job, without a stat call if it is a SizedJob.
+
+    Raises:
+        OSError: If the file cannot be stat'ed
+    """
+    size = getattr(job, "size", None)
+    return size if size is not None else os.stat(job[0]).st_size
+
+
+class JobFeed:
+    """
+    Pull items from a job iterator without blocking the event loop.
+
+    Job iterators scan directories and stat or hash inputs on the way (see
+    SlateQuill.scanner and SlateQuill.dedup), so take() advances them on a
+    thread, a chunk of items at a time. The iterator is never advanced by
+    two threads at once.
+    """
+
+    def __init__(self, jobs: Iterable[Any]) -> None:
+        self._jobs = iter(jobs)
+        self.exhausted = False
+
+    async def take(self, count: int) -> List[Any]:
+        """Return the next count items, or fewer once the iterator is exhausted."""
+        if self.exhausted or count <= 0:
+            return []
+        return await asyncio.to_thread(self._pull, count)
+
+    def _pull(self, count: int) -> List[Any]:
+        items = list(itertools.islice(self._jobs, count))
+        if len(items) < count:
+            self.exhausted = True
+        return items
+
+
+class ReadAhead:
+    """
+    Read the inputs of a batch ahead of their conversion.
+
+    Iterating over a ReadAhead yields (job, content) pairs for (input_path,
+    output_path) jobs, pulled lazily from the job iterable. While a job is
+    being converted, the inputs of the next window jobs are read in the
+    background. Files of max_size bytes or more are not read ahead (they are
+    streamed or memory-mapped), and neither are files that fail to read;
+    their content is None and the caller reads them itself, reporting errors
+    as usual. Items that are not jobs are passed through with None content.
+    """
+
+    def __init__(self, jobs: Iterable[Any], window: int = 4, max_size: Optional[int] = None) -> None:
+        self.window = max(window, 0)
+        self.max_size = max_size
+        self._jobs = JobFeed(jobs)
+        self._pending: Deque[Tuple[Any, "Optional[asyncio.Task[Optional[bytes]]]"]] = deque()
+
+    def __aiter__(self) -> "ReadAhead":
+        return self
+
+    async def __anext__(self) -> Tuple[Any, Optional[bytes]]:
+        await self._schedule()
+        if not self._pending:
+            raise StopAsyncIteration
+        job, task = self._pending.popleft()
+        # Keep the window full while this job is converted
+        await self._schedule()
+        return job, (await task if task is not None else None)
+
+    def close(self) -> None:
+        """Cancel reads that are no longer needed."""
+        for _, task in self._pending:
+            if task is not None:
+                task.cancel()
+        self._pending.clear()
+
+    async def _schedule(self) -> None:
+        for job in await self._jobs.take(self.window + 1 - len(self._pending)):
+            task = asyncio.ensure_future(self._read(job[0])) if isinstance(job, tuple) else None
+            self._pending.append((job, task))
+
+    async def _read(self, path: Path) -> Optional[bytes]:
+        try:
+            if self.max_size is not None and (await aiofiles.os.stat(path)).st_size >= self.max_size:
+                return None
+            with span("read", path):
+                return await read_file(path)
+        except (OSError, SlateQuillError):
+            return None
+
+
+class BackgroundWriter:
+    """
+    Write outputs on a background task.
+
+    submit() only waits while max_pending outputs are already queued, which
+    bounds the memory held by finished but unwritten conversions. Failed
+    writes are collected in errors, keyed by output path. Outputs are
+    written in the order they were submitted; on_written, if given, is
+    called with the path and the error (or None) of each finished write.
+    """
+
+    def __init__(
+        self,
+        max_pending: int = 16,
+        on_written: Optional[Callable[[Path, Optional[SlateQuillError]], None]] = None
+    ) -> None:
+        self.max_pending = max(max_pending, 1)
+        self.on_written = on_written
+        self.errors: Dict[Path, SlateQuillError] = {}
+        # Number of outputs submitted so far
+        self.submitted = 0
+        self._queue: "Optional[asyncio.Queue[Optional[Tuple[Path, str, Optional[Path]]]]]" = None
+        self._task: "Optional[asyncio.Task[None]]" = None
+
+    async def __aenter__(self) -> "BackgroundWriter":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        """Start the writer task on the running event loop."""
+        if self._task is None:
+            self._queue = asyncio.Queue(self.max_pending)
+            self._task = asyncio.ensure_future(self._run())
+
+    async def submit(self, path: Path, text: str) -> None:
+        """Queue an output for writing."""
+        self.start()
+        assert self._queue is not None
+        self.errors.pop(path, None)
+        self.submitted += 1
+        # The write is timed for the file being converted now
+        await self._queue.put((path, text, current_file()))
+
+    async def close(self) -> None:
+        """Write all queued outputs and stop the writer task."""
+        if self._task is None or self._queue is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            path, text, source = item
+            error: Optional[SlateQuillError] = None
+            try:
+                with span("write", source):
+                    await write_file(path, text)
+            except SlateQuillError as e:
+                self.errors[path] = error = e
+            except Exception as e:
+                # E.g. text that can't be encoded; the other outputs are still written
+                self.errors[path] = error = ConversionError(f"Failed to write output file: {e}")
+            if self.on_written is not None:
+                self.on_written(path, error)
@@ -6,20 +6,44 @@ with support for various HTML elements and structures.
 """
 
 import asyncio
-from typing import Any, Dict, Optional
+import codecs
+import functools
+from pathlib import Path
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from bs4 import BeautifulSoup
-from markdownify import markdownify as md
+import aiofiles.os
+from bs4 import BeautifulSoup, Comment, Doctype, NavigableString, PageElement, Tag
+from markdownify import MarkdownConverter
 
-from .config import ConversionConfig
-from .exceptions import ConversionError
-from .security import validate_input, SecurityConfig
+from .charset import PRESCAN_BYTES, decode_html, detect_encoding
+from .config import Config, ConversionConfig, PerformanceConfig
+from .exceptions import ConversionError, SecurityError
+from .fileio import read_file, unshare_file, write_file
+from .parsers import DEFAULT_PARSER, incremental_parser, parse_html
+from .plan import ConversionPlan, compile_plan
+from .postprocess import MarkdownPostProcessor
+from .profiling import span
+from .security import sanitize_tree, validate_input, SecurityConfig
 
 
 async def html_to_markdown(
     html_content: str,
     config: Optional[ConversionConfig] = None,
-    options: Optional[Dict[str, Any]] = None
+    options: Optional[Dict[str, Any]] = None,
+    security_config: Optional[SecurityConfig] = None,
+    plan: Optional[ConversionPlan] = None
+) -> str:
+    """Convert HTML content to Markdown (see html_to_markdown_sync)."""
+    return html_to_markdown_sync(html_content, config, options, security_config, plan)
+
+
+def html_to_markdown_sync(
+    html_content: str,
+    config: Optional[ConversionConfig] = None,
+    options: Optional[Dict[str, Any]] = None,
+    security_config: Optional[SecurityConfig] = None,
+    plan: Optional[ConversionPlan] = None
 ) -> str:
     """
     Convert HTML content to Markdown.
@@ -28,98 +52,584 @@ async def html_to_markdown(
         html_content: HTML content to convert
         config: Conversion configuration
         options: Additional conversion options
+        security_config: If given, the document is sanitized on the parsed tree
+            (single-parse pipeline) instead of being expected pre-sanitized
+        plan: Compiled conversion plan; replaces config and security_config
+            (see compile_plan)
     
     Returns:
         Markdown string
     
     Raises:
         ConversionError: If conversion fails
+        ConfigurationError: If the configured parser is not installed
     """
-    if config is None:
-        config = ConversionConfig()
-    
-    if options is None:
-        options = {}
+    if plan is None:
+        if isinstance(config, dict):
+            # config was passed as dict, convert it
+            config = ConversionConfig(**config)
+        plan = _plan_for(config, security_config)
     
-    # If options is passed instead of config, handle it
-    if isinstance(options, dict) and hasattr(config, 'preserve_html'):
-        # config is actually the config object, options might override it
-        pass
-    elif isinstance(config, dict):
-        # config was passed as dict, convert it
-        config = ConversionConfig(**config)
+    conversion = plan.conversion
     
     try:
-        # Parse HTML with BeautifulSoup
-        soup = BeautifulSoup(html_content, 'html.parser')
+        # Parse HTML with the configured backend
+        with span('parse'):
+            soup = parse_html(html_content, plan.parser)
+        
+        with span('prepare'):
+            _prepare_tree(soup, plan)
         
-        # Remove script and style tags if not preserving HTML
-        if not config.preserve_html:
-            for tag in soup(['script', 'style']):
-                tag.decompose()
+        # Sanitize on the same tree rather than in a separate bleach pass
+        if plan.single_parse:
+            with span('sanitize'):
+                sanitize_tree(soup, plan.security)
         
-        # Remove comments if configured
-        if config.strip_comments:
-            for comment in soup.find_all(string=lambda text: isinstance(text, type(soup.find_all(string=True)[0])) and text.strip().startswith('<!--')):
-                comment.extract()
+        # Convert to markdown straight from the tree (no serialize/re-parse)
+        with span('emit'):
+            if plan.emitter is None:
+                fragments = [MarkdownConverter(**dict(plan.markdownify_options)).convert_soup(soup)]
+            else:
+                fragments = plan.emitter.emit_fragments(soup)
+        
+        # Clean whitespace and wrap lines as configured, in one pass
+        with span('post_process'):
+            post = MarkdownPostProcessor(conversion.clean_whitespace, conversion.line_length)
+            return post.process(fragments)
+        
+    except Exception as e:
+        raise ConversionError(f"Failed to convert HTML to Markdown: {e}")
+
+
+def _plan_for(
+    config: Optional[ConversionConfig],
+    security_config: Optional[SecurityConfig]
+) -> ConversionPlan:
+    """Compile the plan for callers that pass configurations instead of a plan."""
+    return compile_plan(Config(
+        conversion=config or ConversionConfig(),
+        security=security_config or SecurityConfig(),
+        performance=PerformanceConfig(single_parse=security_config is not None),
+    ))
+
+
+def _prepare_tree(soup: BeautifulSoup, plan: ConversionPlan) -> None:
+    """Remove content that never reaches the Markdown output."""
+    # Remove script and style tags if not preserving HTML
+    if plan.strip_tags:
+        for tag in soup(plan.strip_tags):
+            tag.decompose()
+    
+    # Remove comments if configured
+    if plan.conversion.strip_comments:
+        for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+            comment.extract()
+
+
+# Tags whose whitespace-only text children are dropped (as markdownify does)
+_NESTED_TAGS = frozenset([
+    'ol', 'ul', 'li', 'table', 'thead', 'tbody', 'tfoot', 'tr', 'td', 'th'
+])
+
+_SKIPPED_STRINGS = (Comment, Doctype)
+
+_HEADING_TAG_RE = re.compile(r'h(\d+)')
+_INLINE_HEADING_RE = re.compile(r'h[1-6]')
+_LINE_BEGINNING_RE = re.compile(r'^', re.MULTILINE)
+_WHITESPACE_RE = re.compile(r'[\t ]+')
+
+
+def _chomp(text: str) -> Tuple[str, str, str]:
+    """Split surrounding spaces off inline text so markup hugs the content."""
+    prefix = ' ' if text and text[0] == ' ' else ''
+    suffix = ' ' if text and text[-1] == ' ' else ''
+    return prefix, suffix, text.strip()
+
+
+class MarkdownEmitter:
+    """
+    Tree-walking Markdown emitter.
+    
+    Walks a parsed BeautifulSoup tree and appends Markdown fragments to a list
+    that is joined once at the end, instead of serializing the tree and handing
+    it to markdownify. For the github flavor the output is identical to
+    markdownify's; commonmark and strict leave out the GitHub extensions
+    (tables are kept as raw HTML, strikethrough markers are dropped).
+    """
+    
+    def __init__(self, config: Optional[ConversionConfig] = None) -> None:
+        if config is None:
+            config = ConversionConfig()
         
-        # Convert to markdown
-        markdown_content = md(
-            str(soup),
-            heading_style=config.heading_style,
-            bullets='-' if config.emphasis_style == 'asterisk' else '*',
-            strip=['script', 'style'] if not config.preserve_html else None,
-        )
+        self.underline_headings = config.heading_style == 'setext'
+        self.em_symbol = '_' if config.emphasis_style == 'underscore' else '*'
+        self.strong_symbol = self.em_symbol * 2
+        self.bullet = '-' if config.emphasis_style == 'asterisk' else '*'
+        self.github = config.markdown_flavor == 'github'
         
-        # Clean whitespace if configured
-        if config.clean_whitespace:
-            markdown_content = _clean_whitespace(markdown_content)
+        self._handlers: Dict[str, Callable[..., None]] = {
+            'a': self._emit_a,
+            'b': self._emit_strong,
+            'strong': self._emit_strong,
+            'em': self._emit_em,
+            'i': self._emit_em,
+            'del': self._emit_del,
+            's': self._emit_del,
+            'sub': self._emit_plain_inline,
+            'sup': self._emit_plain_inline,
+            'code': self._emit_code,
+            'kbd': self._emit_code,
+            'samp': self._emit_code,
+            'blockquote': self._emit_blockquote,
+            'br': self._emit_br,
+            'hr': self._emit_hr,
+            'img': self._emit_img,
+            'ul': self._emit_list,
+            'ol': self._emit_list,
+            'list': self._emit_list,
+            'li': self._emit_li,
+            'p': self._emit_p,
+            'pre': self._emit_pre,
+            'table': self._emit_table,
+            'td': self._emit_cell,
+            'th': self._emit_cell,
+            'tr': self._emit_tr,
+        }
+        # Bound methods and partials only, so that the emitter (and its plan) can be pickled
+        for level in range(1, 7):
+            self._handlers['h%d' % level] = functools.partial(self._emit_heading, level)
+    
+    def emit(self, node: Tag, start: int = 0, stop: Optional[int] = None) -> str:
+        """
+        Convert the children of node (usually the whole soup) to Markdown.
         
-        # Apply line length limit if configured
-        if config.line_length > 0:
-            markdown_content = _wrap_lines(markdown_content, config.line_length)
+        If start or stop are given, only the children in that slice are
+        converted; the others stay in place as sibling context.
+        """
+        return ''.join(self.emit_fragments(node, start, stop))
+    
+    def emit_fragments(self, node: Tag, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        """Like emit, but return the Markdown as the list of emitted fragments."""
+        out: List[str] = []
+        self._emit_children(node, out, False, False, False, start, stop)
+        return out
+    
+    def _render(self, el: Tag, inline: bool, in_li: bool, is_li: bool = False) -> str:
+        """Render the children of el into a string for wrapping by a handler."""
+        buf: List[str] = []
+        self._emit_children(el, buf, inline, in_li, is_li)
+        return ''.join(buf)
+    
+    def _handler(self, name: str) -> Optional[Callable[..., None]]:
+        """Look up the handler for a tag name (h1, h2, ... included)."""
+        handler = self._handlers.get(name)
+        if handler is None and name[:1] == 'h':
+            # Headings beyond h6 are rare enough not to keep a handler for
+            match = _HEADING_TAG_RE.match(name)
+            if match:
+                return functools.partial(self._emit_heading, int(match.group(1)))
+        return handler
+    
+    def _emit_children(
+        self,
+        node: Tag,
+        out: List[str],
+        inline: bool,
+        in_li: bool,
+        is_li: bool,
+        start: int = 0,
+        stop: Optional[int] = None
+    ) -> None:
+        """Emit the children of node (from start up to stop) into out."""
+        name = node.name
+        if name in _NESTED_TAGS:
+            _strip_nested_whitespace(node)
         
-        return markdown_content
+        # Text handling depends only on the parent, so resolve it once
+        keep_whitespace = name == 'pre' or (name == 'code' and node.parent.name == 'pre')
+        escape = name != 'code' and name != 'pre'
+        child_in_li = in_li or is_li
         
+        children = node.contents if start == 0 and stop is None else node.contents[start:stop]
+        for index, el in enumerate(children, start):
+            if el.__class__ is not Tag and not isinstance(el, Tag):
+                if isinstance(el, _SKIPPED_STRINGS):
+                    continue
+                text = str(el)
+                if not keep_whitespace:
+                    text = _WHITESPACE_RE.sub(' ', text)
+                if escape and text:
+                    text = text.replace('*', r'\*').replace('_', r'\_')
+                if is_li:
+                    sibling = el.next_sibling
+                    if not sibling or sibling.name in ('ul', 'ol'):
+                        text = text.rstrip()
+                out.append(text)
+                continue
+            
+            handler = self._handler(el.name)
+            if handler is not None:
+                handler(el, out, inline, child_in_li, index)
+            else:
+                # Tags without Markdown syntax (div, span, ...) are transparent
+                self._emit_children(el, out, inline, child_in_li, False)
+    
+    def _emit_inline(self, markup: str, el: Tag, out: List[str], inline: bool, in_li: bool) -> None:
+        prefix, suffix, text = _chomp(self._render(el, inline, in_li))
+        if text:
+            out.append(f'{prefix}{markup}{text}{markup}{suffix}')
+    
+    def _emit_strong(self, el: Tag, out: List[str], inline: bool, in_li: bool, index: int) -> None:
+        self._emit_inline(self.strong_symbol, el, out, inline, in_li)
+    
+    def _emit_em(self, el: Tag, out: List[str], inline: bool, in_li: bool, index: int) -> None:
+        self._emit_inline(self.em_symbol, el, out, inline, in_li)
+    
+    def _emit_del(self, el: Tag, out: List[str], inline: bool, in_li: bool, index: int) -> None:
+        self._emit_inline('~~' if self.github else '', el, out, inline, in_li)
+    
+    def _emit_plain_inline(self, el: Tag, out: List[str], inline: bool, in_li: bool, index: int) -> None:
+        self._emit_inline('', el, out, inline, in_li)
+    
+    def _emit_code(self, el: Tag, out: List[str], inline: bool, in_li: bool, index: int) -> None:
+        if el.parent.name == 'pre':
+            self._emit_children(el, out, inline, in_li, False)
+        else:
+            self._emit_inline('`', el, out, inline, in_li)
+    
+    def _emit_a(self, el: Tag, out: List[str], inline: bool, in_li: bool, index: int) -> None:
+        prefix, suffix, text = _chomp(self._render(el, inline, in_li))
+        if not text:
+            return
+        href = el.get('href')
+        title = el.get('title')
+        if text.replace(r'\_', '_') == href and not title:
+            # Autolink shortcut syntax
+            out.append(f'<{href}>')
+            return
+        if not href:
+            out.append(text)
+            return
+        title_part = ' "%s"' % title.replace('"', r'\"') if title else ''
+        out.append(f'{prefix}[{text}]({href}{title_part}){suffix}')
+    
+    def _emit_blockquote(self, el: Tag, out: List[str], inline: bool, in_li: bool, index: int) -> None:
+        text = self._render(el, inline, in_li)
+        if inline:
+            out.append(text)
+        elif text:
+            out.append('\n' + _LINE_BEGINNING_RE.sub('> ', text) + '\n\n')
+    
+    def _emit_br(self, el: Tag, out: List[str], inline: bool, in_li: bool, index: int) -> None:
+        # Children of <br> (only possible in broken markup) are dropped, as in markdownify
+        if not inline:
+            out.append('  \n')
+    
+    def _emit_hr(self, el: Tag, out: List[str], inline: bool, in_li: bool, index: int) -> None:
+        out.append('\n\n---\n\n')
+    
+    def _emit_heading(self, level: int, el: Tag, out: List[str], inline: bool, in_li: bool, index: int) -> None:
+        # Only h1-h6 force inline content; deeper levels keep the context
+        text = self._render(el, inline or bool(_INLINE_HEADING_RE.match(el.name)), in_li)
+        if inline:
+            out.append(text)
+            return
+        text = text.rstrip()
+        if self.underline_headings and level <= 2:
+            if text:
+                out.append('%s\n%s\n\n' % (text, ('=' if level == 1 else '-') * len(text)))
+            return
+        out.append('%s %s\n\n' % ('#' * level, text))
+    
+    def _emit_img(self, el: Tag, out: List[str], inline: bool, in_li: bool, index: int) -> None:
+        alt = el.attrs.get('alt', None) or ''
+        if inline:
+            out.append(alt)
+            return
+        src = el.attrs.get('src', None) or ''
+        title = el.attrs.get('title', None) or ''
+        title_part = ' "%s"' % title.replace('"', r'\"') if title else ''
+        out.append(f'![{alt}]({src}{title_part})')
+    
+    def _emit_list(self, el: Tag, out: List[str], inline: bool, in_li: bool, index: int) -> None:
+        # Lists are always rendered as blocks, even in inline context
+        text = self._render(el, inline, in_li)
+        if in_li:
+            # Nested list: indent one level and drop the trailing newline
+            out.append('\n' + (_LINE_BEGINNING_RE.sub('\t', text) if text else '').rstrip())
+            return
+        sibling = el.next_sibling
+        out.append(text + ('\n' if sibling and sibling.name not in ('ul', 'ol') else ''))
+    
+    def _emit_li(self, el: Tag, out: List[str], inline: bool, in_li: bool, index: int) -> None:
+        text = self._render(el, inline, in_li, is_li=True)
+        parent = el.parent
+        if parent is not None and parent.name == 'ol':
+            start = parent.get('start')
+            bullet = '%s.' % ((int(start) if start else 1) + index)
+        else:
+            bullet = self.bullet
+        out.append('%s %s\n' % (bullet, text.strip()))
+    
+    def _emit_p(self, el: Tag, out: List[str], inline: bool, in_li: bool, index: int) -> None:
+        text = self._render(el, inline, in_li)
+        if inline:
+            out.append(text)
+        elif text:
+            out.append(text + '\n\n')
+    
+    def _emit_pre(self, el: Tag, out: List[str], inline: bool, in_li: bool, index: int) -> None:
+        text = self._render(el, inline, in_li)
+        if text:
+            out.append('\n```\n%s\n```\n' % text)
+    
+    def _emit_table(self, el: Tag, out: List[str], inline: bool, in_li: bool, index: int) -> None:
+        if not self.github:
+            # Pipe tables are a GitHub extension; keep the table as raw HTML
+            out.append('\n\n' + str(el) + '\n\n')
+            return
+        out.append('\n\n')
+        self._emit_children(el, out, inline, in_li, False)
+        out.append('\n')
+    
+    def _emit_cell(self, el: Tag, out: List[str], inline: bool, in_li: bool, index: int) -> None:
+        out.append(' ')
+        self._emit_children(el, out, True, in_li, False)
+        out.append(' |')
+    
+    def _emit_tr(self, el: Tag, out: List[str], inline: bool, in_li: bool, index: int) -> None:
+        text = self._render(el, inline, in_li)
+        cells = [d for d in el.descendants if d.name in ('td', 'th')]
+        first_row = not el.previous_sibling
+        if first_row and all(cell.name == 'th' for cell in cells):
+            # Header row: underline it
+            out.append('|' + text + '\n')
+            out.append('| ' + ' | '.join(['---'] * len(cells)) + ' |\n')
+            return
+        parent = el.parent
+        if first_row and (parent.name == 'table' or (parent.name == 'tbody' and not parent.previous_sibling)):
+            # First body row without a header: add an empty header row
+            out.append('| ' + ' | '.join([''] * len(cells)) + ' |\n')
+            out.append('| ' + ' | '.join(['---'] * len(cells)) + ' |\n')
+        out.append('|' + text + '\n')
+
+
+def _is_nested_node(el: Any) -> bool:
+    return el is not None and el.name in _NESTED_TAGS
+
+
+def _strip_nested_whitespace(node: Tag) -> None:
+    """Drop whitespace-only text between list/table structure elements."""
+    # Mirrors markdownify exactly, including iterating while extracting
+    for el in node.children:
+        if (isinstance(el, NavigableString)
+                and not str(el).strip()
+                and (not el.previous_sibling
+                     or not el.next_sibling
+                     or _is_nested_node(el.previous_sibling)
+                     or _is_nested_node(el.next_sibling))):
+            el.extract()
+
+
+# Elements that add no Markdown syntax of their own. While one of these is
+# still open, its completed children can already be converted and released.
+_STREAM_CONTAINERS = frozenset([
+    '[document]', 'html', 'body', 'div', 'main', 'article', 'section',
+    'header', 'footer', 'nav', 'aside'
+])
+
+
+def stream_html_to_markdown(
+    chunks: Iterable[str],
+    config: Optional[ConversionConfig] = None,
+    security_config: Optional[SecurityConfig] = None,
+    plan: Optional[ConversionPlan] = None
+) -> Iterator[str]:
+    """
+    Convert HTML to Markdown incrementally.
+    
+    The HTML is fed to the parser chunk by chunk. Whenever top-level blocks
+    (children of html, body, div, section, ...) are complete, they are
+    cleaned, sanitized, converted and released, so memory use is bounded by
+    the largest block rather than the document size. The output matches the
+    single-parse pipeline (html_to_markdown with security_config).
+    
+    Args:
+        chunks: Iterable of decoded HTML chunks
+        config: Conversion configuration
+        security_config: Security configuration used to sanitize each block
+        plan: Compiled conversion plan; replaces config and security_config
+            (blocks are sanitized if the plan is single_parse)
+    
+    Yields:
+        Markdown pieces, in document order
+    
+    Raises:
+        ConversionError: If conversion fails
+        ConfigurationError: If the configured parser is not installed
+    """
+    if plan is None:
+        plan = _plan_for(config, security_config)
+    
+    soup, parser = incremental_parser(plan.conversion.parser)
+    
+    try:
+        blocks = _StreamingBlocks(soup, plan)
+        post = MarkdownPostProcessor(plan.conversion.clean_whitespace, plan.conversion.line_length)
+        
+        for chunk in chunks:
+            parser.feed(chunk)
+            blocks.collect()
+            fragments = blocks.emit(final=False)
+            if fragments:
+                for fragment in fragments:
+                    post.write(fragment)
+                yield post.read()
+        
+        parser.close()
+        soup.endData()
+        while soup.currentTag is not None and soup.currentTag.name != soup.ROOT_TAG_NAME:
+            soup.popTag()
+        
+        blocks.collect()
+        for fragment in blocks.emit(final=True):
+            post.write(fragment)
+        yield post.read() + post.finish()
+        
+    except ConversionError:
+        raise
     except Exception as e:
         raise ConversionError(f"Failed to convert HTML to Markdown: {e}")
 
 
-def _clean_whitespace(content: str) -> str:
-    """Clean extra whitespace from markdown content."""
-    import re
+class _StreamingBlocks:
+    """
+    Completed top-level blocks of a document that is still being parsed.
     
-    # Remove excessive blank lines (more than 2 consecutive)
-    content = re.sub(r'\n\s*\n\s*\n', '\n\n', content)
+    Blocks are moved out of the parse tree into a detached holder element,
+    where they are cleaned, sanitized and converted. The most recently
+    collected block is only converted once the next one arrives, and the
+    last converted block is kept as the previous sibling of the next ones,
+    since list and table output depend on their siblings.
+    """
     
-    # Remove trailing whitespace from lines
-    content = re.sub(r'[ \t]+$', '', content, flags=re.MULTILINE)
+    def __init__(self, soup: BeautifulSoup, plan: ConversionPlan) -> None:
+        self.soup = soup
+        self.plan = plan
+        # Blocks are always converted with the native emitter
+        self.emitter = plan.emitter or MarkdownEmitter(plan.conversion)
+        self.holder = soup.new_tag('div')
+        # Whether the first child of holder is an already converted block
+        self._has_context = False
     
-    # Remove leading/trailing whitespace from entire content
-    content = content.strip()
+    def collect(self) -> None:
+        """Move completed blocks under open container elements into the holder."""
+        stack = self.soup.tagStack
+        moved = False
+        depth = 0
+        while depth < len(stack) and stack[depth].name in _STREAM_CONTAINERS:
+            container = stack[depth]
+            open_child = stack[depth + 1] if depth + 1 < len(stack) else None
+            
+            # The open child is always the last child of its container
+            completed = container.contents[:-1] if open_child is not None else list(container.contents)
+            for el in completed:
+                self.holder.append(el)
+                moved = True
+            
+            if open_child is None or open_child.name not in _STREAM_CONTAINERS:
+                break
+            depth += 1
+        
+        if moved:
+            # The parser links the next element to the most recently parsed
+            # one, which may just have been moved out; point it at what is left
+            last: PageElement = self.soup
+            while isinstance(last, Tag) and last.contents:
+                last = last.contents[-1]
+            self.soup._most_recent_element = last
     
-    return content
+    def emit(self, final: bool) -> List[str]:
+        """Convert collected blocks and release all but the last one (as Markdown fragments)."""
+        holder = self.holder
+        if not holder.contents:
+            return []
+        
+        # Both passes are idempotent, so re-running them on the kept blocks is harmless
+        _prepare_tree(holder, self.plan)
+        if self.plan.single_parse:
+            sanitize_tree(holder, self.plan.security)
+        
+        start = 1 if self._has_context else 0
+        stop = len(holder.contents) if final else len(holder.contents) - 1
+        if stop <= start:
+            return []
+        
+        fragments = self.emitter.emit_fragments(holder, start, stop)
+        for el in holder.contents[:stop - 1]:
+            el.decompose()
+        self._has_context = True
+        return fragments
 
 
-def _wrap_lines(content: str, max_length: int) -> str:
-    """Wrap lines to specified maximum length."""
-    import textwrap
+def stream_html_file(
+    input_path: Path,
+    output_path: Path,
+    config: Optional[ConversionConfig] = None,
+    security_config: Optional[SecurityConfig] = None,
+    chunk_size: int = 1 << 16,
+    plan: Optional[ConversionPlan] = None
+) -> int:
+    """
+    Convert an HTML file to a Markdown file with bounded memory.
     
-    lines = content.split('\n')
-    wrapped_lines = []
+    The encoding is detected from the first bytes of the file (see
+    SlateQuill.charset); undeclared files must be valid UTF-8, since a
+    fallback can't be applied to output that was already written.
     
-    for line in lines:
-        # Don't wrap code blocks or headings
-        if line.startswith(('```', '    ', '#')):
-            wrapped_lines.append(line)
-        elif len(line) <= max_length:
-            wrapped_lines.append(line)
-        else:
-            # Wrap long lines
-            wrapped = textwrap.fill(line, width=max_length, break_long_words=False)
-            wrapped_lines.append(wrapped)
+    Args:
+        input_path: Path to the HTML file
+        output_path: Path to the Markdown file to write
+        config: Conversion configuration
+        security_config: Security configuration used to sanitize each block
+        chunk_size: Number of bytes read per chunk
+        plan: Compiled conversion plan; replaces config and security_config
     
-    return '\n'.join(wrapped_lines)
+    Returns:
+        Number of characters written
+    
+    Raises:
+        ConversionError: If reading, converting or writing fails
+        SecurityError: If the file is not valid in its encoding
+    """
+    def read_chunks() -> Iterator[str]:
+        encoding = 'utf-8'
+        try:
+            with open(input_path, 'rb') as f:
+                head = f.read(max(chunk_size, PRESCAN_BYTES))
+                encoding, bom_length, _ = detect_encoding(head)
+                decoder = codecs.getincrementaldecoder(encoding)(errors='strict')
+                yield decoder.decode(head[bom_length:])
+                for data in iter(lambda: f.read(chunk_size), b''):
+                    yield decoder.decode(data)
+                yield decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            raise SecurityError(f"Content contains invalid {encoding} encoding")
+        except OSError as e:
+            raise ConversionError(f"Failed to read input file: {e}")
+    
+    written = 0
+    try:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        unshare_file(output_path)
+        with open(output_path, 'w', encoding='utf-8') as out:
+            for markdown in stream_html_to_markdown(read_chunks(), config, security_config, plan):
+                out.write(markdown)
+                written += len(markdown)
+    except OSError as e:
+        raise ConversionError(f"Failed to write output file: {e}")
+    
+    return written
 
 
 async def convert_html_file(
@@ -140,37 +650,27 @@ async def convert_html_file(
     Returns:
         Markdown content
     """
-    from pathlib import Path
-    
     input_path = Path(file_path)
     
-    if not input_path.exists():
+    if not await aiofiles.os.path.exists(input_path):
         raise ConversionError(f"Input file not found: {file_path}")
     
     if security_config is None:
         security_config = SecurityConfig()
     
     # Read and validate input
-    try:
-        with open(input_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-    except Exception as e:
-        raise ConversionError(f"Failed to read input file: {e}")
+    html_content = decode_html(await read_file(input_path))
     
     # Validate input for security
-    validated_content = validate_input(html_content, input_path, security_config)
+    validated_content = validate_input(
+        html_content, input_path, security_config, parser=config.parser if config else DEFAULT_PARSER
+    )
     
     # Convert to markdown
     markdown_content = await html_to_markdown(validated_content, config)
     
     # Write output if path specified
     if output_path:
-        output_file = Path(output_path)
-        try:
-            output_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
-        except Exception as e:
-            raise ConversionError(f"Failed to write output file: {e}")
+        await write_file(Path(output_path), markdown_content)
     
     return markdown_content
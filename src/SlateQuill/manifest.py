@@ -0,0 +1,166 @@
+"""
+SlateQuill build manifest.
+
+This module keeps track of what a directory conversion produced, so that
+incremental runs can skip inputs whose content and configuration are
+unchanged and detect outputs whose inputs were deleted. The time each file
+took is kept too, to schedule the next run (see SlateQuill.scheduler).
+"""
+
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from . import __version__
+from .exceptions import FileProcessingError
+
+MANIFEST_NAME = ".slatequill-manifest.json"
+MANIFEST_FORMAT = 1
+
+
+@dataclass
+class ManifestEntry:
+    """What is known about one converted input file."""
+
+    size: int
+    mtime_ns: int
+    sha256: str
+    output: str
+    output_size: int
+    output_sha256: str
+    # Seconds the conversion took (0 if unknown, e.g. for reused duplicate outputs)
+    seconds: float = 0.0
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    Manifest of a directory conversion, stored in the output directory.
+
+    Entries are keyed by the input path relative to the input directory. The
+    configuration fingerprint is stored alongside; a different fingerprint
+    invalidates every entry.
+    """
+
+    def __init__(self, path: Path, fingerprint: str) -> None:
+        self.path = path
+        self.fingerprint = fingerprint
+        self.entries: Dict[str, ManifestEntry] = {}
+
+    @classmethod
+    def load(cls, output_dir: Path, fingerprint: str, name: str = MANIFEST_NAME) -> "BuildManifest":
+        """Load the manifest from output_dir (an empty one if missing or stale)."""
+        manifest = cls(output_dir / name, fingerprint)
+        try:
+            with open(manifest.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return manifest
+        except (OSError, ValueError) as e:
+            raise FileProcessingError(f"Failed to read build manifest {manifest.path}: {e}")
+
+        if data.get("format") != MANIFEST_FORMAT or data.get("fingerprint") != fingerprint:
+            # Converted with other settings (or an older format): rebuild everything
+            return manifest
+
+        manifest.entries = {
+            rel_path: ManifestEntry(**entry) for rel_path, entry in data.get("entries", {}).items()
+        }
+        return manifest
+
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        data = {
+            "format": MANIFEST_FORMAT,
+            "version": __version__,
+            "fingerprint": self.fingerprint,
+            "entries": {rel_path: asdict(entry) for rel_path, entry in sorted(self.entries.items())},
+        }
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            raise FileProcessingError(f"Failed to write build manifest {self.path}: {e}")
+
+    def is_unchanged(self, rel_path: str, input_path: Path, input_stat: os.stat_result, output_path: Path) -> bool:
+        """
+        Check whether an input can be skipped.
+
+        The common case is decided by stat alone: same size and mtime as
+        recorded, and the recorded output still present with its size. If
+        only the mtime changed, the content hash decides (and the entry is
+        refreshed so later runs are stat-only again).
+        """
+        entry = self.entries.get(rel_path)
+        if entry is None or entry.size != input_stat.st_size or entry.output != str(output_path):
+            return False
+
+        try:
+            if output_path.stat().st_size != entry.output_size:
+                return False
+        except OSError:
+            return False
+
+        if entry.mtime_ns == input_stat.st_mtime_ns:
+            return True
+
+        # Touched but possibly identical content
+        if file_digest(input_path) != entry.sha256:
+            return False
+        entry.mtime_ns = input_stat.st_mtime_ns
+        return True
+
+    def record(self, rel_path: str, input_path: Path, output_path: Path, seconds: Optional[float] = None) -> None:
+        """Record a freshly converted input and its output, and the seconds the conversion took."""
+        input_stat = input_path.stat()
+        self.entries[rel_path] = ManifestEntry(
+            size=input_stat.st_size,
+            mtime_ns=input_stat.st_mtime_ns,
+            sha256=file_digest(input_path),
+            output=str(output_path),
+            output_size=output_path.stat().st_size,
+            output_sha256=file_digest(output_path),
+            seconds=round(seconds, 6) if seconds is not None else 0.0,
+        )
+
+    def forget(self, rel_path: str) -> Optional[ManifestEntry]:
+        """Remove an entry, returning it if it existed."""
+        return self.entries.pop(rel_path, None)
+
+    def cost_estimator(self, input_dir: Path) -> Optional[Callable[[Path, int], float]]:
+        """
+        Estimate the seconds converting an input file of input_dir will take.
+
+        Files recorded with their time are assumed to take as long per byte
+        as last time; other files take the average time per byte of the
+        recorded ones. Returns None if no times were recorded.
+        """
+        timed = {rel_path: entry for rel_path, entry in self.entries.items() if entry.seconds > 0 and entry.size > 0}
+        if not timed:
+            return None
+        rate = sum(entry.seconds for entry in timed.values()) / sum(entry.size for entry in timed.values())
+
+        def estimate(input_path: Path, size: int) -> float:
+            try:
+                entry = timed.get(input_path.relative_to(input_dir).as_posix())
+            except ValueError:
+                entry = None
+            if entry is None:
+                return size * rate
+            return entry.seconds * size / entry.size
+
+        return estimate
@@ -0,0 +1,272 @@
+"""
+SlateQuill HTML parser backends.
+
+This module selects the BeautifulSoup tree builder used to parse HTML, so
+that every code path that builds a document tree honors the configured
+parser and produces the same tree for the same input.
+"""
+
+from functools import lru_cache
+import importlib.util
+import re
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence, Tuple
+
+from .exceptions import ConfigurationError
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+# Backends selectable in ConversionConfig.parser, besides "auto"
+PARSERS = ("html.parser", "lxml", "html5lib")
+
+# Default backend. lxml is faster but restructures some markup that
+# html.parser keeps (e.g. it closes <pre> before a nested list, which loses
+# the code block), so it is only used when selected, or chosen by "auto".
+DEFAULT_PARSER = "html.parser"
+
+# Backends "auto" picks from, by benchmark; html5lib is always the slowest
+# and is only used when selected explicitly
+_AUTO_CANDIDATES = ("lxml", "html.parser")
+
+# Backends that can be fed a document chunk by chunk (used for streaming)
+INCREMENTAL_PARSERS = ("html.parser", "lxml")
+
+# Modules that must be importable for each backend
+_PARSER_MODULES = {
+    "html.parser": "html.parser",
+    "lxml": "lxml.etree",
+    "html5lib": "html5lib",
+}
+
+# Whitespace-only strings outside these are collapsed, as bs4 does itself
+_PRESERVE_WHITESPACE_TAGS = frozenset(["pre", "textarea"])
+_ASCII_SPACES = frozenset("\x20\x0a\x09\x0c\x0d")
+
+# Markup that starts like a complete document rather than a fragment
+_DOCUMENT_START_RE = re.compile(r"\s*(?:<!--.*?-->\s*)*<(?:!doctype|\?xml|html|head|body)\b", re.I | re.S)
+
+_BENCHMARK_BLOCK = (
+    "<h2>Section</h2><p>Some <b>bold</b>, <i>italic</i> and <a href=\"https://example.com\">linked</a> "
+    "text.</p><ul><li>One</li><li>Two <code>code</code></li></ul>"
+    "<table><tr><th>A</th><th>B</th></tr><tr><td>1</td><td>2</td></tr></table>\n"
+)
+_BENCHMARK_SAMPLE = (
+    "<!DOCTYPE html><html><head><title>Sample</title></head><body>\n"
+    + _BENCHMARK_BLOCK * 50
+    + "</body></html>"
+)
+
+
+def _is_installed(parser: str) -> bool:
+    try:
+        return importlib.util.find_spec(_PARSER_MODULES[parser]) is not None
+    except ImportError:
+        return False
+
+
+@lru_cache(maxsize=None)
+def available_parsers() -> Tuple[str, ...]:
+    """Return the installed parser backends."""
+    return tuple(parser for parser in PARSERS if _is_installed(parser))
+
+
+@lru_cache(maxsize=None)
+def fastest_parser() -> str:
+    """Return the backend "auto" uses: the fastest candidate on this machine, measured once per process."""
+    candidates = [parser for parser in _AUTO_CANDIDATES if parser in available_parsers()]
+    if len(candidates) == 1:
+        return candidates[0]
+    throughput = benchmark_parsers(rounds=3, parsers=candidates)
+    return max(candidates, key=lambda parser: throughput[parser])
+
+
+def resolve_parser(name: str = DEFAULT_PARSER, incremental: bool = False) -> str:
+    """
+    Resolve a configured parser name to an installed backend.
+
+    Args:
+        name: Parser name from the configuration ("auto" or one of PARSERS);
+            "auto" is the faster of lxml and html.parser by benchmark (see
+            fastest_parser)
+        incremental: Whether the caller feeds the document in chunks; backends
+            that cannot do that fall back to the fastest one that can
+
+    Returns:
+        BeautifulSoup tree builder name
+
+    Raises:
+        ConfigurationError: If the parser is unknown or not installed
+    """
+    installed = available_parsers()
+    if name == "auto":
+        return fastest_parser()
+
+    if name not in PARSERS:
+        raise ConfigurationError(f"Unknown HTML parser: {name}. Must be one of {['auto', *PARSERS]}")
+    if name not in installed:
+        raise ConfigurationError(
+            f"HTML parser {name} is not installed",
+            {"available": ", ".join(installed)}
+        )
+
+    if incremental and name not in INCREMENTAL_PARSERS:
+        return resolve_parser("auto")
+    return name
+
+
+def parse_html(markup: str, parser: str = DEFAULT_PARSER) -> "BeautifulSoup":
+    """
+    Parse HTML with the configured backend.
+
+    The backends are evened out where they would otherwise convert
+    differently: html5lib keeps whitespace-only strings verbatim, while the
+    other tree builders collapse them to a single space or newline, and lxml
+    wraps text at the start of a fragment in an implied paragraph.
+
+    Args:
+        markup: HTML document
+        parser: Parser name ("auto" or one of PARSERS)
+
+    Returns:
+        Parsed document tree
+
+    Raises:
+        ConfigurationError: If the parser is unknown or not installed
+    """
+    from bs4 import BeautifulSoup
+
+    backend = resolve_parser(parser)
+    if backend == "lxml":
+        markup = lxml_markup(markup)
+    soup = BeautifulSoup(markup, backend)
+    if backend == "html5lib":
+        collapse_whitespace_strings(soup)
+    return soup
+
+
+def incremental_parser(parser: str = DEFAULT_PARSER) -> Tuple["BeautifulSoup", Any]:
+    """
+    Create an empty document and a parser that builds it chunk by chunk.
+
+    Args:
+        parser: Parser name ("auto" or one of PARSERS); backends that cannot
+            parse incrementally fall back to one that can
+
+    Returns:
+        The document and a parser with feed(str) and close() methods. After
+        close(), the caller still has to close any open tags of the document.
+
+    Raises:
+        ConfigurationError: If the parser is unknown or not installed
+    """
+    from bs4 import BeautifulSoup
+
+    backend = resolve_parser(parser, incremental=True)
+    soup = BeautifulSoup("", backend)
+
+    if backend == "lxml":
+        # The tree builder is the lxml parser target that populates soup;
+        # beautifulsoup4 detaches it once the (empty) initial parse is done
+        builder = soup.builder
+        builder.soup = soup
+        return soup, _LXMLFeedParser(builder.parser_for(None))
+
+    from bs4.builder._htmlparser import BeautifulSoupHTMLParser
+
+    args, kwargs = soup.builder.parser_args
+    try:
+        feed_parser = BeautifulSoupHTMLParser(soup, *args, **kwargs)
+    except TypeError:
+        # beautifulsoup4 < 4.13 sets the soup after construction
+        feed_parser = BeautifulSoupHTMLParser(*args, **kwargs)
+        feed_parser.soup = soup
+    return soup, feed_parser
+
+
+class _LXMLFeedParser:
+    """lxml feed parser that applies lxml_markup to the start of the document."""
+
+    # Enough of the document to tell a fragment from a complete document
+    _HEAD_SIZE = 1024
+
+    def __init__(self, parser: Any) -> None:
+        self._parser = parser
+        self._head: Optional[str] = ""
+
+    def feed(self, data: str) -> None:
+        if self._head is None:
+            self._parser.feed(data)
+            return
+        self._head += data
+        if len(self._head) >= self._HEAD_SIZE:
+            self._flush_head()
+
+    def close(self) -> None:
+        if self._head is not None:
+            self._flush_head()
+        self._parser.close()
+
+    def _flush_head(self) -> None:
+        head, self._head = self._head, None
+        if head:
+            self._parser.feed(lxml_markup(head))
+
+
+def lxml_markup(markup: str) -> str:
+    """
+    Prepare markup (or the first chunk of it) for lxml.
+
+    libxml2 wraps text that precedes the body in an implied <p>. Fragments
+    (such as sanitized HTML) are therefore given an explicit <body> first.
+    """
+    if _DOCUMENT_START_RE.match(markup):
+        return markup
+    return "<body>" + markup
+
+
+def collapse_whitespace_strings(soup: "BeautifulSoup") -> None:
+    """Replace whitespace-only strings with a single newline or space."""
+    from bs4 import NavigableString
+
+    for string in list(soup.find_all(string=True)):
+        if type(string) is not NavigableString or not string:
+            continue
+        if any(char not in _ASCII_SPACES for char in string):
+            continue
+        if any(parent.name in _PRESERVE_WHITESPACE_TAGS for parent in string.parents):
+            continue
+        collapsed = "\n" if "\n" in string else " "
+        if string != collapsed:
+            string.replace_with(NavigableString(collapsed))
+
+
+def benchmark_parsers(
+    sample: Optional[str] = None,
+    rounds: int = 5,
+    parsers: Optional[Sequence[str]] = None
+) -> Dict[str, float]:
+    """
+    Measure the throughput of the installed parser backends.
+
+    Args:
+        sample: HTML document to parse (a built-in sample if omitted)
+        rounds: Number of parses per backend; the fastest one is reported
+        parsers: Backends to measure (default: all installed)
+
+    Returns:
+        Mapping of backend name to parsed megabytes per second
+    """
+    if sample is None:
+        sample = _BENCHMARK_SAMPLE
+    size = len(sample.encode("utf-8")) / 1_000_000
+
+    results: Dict[str, float] = {}
+    for parser in parsers if parsers is not None else available_parsers():
+        best = float("inf")
+        for _ in range(max(rounds, 1)):
+            start = time.perf_counter()
+            parse_html(sample, parser)
+            best = min(best, time.perf_counter() - start)
+        results[parser] = size / best if best > 0 else float("inf")
+    return results
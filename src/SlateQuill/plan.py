@@ -0,0 +1,148 @@
+"""
+SlateQuill conversion plans.
+
+A conversion plan is a configuration compiled for converting many documents
+with the same settings: the parser backend is resolved, the Markdown
+emitter is built and the cache fingerprint is computed once, so converting
+a document only executes the plan. Plans are immutable and picklable; batch
+and server workers receive one plan up front instead of rebuilding it from
+the configuration for every file.
+"""
+
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from . import __version__
+from .config import Config, ConversionConfig, SecurityConfig
+from .parsers import resolve_parser
+
+if TYPE_CHECKING:
+    from .html2md import MarkdownEmitter
+
+
+@dataclass(frozen=True)
+class ConversionPlan:
+    """
+    Conversion and security settings compiled for repeated use.
+
+    Build plans with compile_plan(). The configurations held by a plan are
+    private copies and must not be modified.
+    """
+
+    conversion: ConversionConfig
+    security: SecurityConfig
+    # Whether the converter sanitizes the parsed tree (single-parse pipeline)
+    # instead of receiving HTML sanitized by bleach
+    single_parse: bool
+    # Tree builder the parser name resolved to
+    parser: str
+    # Native emitter, or None if the markdownify emitter is configured
+    emitter: Optional["MarkdownEmitter"]
+    markdownify_options: Tuple[Tuple[str, Any], ...]
+    # Elements removed before conversion
+    strip_tags: Tuple[str, ...]
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Fingerprint of the settings that affect the output, for cache keys."""
+        return fingerprint_settings(self.conversion, self.security, self.single_parse)
+
+
+def fingerprint_settings(
+    conversion: ConversionConfig,
+    security: SecurityConfig,
+    single_parse: bool
+) -> str:
+    """
+    Fingerprint the configuration that affects conversion output.
+
+    The version of the conversion code (see code_version) is included so
+    that upgrades never serve results produced by an older converter.
+
+    Raises:
+        ConfigurationError: If the configured parser is not installed
+    """
+    data = {
+        "version": code_version(),
+        "conversion": conversion.model_dump(),
+        "security": security.model_dump(),
+        "single_parse": single_parse,
+        # "auto" can resolve differently depending on what is installed and the machine
+        "parser": resolve_parser(conversion.parser),
+    }
+    encoded = json.dumps(data, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    """
+    Version of the installed conversion code.
+
+    Releases are identified by the package version. A development install
+    (a source checkout rather than site-packages) changes without a version
+    bump, so the latest modification time of its modules is added.
+    """
+    package_dir = Path(__file__).parent
+    if {"site-packages", "dist-packages"} & set(package_dir.parts):
+        return __version__
+    return f"{__version__}+{source_mtime(package_dir)}"
+
+
+def source_mtime(directory: Path) -> int:
+    """Latest modification time of the Python modules below directory, in nanoseconds."""
+    latest = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(".py"):
+                try:
+                    latest = max(latest, os.stat(os.path.join(root, name)).st_mtime_ns)
+                except OSError:
+                    pass
+    return latest
+
+
+def compile_plan(config: Optional[Config] = None) -> ConversionPlan:
+    """
+    Compile a configuration into a conversion plan.
+
+    Args:
+        config: Configuration to compile (default: Config())
+
+    Returns:
+        Plan for converting documents with config
+
+    Raises:
+        ConfigurationError: If the configured parser is not installed
+    """
+    from .html2md import MarkdownEmitter
+
+    if config is None:
+        config = Config()
+    conversion = config.conversion.model_copy(deep=True)
+    security = config.security.model_copy(deep=True)
+    single_parse = config.performance.single_parse
+
+    markdownify_options: Dict[str, Any] = {}
+    if conversion.emitter == "markdownify":
+        markdownify_options = {
+            "heading_style": "underlined" if conversion.heading_style == "setext" else "atx",
+            "bullets": "-" if conversion.emphasis_style == "asterisk" else "*",
+            "strong_em_symbol": "_" if conversion.emphasis_style == "underscore" else "*",
+            "strip": ["script", "style"] if not conversion.preserve_html else None,
+        }
+
+    return ConversionPlan(
+        conversion=conversion,
+        security=security,
+        single_parse=single_parse,
+        parser=resolve_parser(conversion.parser),
+        emitter=MarkdownEmitter(conversion) if conversion.emitter == "native" else None,
+        markdownify_options=tuple(markdownify_options.items()),
+        strip_tags=() if conversion.preserve_html else ("script", "style"),
+    )
@@ -7,12 +7,31 @@ defining the interface for extensible format converters.
 
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Union
 
 
 class BaseConverter(ABC):
     """Abstract base class for all converters."""
     
+    # Converters that set this accept a full Config in convert() and sanitize
+    # the parsed document themselves (single-parse pipeline)
+    sanitizes_tree: bool = False
+    
+    # Converters that set this implement convert_stream() for large files
+    supports_streaming: bool = False
+    
+    # Converters that set this are passed a compiled ConversionPlan (see
+    # SlateQuill.plan) as options and as the config of convert_stream()
+    accepts_plan: bool = False
+    
+    # Converters that set this are passed the document as decoded by decode()
+    # instead of bytes, so it is only decoded once
+    accepts_text: bool = False
+    
+    # Converters that set this above 1 are given up to batch_size documents
+    # per convert_many() call by batch conversions on worker processes
+    batch_size: int = 1
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
         """Initialize the converter with optional configuration."""
         self.config = config or {}
@@ -27,11 +46,63 @@ class BaseConverter(ABC):
         """Convert content to Markdown."""
         pass
     
+    def convert_sync(self, content: Union[bytes, str], options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Convert content to Markdown without an event loop.
+        
+        By default convert() is run to completion on a new event loop, so
+        this must not be called from a running one. Converters that do
+        blocking work anyway should override this (and have convert() call
+        it); batch conversions then call it directly.
+        """
+        import asyncio
+        
+        return asyncio.run(self.convert(content, options))
+    
+    def convert_many(
+        self,
+        contents: Iterable[Union[bytes, str]],
+        options: Optional[Dict[str, Any]] = None
+    ) -> List[Union[str, Exception]]:
+        """
+        Convert several documents with the same options.
+        
+        Returns one item per document, in order: its Markdown, or the
+        exception converting it raised. By default the documents are
+        converted one by one with convert_sync(); converters that can
+        amortize setup across documents override this and set batch_size.
+        """
+        results: List[Union[str, Exception]] = []
+        for content in contents:
+            try:
+                results.append(self.convert_sync(content, options))
+            except Exception as e:
+                results.append(e)
+        return results
+    
     @abstractmethod
     def validate_input(self, content: bytes) -> bool:
         """Validate input for security and format correctness."""
         pass
     
+    def decode(self, content: bytes) -> str:
+        """
+        Decode content read from a file (bytes or another buffer, such as an mmap).
+        
+        Raises:
+            SecurityError: If the content cannot be decoded
+        """
+        from ..exceptions import SecurityError
+        
+        try:
+            return str(content, 'utf-8')
+        except UnicodeDecodeError:
+            raise SecurityError("Content contains invalid UTF-8 encoding")
+    
+    async def convert_stream(self, input_path: Path, output_path: Path, config: Any) -> None:
+        """Convert a file to a Markdown file without holding either in memory."""
+        raise NotImplementedError(f"{self.name} does not support streaming")
+    
     @property
     @abstractmethod
     def supported_formats(self) -> list[str]:
@@ -52,36 +123,78 @@ class BaseConverter(ABC):
 class HTMLConverter(BaseConverter):
     """HTML to Markdown converter."""
     
+    sanitizes_tree = True
+    supports_streaming = True
+    accepts_plan = True
+    accepts_text = True
+    
     def can_handle(self, file_path: Path) -> bool:
         """Check if this converter can handle HTML files."""
         return file_path.suffix.lower() in self.supported_formats
     
-    async def convert(self, content: bytes, options: Optional[Dict[str, Any]] = None) -> str:
-        """Convert HTML content to Markdown."""
-        # This will be implemented in html2md.py
-        from ..html2md import html_to_markdown
+    async def convert(self, content: Union[bytes, str], options: Optional[Dict[str, Any]] = None) -> str:
+        """Convert HTML content (bytes, or text from decode()) to Markdown."""
+        return self.convert_sync(content, options)
+    
+    def convert_sync(self, content: Union[bytes, str], options: Optional[Dict[str, Any]] = None) -> str:
+        """Convert HTML content to Markdown; the conversion doesn't wait on anything."""
+        from ..html2md import html_to_markdown_sync
+        from ..plan import ConversionPlan
         
-        html_content = content.decode('utf-8')
+        html_content = content if isinstance(content, str) else self.decode(content)
         
-        # Handle both config object and options dict
+        # Handle compiled plan, full config, conversion config object and options dict
         if options is not None:
-            if hasattr(options, 'preserve_html'):
+            if isinstance(options, ConversionPlan):
+                # Compiled ConversionPlan
+                return html_to_markdown_sync(html_content, plan=options)
+            elif hasattr(options, 'security'):
+                # Full Config: sanitize and convert on a single parsed tree
+                return html_to_markdown_sync(
+                    html_content, options.conversion, security_config=options.security
+                )
+            elif hasattr(options, 'preserve_html'):
                 # It's a config object
-                return await html_to_markdown(html_content, options)
+                return html_to_markdown_sync(html_content, options)
             else:
                 # It's a dict of options
-                return await html_to_markdown(html_content, options=options)
+                return html_to_markdown_sync(html_content, options=options)
         else:
-            return await html_to_markdown(html_content)
+            return html_to_markdown_sync(html_content)
+    
+    async def convert_stream(self, input_path: Path, output_path: Path, config: Any) -> None:
+        """Convert an HTML file to Markdown block by block."""
+        import asyncio
+        
+        import dataclasses
+        
+        from ..html2md import stream_html_file
+        from ..plan import ConversionPlan, compile_plan
+        
+        # Streamed blocks are always sanitized on the tree
+        plan = config if isinstance(config, ConversionPlan) else compile_plan(config)
+        if not plan.single_parse:
+            plan = dataclasses.replace(plan, single_parse=True)
+        
+        # The file is read and written as it is converted; keep that off the event loop
+        await asyncio.to_thread(stream_html_file, input_path, output_path, plan=plan)
     
     def validate_input(self, content: bytes) -> bool:
         """Validate HTML input."""
+        from ..exceptions import SecurityError
+        
         try:
-            content.decode('utf-8')
+            self.decode(content)
             return True
-        except UnicodeDecodeError:
+        except SecurityError:
             return False
     
+    def decode(self, content: bytes) -> str:
+        """Decode HTML in the encoding given by its byte order mark or <meta charset>."""
+        from ..charset import decode_html
+        
+        return decode_html(content)
+    
     @property
     def supported_formats(self) -> list[str]:
         """List of supported HTML formats."""
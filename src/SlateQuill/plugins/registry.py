@@ -0,0 +1,242 @@
+"""
+SlateQuill converter registry.
+
+Maps file extensions to converters. The registry only holds converter
+instances; a converter imports its conversion backend when it first
+converts something, so listing or looking up formats stays cheap.
+
+Third-party converters are installed as entry points of the
+"SlateQuill.plugins" group, naming a BaseConverter subclass (or a factory
+returning a converter). Which extensions each plugin handles is kept in an
+index in the cache directory, built by loading every plugin once and rebuilt
+whenever the installed distributions change; after that a plugin is only
+imported when a file with one of its extensions is first converted.
+Built-in and explicitly registered converters take precedence over plugins.
+"""
+
+from dataclasses import dataclass
+import hashlib
+import importlib
+import json
+import os
+from pathlib import Path
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from .. import __version__
+from ..exceptions import PluginError
+from .base import BaseConverter, HTMLConverter
+
+PLUGIN_GROUP = "SlateQuill.plugins"
+PLUGIN_INDEX_FORMAT = 1
+
+# Registry of available converters
+_converters: Dict[str, BaseConverter] = {}
+
+
+@dataclass(frozen=True)
+class PluginSpec:
+    """An installed plugin, as recorded in the index."""
+
+    name: str
+    # Entry point value, "module:attribute"
+    value: str
+    distribution: str
+
+
+# Plugin of each extension and plugins that failed to load, once discovered
+_plugins: Optional[Dict[str, PluginSpec]] = None
+_plugin_errors: Dict[str, str] = {}
+
+
+def register_converter(converter: BaseConverter) -> None:
+    """Register a converter for use in the conversion process."""
+    for format_ext in converter.supported_formats:
+        _converters[format_ext.lower()] = converter
+
+
+def get_converter(file_path: Path) -> Optional[BaseConverter]:
+    """
+    Get the appropriate converter for a file based on its extension.
+
+    Raises:
+        PluginError: If the plugin for the extension cannot be loaded
+    """
+    file_ext = file_path.suffix.lower()
+    converter = _converters.get(file_ext)
+    if converter is not None:
+        return converter
+
+    spec = discover_plugins().get(file_ext)
+    if spec is None:
+        return None
+    converter = _load_plugin(spec)
+    # Only the extensions indexed for the plugin; others may belong to converters registered since
+    for format_ext, indexed in discover_plugins().items():
+        if indexed == spec and format_ext not in _converters:
+            _converters[format_ext] = converter
+    return converter
+
+
+def list_supported_formats() -> List[str]:
+    """List all supported file formats."""
+    return sorted(set(_converters) | set(discover_plugins()))
+
+
+def plugin_errors() -> Dict[str, str]:
+    """Errors of the installed plugins that could not be loaded when the index was built, by plugin name."""
+    discover_plugins()
+    return dict(_plugin_errors)
+
+
+def discover_plugins(refresh: bool = False) -> Dict[str, PluginSpec]:
+    """
+    Return the installed plugin of each extension (excluding registered converters).
+
+    The index is read from the cache directory if the installed
+    distributions didn't change since it was built; otherwise, or with
+    refresh, every plugin is loaded to find its extensions.
+    """
+    global _plugins
+    if _plugins is not None and not refresh:
+        return {ext: spec for ext, spec in _plugins.items() if ext not in _converters}
+
+    index_path = _plugin_index_path()
+    fingerprint = _environment_fingerprint()
+    index = None if refresh else _read_plugin_index(index_path, fingerprint)
+    if index is None:
+        index = _build_plugin_index()
+        _write_plugin_index(index_path, fingerprint, index)
+
+    plugins, errors = index
+    _plugins = plugins
+    _plugin_errors.clear()
+    _plugin_errors.update(errors)
+    return {ext: spec for ext, spec in plugins.items() if ext not in _converters}
+
+
+def _plugin_index_path() -> Path:
+    """
+    Index file in the per-user cache directory (see cache.default_cache_dir).
+
+    Each import path (virtual environment, working directory) has its own
+    index, so switching between them doesn't rebuild it every time.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    key = hashlib.sha256("\0".join(sys.path).encode("utf-8", "surrogateescape")).hexdigest()[:16]
+    return Path(base) / "slatequill" / f"plugins-{key}.json"
+
+
+def _environment_fingerprint() -> str:
+    """
+    Fingerprint of the installed distributions.
+
+    Installing, upgrading or removing a distribution adds or removes its
+    metadata directory, which changes the modification time of the
+    directory on sys.path that holds it; stat calls are enough to notice.
+    """
+    digest = hashlib.sha256(f"{__version__}\0{sys.version}".encode("utf-8"))
+    for entry in sys.path:
+        try:
+            mtime_ns = os.stat(entry or ".").st_mtime_ns
+        except OSError:
+            mtime_ns = -1
+        digest.update(f"\0{entry}\0{mtime_ns}".encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()
+
+
+def _read_plugin_index(path: Path, fingerprint: str) -> Optional[Tuple[Dict[str, PluginSpec], Dict[str, str]]]:
+    """Read the index, or return None if it is missing, unreadable or stale."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != PLUGIN_INDEX_FORMAT or data.get("fingerprint") != fingerprint:
+            return None
+        plugins = {ext: PluginSpec(**spec) for ext, spec in data["formats"].items()}
+        return plugins, dict(data["errors"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_plugin_index(path: Path, fingerprint: str, index: Tuple[Dict[str, PluginSpec], Dict[str, str]]) -> None:
+    """Write the index atomically; it is only a cache, so failures are ignored."""
+    plugins, errors = index
+    data = {
+        "format": PLUGIN_INDEX_FORMAT,
+        "fingerprint": fingerprint,
+        "formats": {
+            ext: {"name": spec.name, "value": spec.value, "distribution": spec.distribution}
+            for ext, spec in sorted(plugins.items())
+        },
+        "errors": errors,
+    }
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            tmp_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def _build_plugin_index() -> Tuple[Dict[str, PluginSpec], Dict[str, str]]:
+    """Load every installed plugin to find the extensions it handles."""
+    from importlib.metadata import distributions
+
+    plugins: Dict[str, PluginSpec] = {}
+    errors: Dict[str, str] = {}
+    specs = set()
+    for distribution in distributions():
+        for entry_point in distribution.entry_points:
+            if entry_point.group == PLUGIN_GROUP:
+                specs.add(PluginSpec(entry_point.name, entry_point.value, distribution.metadata["Name"] or ""))
+
+    # The first plugin by name wins an extension claimed by several
+    for spec in sorted(specs, key=lambda spec: (spec.name, spec.value)):
+        try:
+            converter = _load_plugin(spec)
+        except PluginError as e:
+            errors[spec.name] = e.message
+            continue
+        for format_ext in converter.supported_formats:
+            plugins.setdefault(format_ext.lower(), spec)
+    return plugins, errors
+
+
+def _load_plugin(spec: PluginSpec) -> BaseConverter:
+    """
+    Import a plugin and create its converter.
+
+    Raises:
+        PluginError: If the plugin cannot be imported or doesn't provide a converter
+    """
+    module_name, _, attribute = spec.value.partition(":")
+    try:
+        target: Any = importlib.import_module(module_name.strip())
+        # Extras ("module:attr [extra]") don't affect loading
+        for name in attribute.split("[")[0].strip().split("."):
+            if name:
+                target = getattr(target, name)
+        converter = target if isinstance(target, BaseConverter) else target()
+    except Exception as e:
+        raise PluginError(f"Failed to load plugin {spec.name} ({spec.value}): {e}")
+
+    if not isinstance(converter, BaseConverter):
+        raise PluginError(f"Plugin {spec.name} ({spec.value}) doesn't provide a BaseConverter")
+    return converter
+
+
+# Initialize default converters
+def _initialize_converters() -> None:
+    """Initialize the default converter registry."""
+    # Register HTML converter
+    html_converter = HTMLConverter()
+    register_converter(html_converter)
+
+
+# Initialize converters on module import
+_initialize_converters()
@@ -0,0 +1,242 @@
+"""
+SlateQuill Markdown post-processing.
+
+Whitespace cleanup and line wrapping of generated Markdown, done in one
+pass over its lines. The post-processor follows the block structure of
+the Markdown: fenced code is passed through verbatim, and headings, table
+rows and indented code are never wrapped. Wrapped list items and
+blockquotes keep their indentation and quote markers on continuation
+lines, and lines are never broken where the continuation would start a
+new block (a list marker, heading, quote, ...).
+
+Text can be fed in arbitrary pieces (e.g. the fragments of the emitter,
+or the blocks of a streamed document); the result is the same as
+processing the complete document at once.
+"""
+
+import re
+from typing import Iterable, List, Optional, Tuple
+
+# Blockquote markers at the start of a line
+_QUOTE_RE = re.compile(r'(?:[ ]{0,3}>[ ]?)+')
+# Opening code fence: indentation, fence, info string
+_FENCE_RE = re.compile(r'([ \t]*)(`{3,}|~{3,})(.*)')
+# List item: indentation, marker, spacing
+_LIST_ITEM_RE = re.compile(r'([ \t]*)([-+*]|\d{1,9}[.)])( +|$)')
+# Words that would start a new block at the beginning of a line
+_BLOCK_START_RE = re.compile(
+    r'(?:[-+*]|#{1,6}|\d{1,9}[.)]|=+|-+|_{3,}|\*{3,})$|[>|]|`{3}|~{3}|<[A-Za-z/!?]'
+)
+_SPACES_RE = re.compile(r'( +)')
+
+# How a line may be wrapped: (offset of the text after its prefix,
+# indentation of continuation lines), or None if it is kept as is
+_Wrap = Optional[Tuple[int, str]]
+
+
+class MarkdownPostProcessor:
+    """
+    Clean up whitespace and wrap lines of Markdown in a single pass.
+
+    With clean_whitespace, trailing spaces and tabs are removed from lines,
+    runs of blank lines are collapsed to one, and leading and trailing
+    whitespace of the document is removed. With a positive line_length,
+    longer lines of text are wrapped at spaces.
+    """
+
+    def __init__(self, clean_whitespace: bool = True, line_length: int = 0) -> None:
+        self.clean_whitespace = clean_whitespace
+        self.line_length = line_length
+        self._partial: List[str] = []
+        self._output: List[str] = []
+        # Blank lines waiting for the next line of content
+        self._blanks: List[str] = []
+        self._started = False
+        # The latest line is held back until it is known not to be the last
+        self._held: Optional[str] = None
+        self._held_wrap: _Wrap = None
+        # Open code fence: (fence characters, blockquote depth)
+        self._fence: Optional[Tuple[str, int]] = None
+        self._in_list = False
+
+    def process(self, fragments: Iterable[str]) -> str:
+        """Post-process a complete document, given as fragments."""
+        write = self.write
+        for fragment in fragments:
+            write(fragment)
+        return self.read() + self.finish()
+
+    def feed(self, text: str) -> str:
+        """Add Markdown and return the part that can be written out."""
+        self.write(text)
+        return self.read()
+
+    def write(self, text: str) -> None:
+        """Add Markdown without collecting the output yet."""
+        if '\n' not in text:
+            self._partial.append(text)
+            return
+        lines = text.split('\n')
+        if self._partial:
+            self._partial.append(lines[0])
+            lines[0] = ''.join(self._partial)
+            self._partial.clear()
+        self._partial.append(lines.pop())
+        add_line = self._add_line
+        for line in lines:
+            add_line(line)
+
+    def read(self) -> str:
+        """Return the output produced so far and not yet read."""
+        output = ''.join(self._output)
+        self._output.clear()
+        return output
+
+    def finish(self) -> str:
+        """Process the rest of the document and return the remaining output."""
+        last = ''.join(self._partial)
+        self._partial.clear()
+        if last or not self.clean_whitespace:
+            self._add_line(last)
+        self._blanks.clear()
+
+        held = self._held
+        if held is not None:
+            if self.clean_whitespace:
+                held = held.rstrip()
+            self._output.append(self._render(held, self._held_wrap))
+            self._held = None
+        return self.read()
+
+    def _add_line(self, line: str) -> None:
+        if self._fence is not None:
+            if not self._continues_fence(line):
+                self._fence = None
+            else:
+                self._emit(line, None)
+                return
+
+        if self.clean_whitespace:
+            line = line.rstrip(' \t')
+            if not line or line.isspace():
+                self._blanks.append(line)
+                return
+            if self._blanks:
+                if self._started:
+                    # A single blank line is kept; longer runs become one empty line
+                    self._emit(self._blanks[0] if len(self._blanks) == 1 else '', None)
+                self._blanks.clear()
+            if not self._started:
+                line = line.lstrip()
+
+        self._emit(line, self._classify(line))
+
+    def _emit(self, line: str, wrap: _Wrap) -> None:
+        if self._held is not None:
+            self._output.append(self._render(self._held, self._held_wrap) + '\n')
+        self._held = line
+        self._held_wrap = wrap
+        self._started = True
+
+    def _render(self, line: str, wrap: _Wrap) -> str:
+        if wrap is None or len(line) <= self.line_length:
+            return line
+        return _wrap_text(line, wrap[0], wrap[1], self.line_length)
+
+    def _classify(self, line: str) -> _Wrap:
+        """Update the block state for a line and decide how it may be wrapped."""
+        if not line:
+            return None
+        quote = ''
+        rest = line
+        if line[0] in ' >' and '>' in line:
+            match = _QUOTE_RE.match(line)
+            if match:
+                quote = match.group()
+                rest = line[match.end():]
+
+        fence = _FENCE_RE.match(rest) if '```' in rest or '~~~' in rest else None
+        if fence is not None and not (fence.group(2)[0] == '`' and '`' in fence.group(3)):
+            self._fence = (fence.group(2), quote.count('>'))
+            return None
+
+        stripped = rest.lstrip(' \t')
+        if not stripped:
+            return None
+
+        item = _LIST_ITEM_RE.match(rest) if stripped[0] in '-+*0123456789' else None
+        if item is not None:
+            self._in_list = True
+            indent = quote + item.group(1) + ' ' * (len(item.group(2)) + len(item.group(3)))
+            return (len(quote) + item.end(), indent) if self.line_length > 0 else None
+
+        indented = rest.startswith(('    ', '\t'))
+        if not indented and not line.startswith(' '):
+            # Unindented content ends the list
+            self._in_list = False
+        if indented and not self._in_list:
+            # Indented code
+            return None
+        if stripped[0] in '#|':
+            # Heading or table row
+            return None
+        if self.line_length <= 0:
+            return None
+        offset = len(line) - len(stripped)
+        return (offset, line[:offset])
+
+    def _continues_fence(self, line: str) -> bool:
+        """Check whether a line belongs to the open code fence (closing it if it is its end)."""
+        assert self._fence is not None
+        fence, depth = self._fence
+        rest = line
+        if depth:
+            match = _QUOTE_RE.match(line)
+            if match is None or match.group().count('>') < depth:
+                # The blockquote ended, and the fence with it
+                return False
+            rest = line[match.end():]
+        closing = rest.strip(' \t')
+        if closing.startswith(fence) and not closing.strip(fence[0]):
+            self._fence = None
+        return True
+
+
+def _wrap_text(line: str, offset: int, indent: str, width: int) -> str:
+    """Wrap the text of line after offset at spaces; continuation lines start with indent."""
+    head, text = line[:offset], line[offset:]
+    trailing = len(text) - len(text.rstrip(' '))
+    if trailing:
+        text = text[:-trailing]
+
+    parts = _SPACES_RE.split(text)
+    words = [parts[0]]
+    spaces = []
+    for index in range(1, len(parts), 2):
+        word = parts[index + 1]
+        if _BLOCK_START_RE.match(word):
+            # Never start a line with it: keep it with the previous word
+            words[-1] += parts[index] + word
+        else:
+            spaces.append(parts[index])
+            words.append(word)
+
+    lines = []
+    current = [head, words[0]]
+    length = len(head) + len(words[0])
+    for space, word in zip(spaces, words[1:]):
+        if length + len(space) + len(word) <= width:
+            current.append(space)
+            current.append(word)
+            length += len(space) + len(word)
+        else:
+            lines.append(''.join(current))
+            current = [indent, word]
+            length = len(indent) + len(word)
+    lines.append(''.join(current) + ' ' * trailing)
+    return '\n'.join(lines)
+
+
+def post_process(markdown: str, clean_whitespace: bool = True, line_length: int = 0) -> str:
+    """Clean up whitespace and wrap lines of a Markdown document (see MarkdownPostProcessor)."""
+    return MarkdownPostProcessor(clean_whitespace, line_length).process((markdown,))
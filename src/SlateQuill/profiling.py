@@ -0,0 +1,267 @@
+"""
+SlateQuill conversion profiling.
+
+The conversion pipeline times each of its stages (read, validation,
+sanitization, parsing, Markdown generation, post-processing and write) in a
+span. Spans are reported to the registered collectors, together with the
+file being converted, and stage listeners are told when each stage starts
+and ends. When neither is registered, a span does nothing, so the
+instrumentation costs next to nothing in normal runs.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+import cProfile
+from pathlib import Path
+import tempfile
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from .config import Config
+
+# Pipeline stages, in the order they run. "total" is the whole conversion
+# of one file; the other stages are parts of it.
+STAGES = (
+    "read",
+    "cache",
+    "decode",
+    "validate_path",
+    "validate_size",
+    "scan",
+    "sanitize",
+    "parse",
+    "prepare",
+    "emit",
+    "post_process",
+    "stream",
+    "write",
+    "total",
+)
+
+TOTAL_STAGE = "total"
+
+# A collector receives (stage, seconds, file) for every finished span
+Collector = Callable[[str, float, Optional[Path]], None]
+
+# A stage listener receives (stage, True) when a span starts and (stage, False) when it ends
+StageListener = Callable[[str, bool], None]
+
+_collectors: List[Collector] = []
+_listeners: List[StageListener] = []
+_current_file: ContextVar[Optional[Path]] = ContextVar("slatequill_profile_file", default=None)
+
+
+def add_collector(collector: Collector) -> None:
+    """Register a collector for the spans of all subsequent conversions."""
+    _collectors.append(collector)
+
+
+def remove_collector(collector: Collector) -> None:
+    """Unregister a collector."""
+    if collector in _collectors:
+        _collectors.remove(collector)
+
+
+@contextmanager
+def collecting(collector: Collector) -> Iterator[Collector]:
+    """Register a collector for the duration of a with block."""
+    add_collector(collector)
+    try:
+        yield collector
+    finally:
+        remove_collector(collector)
+
+
+def add_stage_listener(listener: StageListener) -> None:
+    """Register a listener for the stages of all subsequent conversions."""
+    _listeners.append(listener)
+
+
+def remove_stage_listener(listener: StageListener) -> None:
+    """Unregister a stage listener."""
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+class _NullSpan:
+    """Span used while no collector is registered."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Times a with block and reports it to the collectors."""
+
+    __slots__ = ("stage", "file", "scope", "start", "_token")
+
+    def __init__(self, stage: str, file: Optional[Path], scope: bool) -> None:
+        self.stage = stage
+        self.file = file
+        self.scope = scope
+        self.start = 0.0
+        self._token: Any = None
+
+    def __enter__(self) -> None:
+        if self.scope:
+            self._token = _current_file.set(self.file)
+        for listener in list(_listeners):
+            listener(self.stage, True)
+        self.start = perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        elapsed = perf_counter() - self.start
+        file = self.file if self.file is not None else _current_file.get()
+        if self._token is not None:
+            _current_file.reset(self._token)
+        for listener in list(_listeners):
+            listener(self.stage, False)
+        for collector in list(_collectors):
+            collector(self.stage, elapsed, file)
+
+
+def span(stage: str, file: Optional[Path] = None) -> Any:
+    """
+    Time a pipeline stage.
+
+    Args:
+        stage: Stage name (see STAGES)
+        file: File the stage works on (default: the file of the enclosing
+            file_span)
+
+    Returns:
+        Context manager for the timed block
+    """
+    if not _collectors and not _listeners:
+        return _NULL_SPAN
+    return _Span(stage, file, scope=False)
+
+
+def file_span(file: Path) -> Any:
+    """Time the conversion of one file; spans inside it are attributed to file."""
+    if not _collectors and not _listeners:
+        return _NULL_SPAN
+    return _Span(TOTAL_STAGE, file, scope=True)
+
+
+def current_file() -> Optional[Path]:
+    """Return the file whose conversion is being timed, if any."""
+    return _current_file.get()
+
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    """Linearly interpolated percentile of sorted values."""
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class StageProfile:
+    """
+    Collector that aggregates span durations per stage and per file.
+
+    Register it with add_collector() or collecting().
+    """
+
+    def __init__(self) -> None:
+        self.durations: Dict[str, List[float]] = {}
+        self.files: Dict[Path, Dict[str, float]] = {}
+
+    def __call__(self, stage: str, seconds: float, file: Optional[Path]) -> None:
+        self.durations.setdefault(stage, []).append(seconds)
+        if file is not None:
+            stages = self.files.setdefault(file, {})
+            stages[stage] = stages.get(stage, 0.0) + seconds
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarize each stage, in pipeline order.
+
+        Returns:
+            Mapping of stage to count, total, mean, p50, p90, p99 and max
+            (durations in seconds)
+        """
+        # Custom stages (e.g. of plugins) go after the built-in ones, before the total
+        order = {stage: float(index) for index, stage in enumerate(STAGES)}
+        other = order[TOTAL_STAGE] - 0.5
+        summary: Dict[str, Dict[str, float]] = {}
+        for stage in sorted(self.durations, key=lambda name: (order.get(name, other), name)):
+            values = sorted(self.durations[stage])
+            total = sum(values)
+            summary[stage] = {
+                "count": len(values),
+                "total": total,
+                "mean": total / len(values),
+                "p50": _percentile(values, 0.50),
+                "p90": _percentile(values, 0.90),
+                "p99": _percentile(values, 0.99),
+                "max": values[-1],
+            }
+        return summary
+
+    def slowest(self, count: int) -> List[Tuple[Path, float]]:
+        """Return the count files with the longest total conversion time."""
+        totals = [(file, stages.get(TOTAL_STAGE, 0.0)) for file, stages in self.files.items()]
+        return sorted(totals, key=lambda item: item[1], reverse=True)[:max(count, 0)]
+
+    def to_dict(self, slowest: int = 10) -> Dict[str, Any]:
+        """Return the summary and the slowest files' stage times, for JSON output."""
+        return {
+            "stages": self.summary(),
+            "slowest": [
+                {"file": str(file), "stages": self.files[file]}
+                for file, _ in self.slowest(slowest)
+            ],
+        }
+
+
+async def profile_files(
+    files: Sequence[Path],
+    config: "Config",
+    output_dir: Path
+) -> List[Path]:
+    """
+    Convert files again under cProfile and dump one profile per file.
+
+    The outputs of these conversions are discarded and the result cache is
+    bypassed, so the profiles show the complete conversion.
+
+    Args:
+        files: Input files to profile
+        config: Conversion configuration
+        output_dir: Directory for the <input stem>.prof files (pstats format)
+
+    Returns:
+        Paths of the written profiles
+    """
+    from .core import convert_file
+
+    config = config.model_copy(deep=True)
+    config.performance.cache_results = False
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    written = []
+    with tempfile.TemporaryDirectory() as scratch:
+        for index, input_path in enumerate(files):
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                await convert_file(input_path, Path(scratch) / f"{index}.md", config, return_content=False)
+            finally:
+                profiler.disable()
+            profile_path = output_dir / f"{input_path.stem}.prof"
+            if profile_path in written:
+                profile_path = output_dir / f"{input_path.stem}-{index}.prof"
+            profiler.dump_stats(profile_path)
+            written.append(profile_path)
+    return written
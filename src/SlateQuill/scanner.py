@@ -0,0 +1,202 @@
+"""
+SlateQuill directory scanner.
+
+Finds the files to convert in a directory tree with os.scandir, walking
+subdirectories on a pool of threads. Files are matched by extension and
+include/exclude globs using only their names, and excluded directories are
+never entered, so asset directories cost one directory listing each. The
+file type comes from the cached directory entry and needs no stat call.
+Matches are streamed to the caller while the walk continues, so conversion
+can start with the first directory.
+"""
+
+import fnmatch
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import queue
+import re
+import threading
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_SCAN_WORKERS = 8
+
+# Directory listings waiting for the consumer; walkers block beyond this
+_QUEUE_SIZE = 256
+
+_DONE = object()
+
+# Matches a path relative to the scanned directory (POSIX separators) and its name
+Matcher = Callable[[str, str], bool]
+
+# Items produced by listing a directory: a batch of matching files, or a
+# subdirectory to walk as (path, relative path prefix)
+_Listing = Iterator[Union[List[os.DirEntry], Tuple[str, str]]]
+
+
+def compile_globs(patterns: Iterable[str]) -> Optional[Matcher]:
+    """
+    Compile glob patterns into one matcher.
+
+    Patterns containing "/" are matched against the path relative to the
+    scanned directory, other patterns against the file or directory name.
+    As in fnmatch, "*" also matches "/", so "docs/*" matches everything
+    below docs.
+
+    Returns:
+        Matcher, or None if there are no patterns
+    """
+    path_patterns: List[str] = []
+    name_patterns: List[str] = []
+    for pattern in patterns:
+        pattern = pattern.strip().replace("\\", "/").strip("/")
+        if pattern:
+            (path_patterns if "/" in pattern else name_patterns).append(fnmatch.translate(pattern))
+    if not path_patterns and not name_patterns:
+        return None
+
+    path_re = re.compile("|".join(path_patterns)).match if path_patterns else None
+    name_re = re.compile("|".join(name_patterns)).match if name_patterns else None
+
+    def matches(rel_path: str, name: str) -> bool:
+        return bool(
+            (name_re is not None and name_re(name))
+            or (path_re is not None and path_re(rel_path))
+        )
+
+    return matches
+
+
+def scan_directory(
+    root: Path,
+    extensions: Optional[Iterable[str]] = None,
+    recursive: bool = True,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    workers: int = DEFAULT_SCAN_WORKERS
+) -> Iterator[os.DirEntry]:
+    """
+    Find the files below root that match extensions and the include/exclude globs.
+
+    Symbolic links to files are included; symbolic links to directories are
+    not followed. Directories that can't be listed are skipped. Files are
+    yielded in no particular order, as directory entries whose stat() result
+    is cached once called.
+
+    Args:
+        root: Directory to scan
+        extensions: File extensions to match (e.g. ".html"), case-insensitive;
+            None matches all files
+        recursive: Whether to scan subdirectories
+        include: If given, only files matching one of these globs are yielded
+        exclude: Files and directories matching one of these globs are skipped
+        workers: Number of threads listing directories
+
+    Yields:
+        Directory entries of the matching files
+    """
+    suffixes = {extension.lower() for extension in extensions} if extensions is not None else None
+    included = compile_globs(include)
+    excluded = compile_globs(exclude)
+
+    def wanted(entry: os.DirEntry, rel_path: str) -> bool:
+        name = entry.name
+        if suffixes is not None:
+            dot = name.rfind(".")
+            if dot <= 0 or name[dot:].lower() not in suffixes:
+                return False
+        if included is not None and not included(rel_path, name):
+            return False
+        if excluded is not None and excluded(rel_path, name):
+            return False
+        try:
+            return entry.is_file()
+        except OSError:
+            return False
+
+    def list_directory(path: str, prefix: str) -> _Listing:
+        """Yield the matching files of a directory, then its subdirectories as (path, prefix)."""
+        files: List[os.DirEntry] = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    rel_path = prefix + entry.name
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if recursive and (excluded is None or not excluded(rel_path, entry.name)):
+                            yield entry.path, rel_path + "/"
+                    elif wanted(entry, rel_path):
+                        files.append(entry)
+        except OSError:
+            pass
+        if files:
+            yield files
+
+    if workers <= 1:
+        pending = [(os.fspath(root), "")]
+        while pending:
+            for item in list_directory(*pending.pop()):
+                if isinstance(item, list):
+                    yield from item
+                else:
+                    pending.append(item)
+        return
+
+    yield from _parallel_scan(os.fspath(root), list_directory, workers)
+
+
+def _parallel_scan(
+    root: str,
+    list_directory: Callable[[str, str], _Listing],
+    workers: int
+) -> Iterator[os.DirEntry]:
+    """Walk directories on a thread pool, streaming matches through a bounded queue."""
+    results: "queue.Queue[object]" = queue.Queue(_QUEUE_SIZE)
+    lock = threading.Lock()
+    stopped = threading.Event()
+    # Directories submitted but not listed yet
+    outstanding = 1
+
+    def walk(path: str, prefix: str) -> None:
+        nonlocal outstanding
+        try:
+            for item in list_directory(path, prefix):
+                if stopped.is_set():
+                    break
+                if isinstance(item, list):
+                    results.put(item)
+                else:
+                    with lock:
+                        outstanding += 1
+                    executor.submit(walk, *item)
+        except BaseException as e:
+            results.put(e)
+        finally:
+            with lock:
+                outstanding -= 1
+                done = outstanding == 0
+            if done:
+                results.put(_DONE)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="slatequill-scan")
+    executor.submit(walk, root, "")
+    try:
+        while True:
+            item = results.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield from item  # type: ignore[misc]
+    finally:
+        stopped.set()
+        # Unblock walkers waiting on a full queue until all of them finished
+        while outstanding:
+            try:
+                results.get(timeout=0.01)
+            except queue.Empty:
+                pass
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,72 @@
+"""
+SlateQuill batch scheduling.
+
+Worker pools start the files of a batch largest first, so that the few long
+conversions of a long-tailed corpus run alongside the many short ones
+instead of alone at the end of the batch. The cost of a file is its size
+(known from the directory scan, or stat'ed) or, where a previous run recorded
+how long the file took, an estimate from that (see
+BuildManifest.cost_estimator). Only a window of upcoming files is
+ordered at a time, which keeps memory bounded for batches of any size.
+"""
+
+import heapq
+import itertools
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from .fileio import Job, input_size
+
+# Estimated cost of converting an input file, given its path and size
+CostEstimator = Callable[[Path, int], float]
+
+
+class LargestFirstScheduler:
+    """
+    Reorder the jobs of a batch by decreasing estimated cost.
+
+    Up to window jobs are pulled ahead and the most expensive of them is
+    started first (window 0 orders the whole batch). Jobs of equal cost keep
+    their order. The time spent estimating and ordering is kept in overhead.
+    """
+
+    def __init__(self, window: int = 10_000, estimate: Optional[CostEstimator] = None) -> None:
+        self.window = window
+        self.estimate = estimate
+        # Seconds spent estimating costs and ordering jobs
+        self.overhead = 0.0
+
+    def order(self, jobs: Iterator[Any]) -> Iterator[Any]:
+        """Yield jobs most expensive first; items that are not jobs are passed through right away."""
+        pending: List[Tuple[float, int, Job]] = []
+        sequence = itertools.count()
+        exhausted = False
+        while True:
+            while not exhausted and (self.window <= 0 or len(pending) < self.window):
+                job = next(jobs, None)
+                if job is None:
+                    exhausted = True
+                elif not isinstance(job, tuple):
+                    yield job
+                else:
+                    start = perf_counter()
+                    heapq.heappush(pending, (-self._cost(job), next(sequence), job))
+                    self.overhead += perf_counter() - start
+
+            if not pending:
+                return
+            start = perf_counter()
+            _, _, job = heapq.heappop(pending)
+            self.overhead += perf_counter() - start
+            yield job
+
+    def _cost(self, job: Job) -> float:
+        try:
+            size = input_size(job)
+        except OSError:
+            # Reported by the conversion
+            size = 0
+        if self.estimate is not None:
+            return self.estimate(job[0], size)
+        return float(size)
@@ -5,12 +5,52 @@ This module provides security validation and sanitization functions
 to ensure safe processing of HTML content.
 """
 
+from dataclasses import dataclass, field
+import html
 import re
 from pathlib import Path
-from typing import Union
+import threading
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, List, Optional, Set, Tuple, Union
 
+from .charset import decode_html
 from .config import SecurityConfig
 from .exceptions import SecurityError
+from .parsers import DEFAULT_PARSER, parse_html
+from .profiling import span
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+
+# Allowed tags and attributes for safe HTML
+ALLOWED_TAGS = frozenset([
+    'p', 'br', 'strong', 'em', 'u', 'i', 'b', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'ul', 'ol', 'li', 'blockquote', 'pre', 'code', 'a', 'img', 'table', 'thead',
+    'tbody', 'tr', 'th', 'td', 'div', 'span', 'hr'
+])
+
+ALLOWED_ATTRIBUTES = {
+    'a': ['href', 'title'],
+    'img': ['src', 'alt', 'title', 'width', 'height'],
+    'table': ['border', 'cellpadding', 'cellspacing'],
+    'th': ['colspan', 'rowspan', 'scope'],
+    'td': ['colspan', 'rowspan'],
+    '*': ['class', 'id']
+}
+
+# URL schemes kept in href/src values (bleach's defaults)
+ALLOWED_PROTOCOLS = frozenset(['http', 'https', 'mailto'])
+
+# Attributes allowed on each tag, including the global ones, for set lookups
+_GLOBAL_ATTRIBUTES = frozenset(ALLOWED_ATTRIBUTES['*'])
+_TAG_ATTRIBUTES: Dict[str, FrozenSet[str]] = {
+    tag: frozenset(attributes) | _GLOBAL_ATTRIBUTES
+    for tag, attributes in ALLOWED_ATTRIBUTES.items() if tag != '*'
+}
+
+_URI_ATTRIBUTES = frozenset(['href', 'src'])
+_URI_SCHEME_RE = re.compile(r'^([a-z][a-z0-9+.\-]*):')
+_URI_IGNORED_CHARS_RE = re.compile(r'[\s\x00-\x1f\x7f]+')
 
 
 def validate_file_size(file_path: Path, max_size: int) -> None:
@@ -43,68 +83,280 @@ def validate_file_path(file_path: Path) -> None:
             raise SecurityError(f"Suspicious path detected: {file_path}")
 
 
-def validate_content_type(content: Union[str, bytes]) -> None:
-    """Validate content for potential security issues."""
+def validate_content_type(content: Union[str, bytes], config: Optional[SecurityConfig] = None) -> "ScanReport":
+    """
+    Validate content for potential security issues.
+    
+    Returns:
+        Report of the constructs that sanitization would remove
+    """
     if isinstance(content, bytes):
-        try:
-            content = content.decode('utf-8', errors='ignore')
-        except UnicodeDecodeError:
-            raise SecurityError("Content contains invalid UTF-8 encoding")
+        content = content.decode('utf-8', errors='ignore')
     
-    # Check for suspicious content patterns
-    suspicious_patterns = [
-        r"<script[^>]*>",  # Script tags
-        r"javascript:",  # JavaScript URLs
-        r"data:.*base64",  # Base64 data URLs (potential XSS)
-        r"<iframe[^>]*>",  # Iframe tags
-        r"<object[^>]*>",  # Object tags
-        r"<embed[^>]*>",  # Embed tags
-    ]
+    return scan_html(content, config)
+
+
+@dataclass(frozen=True)
+class ScanFinding:
+    """A construct that sanitization would remove or rewrite."""
     
-    for pattern in suspicious_patterns:
-        if re.search(pattern, content, re.IGNORECASE):
-            # Don't raise error immediately - let sanitization handle it
+    kind: str
+    construct: str
+    offset: int
+    line: int
+
+
+@dataclass
+class ScanReport:
+    """Findings of scan_html, in document order."""
+    
+    findings: List[ScanFinding] = field(default_factory=list)
+    # Whether scanning stopped at the finding limit
+    truncated: bool = False
+    
+    @property
+    def clean(self) -> bool:
+        """Whether the document uses only allowed tags, attributes and URLs."""
+        return not self.findings
+    
+    @property
+    def dangerous(self) -> List[ScanFinding]:
+        """Findings that could execute code or load active content."""
+        return [finding for finding in self.findings if finding.kind in DANGEROUS_FINDINGS]
+
+
+# Finding kinds that indicate active content rather than just markup
+# outside the allowlist
+DANGEROUS_FINDINGS = frozenset(['dangerous-tag', 'event-handler', 'disallowed-url'])
+
+_DANGEROUS_TAGS = frozenset([
+    'script', 'iframe', 'frame', 'frameset', 'object', 'embed', 'applet', 'base',
+    'form', 'link', 'meta', 'style', 'svg', 'math', 'template'
+])
+
+# One alternation over the whole document: comments, declarations (doctype,
+# CDATA), processing instructions, start/end tags with their attributes, and
+# any other "<" that starts markup but does not form a complete tag
+_SCAN_RE = re.compile(
+    r'<!--.*?(?:-->|\Z)'
+    r'|<!(?P<declaration>[^>]*)>?'
+    r'|<\?(?P<pi>[^>]*)>?'
+    r'|<(?P<end>/)?(?P<tag>[A-Za-z][^\s/>]*)(?P<attrs>(?:"[^"]*"|\'[^\']*\'|[^\'">])*)>'
+    r'|<(?P<stray>/?[A-Za-z])',
+    re.DOTALL
+)
+
+# Markup the HTML parser would restructure is reported as malformed: bleach
+# serializes the repaired tree, so skipping it would convert a different one
+_VOID_TAGS = frozenset(['br', 'hr', 'img'])
+_HEADING_TAGS = frozenset(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+# Start tags that close an open <p>
+_CLOSES_PARAGRAPH = frozenset([
+    'p', 'ul', 'ol', 'li', 'blockquote', 'pre', 'table', 'div', 'hr', *_HEADING_TAGS
+])
+# Elements that are moved unless they have one of these parents
+_REQUIRED_PARENTS = {
+    'li': ('ul', 'ol'),
+    'thead': ('table',),
+    'tbody': ('table',),
+    'tr': ('thead', 'tbody'),
+    'th': ('tr',),
+    'td': ('tr',),
+}
+# Elements that may contain only the children above and whitespace
+_TABLE_STRUCTURE = frozenset(['table', 'thead', 'tbody', 'tr'])
+# Containers that bound the search for an open <p>
+_PARAGRAPH_SCOPE = frozenset(['table', 'th', 'td'])
+
+_ATTRIBUTE_RE = re.compile(
+    r'(?P<name>[^\s"\'>/=]+)(?:\s*=\s*(?:"(?P<dq>[^"]*)"|\'(?P<sq>[^\']*)\'|(?P<bare>[^\s>]+)))?'
+)
+
+
+def scan_html(
+    content: str,
+    config: Optional[SecurityConfig] = None,
+    limit: Optional[int] = None
+) -> ScanReport:
+    """
+    Find everything in a document that sanitization would change.
+    
+    The document is scanned once with a compiled pattern. A document without
+    findings uses only allowed tags, attributes and URL schemes, nested the
+    way the HTML parser would build them, so bleach would return an
+    equivalent document and it can skip sanitization. Line endings are not
+    checked; the caller normalizes them as the parser would.
+    
+    Args:
+        content: HTML document
+        config: Security configuration (external links are reported if it
+            disallows them)
+        limit: Stop after this many findings
+    
+    Returns:
+        Report listing each finding with its offset and line
+    """
+    report = ScanReport()
+    allow_external_links = config is None or config.allow_external_links
+    open_tags: List[str] = []
+    disallowed_tags: Set[str] = set()
+    line, line_offset = 1, 0
+    text_start = 0
+    
+    def record(found: List[Tuple[str, str]], offset: int) -> bool:
+        nonlocal line, line_offset
+        line += content.count('\n', line_offset, offset)
+        line_offset = offset
+        for kind, construct in found:
+            report.findings.append(ScanFinding(kind, construct, offset, line))
+        if limit is not None and len(report.findings) >= limit:
+            report.truncated = True
+            return False
+        return True
+    
+    if '\x00' in content and not record([('malformed-markup', 'NUL character')], content.index('\x00')):
+        return report
+    
+    for match in _SCAN_RE.finditer(content):
+        group = match.lastgroup
+        tag = match.group('tag')
+        found: List[Tuple[str, str]] = []
+        
+        # Text directly inside table structure is moved out of the table
+        if open_tags and open_tags[-1] in _TABLE_STRUCTURE and content[text_start:match.start()].strip():
+            found.append(('malformed-markup', f'text in <{open_tags[-1]}>'))
+        text_start = match.end()
+        
+        if tag is not None:
+            name = tag.lower()
+            if name not in ALLOWED_TAGS:
+                # Elements are reported once, at their start tag
+                if not match.group('end') or name not in disallowed_tags:
+                    found.append(('dangerous-tag' if name in _DANGEROUS_TAGS else 'disallowed-tag', name))
+                disallowed_tags.add(name)
+            elif match.group('end'):
+                found.extend(_close_tag(name, open_tags))
+            else:
+                attrs = match.group('attrs')
+                found.extend(_scan_attributes(name, attrs, allow_external_links))
+                found.extend(_open_tag(name, attrs, open_tags))
+                if name == 'pre' and content.startswith('\n', match.end()):
+                    # html5lib drops this newline, html.parser keeps it
+                    found.append(('malformed-markup', 'newline after <pre>'))
+        elif group == 'stray':
+            found.append(('malformed-markup', match.group(0)))
+        elif group == 'declaration':
+            found.append(('declaration', _first_word(match.group('declaration'))))
+        elif group == 'pi':
+            found.append(('processing-instruction', _first_word(match.group('pi'))))
+        else:
+            found.append(('comment', ''))
+        
+        if found and not record(found, match.start()):
+            return report
+    
+    if open_tags:
+        if open_tags[-1] in _TABLE_STRUCTURE and content[text_start:].strip():
+            if not record([('malformed-markup', f'text in <{open_tags[-1]}>')], text_start):
+                return report
+        record([('malformed-markup', f'unclosed <{name}>') for name in reversed(open_tags)], len(content))
+    
+    return report
+
+
+def _first_word(text: str) -> str:
+    words = text.split(None, 1)
+    return words[0].lower() if words else ''
+
+
+def _open_tag(name: str, attrs: str, open_tags: List[str]) -> List[Tuple[str, str]]:
+    """Check where an allowed start tag opens and track the open elements."""
+    found: List[Tuple[str, str]] = []
+    parent = open_tags[-1] if open_tags else None
+    
+    if name in _REQUIRED_PARENTS:
+        if parent not in _REQUIRED_PARENTS[name]:
+            found.append(('malformed-markup', f'<{name}> outside <{"> or <".join(_REQUIRED_PARENTS[name])}>'))
+    elif parent in _TABLE_STRUCTURE:
+        found.append(('malformed-markup', f'<{name}> in <{parent}>'))
+    
+    if name in _CLOSES_PARAGRAPH:
+        for open_tag in reversed(open_tags):
+            if open_tag == 'p':
+                found.append(('malformed-markup', f'<{name}> in <p>'))
+                break
+            if open_tag in _PARAGRAPH_SCOPE:
+                break
+    if name in _HEADING_TAGS and any(open_tag in _HEADING_TAGS for open_tag in open_tags):
+        found.append(('malformed-markup', f'<{name}> in a heading'))
+    if name == 'a' and 'a' in open_tags:
+        found.append(('malformed-markup', '<a> in <a>'))
+    
+    if name in _VOID_TAGS:
+        return found
+    if attrs.rstrip().endswith('/'):
+        # The slash is ignored on non-void elements, which stay open
+        found.append(('malformed-markup', f'<{name}/>'))
+    open_tags.append(name)
+    return found
+
+
+def _close_tag(name: str, open_tags: List[str]) -> List[Tuple[str, str]]:
+    """Match an allowed end tag against the open elements."""
+    if open_tags and open_tags[-1] == name:
+        open_tags.pop()
+        return []
+    if name in open_tags:
+        # Elements closed implicitly by this end tag
+        while open_tags.pop() != name:
             pass
+    return [('malformed-markup', f'</{name}>')]
+
+
+def _scan_attributes(
+    tag: str,
+    attrs: str,
+    allow_external_links: bool
+) -> List[Tuple[str, str]]:
+    """Check the attributes of an allowed start tag."""
+    found: List[Tuple[str, str]] = []
+    if not attrs or attrs.isspace():
+        return found
+    
+    allowed_attributes = _TAG_ATTRIBUTES.get(tag, _GLOBAL_ATTRIBUTES)
+    seen = set()
+    for attribute in _ATTRIBUTE_RE.finditer(attrs):
+        name = attribute.group('name').lower()
+        if name in seen:
+            # Parsers disagree on which of the values is kept
+            found.append(('malformed-markup', f'duplicate {name}'))
+        seen.add(name)
+        if name not in allowed_attributes:
+            found.append(('event-handler' if name.startswith('on') else 'disallowed-attribute', name))
+            continue
+        
+        value = attribute.group('dq') or attribute.group('sq') or attribute.group('bare') or ''
+        if name in _URI_ATTRIBUTES and value:
+            if '&' in value:
+                value = html.unescape(value)
+            if not _is_allowed_uri(value):
+                found.append(('disallowed-url', name))
+            elif not allow_external_links and tag == 'a' and value.startswith(('http://', 'https://', 'ftp://')):
+                found.append(('external-link', value))
+    return found
 
 
-def sanitize_html(html_content: str, config: SecurityConfig) -> str:
+def sanitize_html(html_content: str, config: SecurityConfig, parser: str = DEFAULT_PARSER) -> str:
     """Sanitize HTML content to remove potentially dangerous elements."""
     if not config.sanitize_html:
         return html_content
     
-    try:
-        from bs4 import BeautifulSoup
-        import bleach
-    except ImportError:
-        raise SecurityError("HTML sanitization requires beautifulsoup4 and bleach")
-    
-    # Allowed tags and attributes for safe HTML
-    allowed_tags = [
-        'p', 'br', 'strong', 'em', 'u', 'i', 'b', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
-        'ul', 'ol', 'li', 'blockquote', 'pre', 'code', 'a', 'img', 'table', 'thead',
-        'tbody', 'tr', 'th', 'td', 'div', 'span', 'hr'
-    ]
-    
-    allowed_attributes = {
-        'a': ['href', 'title'],
-        'img': ['src', 'alt', 'title', 'width', 'height'],
-        'table': ['border', 'cellpadding', 'cellspacing'],
-        'th': ['colspan', 'rowspan', 'scope'],
-        'td': ['colspan', 'rowspan'],
-        '*': ['class', 'id']
-    }
-    
     # Clean HTML
-    cleaned_html = bleach.clean(
-        html_content,
-        tags=allowed_tags,
-        attributes=allowed_attributes,
-        strip=True
-    )
+    cleaned_html = _cleaner().clean(html_content)
     
     # Additional URL validation
     if not config.allow_external_links:
-        soup = BeautifulSoup(cleaned_html, 'html.parser')
+        soup = parse_html(cleaned_html, parser)
         for link in soup.find_all('a', href=True):
             href = link['href']
             if href.startswith(('http://', 'https://', 'ftp://')):
@@ -114,26 +366,131 @@ def sanitize_html(html_content: str, config: SecurityConfig) -> str:
     return cleaned_html
 
 
-def validate_input(content: Union[str, bytes], file_path: Path, config: SecurityConfig) -> str:
-    """Comprehensive input validation."""
-    # Validate file path
-    validate_file_path(file_path)
+# bleach cleaners keep parser state, so each thread gets its own
+_cleaners = threading.local()
+
+
+def _cleaner() -> Any:
+    """Return this thread's bleach cleaner for the allowlists, creating it on first use."""
+    cleaner = getattr(_cleaners, 'cleaner', None)
+    if cleaner is None:
+        try:
+            import bs4  # noqa: F401
+            import bleach
+        except ImportError:
+            raise SecurityError("HTML sanitization requires beautifulsoup4 and bleach")
+        
+        cleaner = bleach.Cleaner(
+            tags=ALLOWED_TAGS,
+            attributes=ALLOWED_ATTRIBUTES,
+            protocols=ALLOWED_PROTOCOLS,
+            strip=True
+        )
+        _cleaners.cleaner = cleaner
+    return cleaner
+
+
+def _is_allowed_uri(value: str) -> bool:
+    """Check whether a URL attribute value uses an allowed scheme."""
+    normalized = _URI_IGNORED_CHARS_RE.sub('', value).lower()
+    match = _URI_SCHEME_RE.match(normalized)
+    return match is None or match.group(1) in ALLOWED_PROTOCOLS
+
+
+def sanitize_tree(soup: "BeautifulSoup", config: SecurityConfig) -> None:
+    """
+    Sanitize an already parsed document tree in place.
+    
+    Applies the same allowlist as sanitize_html, but works on the tree that is
+    later converted to Markdown instead of serializing and re-parsing the HTML.
+    Disallowed tags are unwrapped (their content is kept), disallowed attributes
+    and URLs with disallowed schemes are dropped, and comments are removed.
+    """
+    if not config.sanitize_html:
+        return
     
-    # Validate file size
-    validate_file_size(file_path, config.max_file_size)
+    from bs4 import Comment
+    
+    for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+        comment.extract()
+    
+    for tag in soup.find_all(True):
+        if tag.name not in ALLOWED_TAGS:
+            tag.unwrap()
+            continue
+        
+        allowed_attributes = _TAG_ATTRIBUTES.get(tag.name, _GLOBAL_ATTRIBUTES)
+        for attr in list(tag.attrs):
+            if attr not in allowed_attributes:
+                del tag[attr]
+            elif attr in _URI_ATTRIBUTES and not _is_allowed_uri(tag[attr]):
+                del tag[attr]
+    
+    # Additional URL validation
+    if not config.allow_external_links:
+        for link in soup.find_all('a', href=True):
+            if link['href'].startswith(('http://', 'https://', 'ftp://')):
+                link.decompose()  # Remove external links
+
+
+def validate_input(
+    content: Union[str, bytes],
+    file_path: Optional[Path],
+    config: SecurityConfig,
+    sanitize: bool = True,
+    parser: str = DEFAULT_PARSER
+) -> str:
+    """
+    Comprehensive input validation.
+    
+    Args:
+        content: Raw or decoded input content
+        file_path: Path the content was read from, or None for an in-memory
+            document (whose size the caller checks)
+        config: Security configuration
+        sanitize: Whether to run sanitize_html; pass False when the caller
+            sanitizes the parsed tree itself (see sanitize_tree)
+        parser: HTML parser used for trees built while sanitizing
+    
+    Returns:
+        Validated (and possibly sanitized) content
+    """
+    if file_path is not None:
+        # Validate file path
+        with span('validate_path'):
+            validate_file_path(file_path)
+        
+        # Validate file size
+        with span('validate_size'):
+            validate_file_size(file_path, config.max_file_size)
     
     # Convert content to string if needed
     if isinstance(content, bytes):
-        try:
-            content = content.decode('utf-8')
-        except UnicodeDecodeError:
-            raise SecurityError("Content contains invalid UTF-8 encoding")
-    
-    # Validate content
-    validate_content_type(content)
+        content = decode_html(content)
     
     # Sanitize HTML if enabled
-    if config.sanitize_html:
-        content = sanitize_html(content, config)
+    if sanitize:
+        content = sanitize_content(content, config, parser)
+    
+    return content
+
+
+def sanitize_content(content: str, config: SecurityConfig, parser: str = DEFAULT_PARSER) -> str:
+    """
+    Sanitize decoded HTML as validate_input does.
+    
+    Documents that only use allowed, well-formed markup are returned
+    unchanged by bleach, so they skip it (see scan_html).
+    """
+    if not config.sanitize_html:
+        return content
     
+    if '\r' in content:
+        # Line endings are normalized by every HTML parser
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    with span('scan'):
+        clean = scan_html(content, config, limit=1).clean
+    if not clean:
+        with span('sanitize'):
+            content = sanitize_html(content, config, parser)
     return content
@@ -0,0 +1,680 @@
+"""
+SlateQuill conversion daemon.
+
+The server keeps a pool of warm conversion worker processes and accepts
+requests from many client processes at once, over a Unix domain socket
+(NDJSON, one request and one result per line) or over HTTP on localhost.
+Conversion requests use the format of the NDJSON worker (see
+SlateQuill.worker); in addition:
+
+    {"id": 1, "batch": [{"html": "..."}, {"input": "a.html", "output": "a.md"}]}
+    {"op": "health"}
+    {"op": "stats"}
+    {"op": "reload"}
+
+Over HTTP, conversion and batch requests are POSTed to /convert; GET /health,
+GET /stats and POST /reload serve the operations.
+
+The workers share the configured result cache. When the configuration file
+changes (or on SIGHUP), it is loaded again and a new pool is started; the old
+pool finishes the conversions it already has.
+
+Any local process can reach the server, so it only converts files inside its
+root directories (the working directory by default), and requests may only
+override conversion settings. The socket is created with mode 0600 in the
+per-user runtime directory (see SlateQuill.client.runtime_dir). HTTP requests
+must carry the token the server writes to that directory, as
+"Authorization: Bearer <token>", and POST requests must be application/json;
+requests with an Origin header are refused, so web pages can't use the server.
+"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+import errno
+import hmac
+import json
+import os
+from pathlib import Path
+import secrets
+import socket
+import stat
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from .client import DEFAULT_HOST, SOCKET_NAME, runtime_dir, token_path
+from .config import Config, find_config_file, load_config
+from .engine import resolve_worker_count
+from .exceptions import ConversionError, InvalidInputError, SecurityError, ServerBusyError, SlateQuillError
+from .plan import ConversionPlan, compile_plan
+from .worker import ConversionWorker, error_result
+
+# Requests are JSON-escaped HTML, so allow lines of a few times the file size limit
+_REQUEST_SIZE_FACTOR = 4
+
+_HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    415: "Unsupported Media Type",
+    503: "Service Unavailable",
+}
+
+# Per-process state of pool workers, populated by _initialize_worker
+_worker: Optional[ConversionWorker] = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _initialize_worker(config: Config, plan: ConversionPlan, roots: List[Path]) -> None:
+    """Prepare a pool worker: import the pipeline and keep it warm."""
+    global _worker, _worker_loop
+
+    # Importing core registers the converters once per worker process
+    from . import core  # noqa: F401
+
+    _worker = ConversionWorker(config, plan, roots)
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+
+
+def _handle_requests(requests: List[Any]) -> List[Dict[str, Any]]:
+    """Handle conversion requests inside a pool worker."""
+    assert _worker is not None and _worker_loop is not None
+    return [_worker_loop.run_until_complete(_worker.handle(request)) for request in requests]
+
+
+@dataclass
+class ServerStats:
+    """Counters reported by the stats operation."""
+
+    started: float = field(default_factory=time.time)
+    # Documents converted (batch items count individually) and failed
+    requests: int = 0
+    failed: int = 0
+    batches: int = 0
+    # Requests turned away because max_queue documents were pending
+    rejected: int = 0
+    # Documents accepted and not finished yet, and those being converted
+    pending: int = 0
+    in_flight: int = 0
+    reloads: int = 0
+    reload_errors: int = 0
+    # Wall time spent converting, summed over requests
+    busy_seconds: float = 0.0
+
+
+class ConversionServer:
+    """
+    Conversion daemon with a warm worker pool.
+
+    Requests are converted on at most workers processes at a time. Up to
+    max_queue documents are accepted (converting or waiting for a worker);
+    requests beyond that are rejected with ServerBusyError (HTTP 503).
+    Input and output paths must be inside roots (default: the working
+    directory).
+    """
+
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        config_path: Optional[Path] = None,
+        workers: Optional[int] = None,
+        max_queue: int = 1024,
+        reload_interval: float = 1.0,
+        roots: Optional[Sequence[Path]] = None
+    ) -> None:
+        self.roots = [Path(root).resolve() for root in roots] if roots else [Path.cwd().resolve()]
+        self.token = secrets.token_urlsafe(32)
+        self.config_path = find_config_file(config_path) or config_path or Path(".slateQuill.toml")
+        self.config = config or load_config(config_path)
+        self.plan = compile_plan(self.config)
+        self.max_queue = max_queue
+        self.reload_interval = reload_interval
+        self.stats = ServerStats()
+        self._workers_option = workers
+        self.workers = resolve_worker_count(self.config, workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Chunks being converted; at most workers at a time, even across reloads
+        self._busy = 0
+        self._slots: Optional[asyncio.Condition] = None
+        self._servers: List[asyncio.AbstractServer] = []
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._stopped: Optional[asyncio.Event] = None
+        self._config_signature = _file_signature(self.config_path)
+        self._unix_path: Optional[Path] = None
+        self._unix_inode: Optional[Tuple[int, int]] = None
+        self._token_path: Optional[Path] = None
+        self._http_hosts = {"localhost", "127.0.0.1", "::1"}
+        self._connections: Set[asyncio.StreamWriter] = set()
+
+    @property
+    def _request_limit(self) -> int:
+        return _REQUEST_SIZE_FACTOR * self.config.security.max_file_size + 65_536
+
+    async def start(
+        self,
+        socket_path: Optional[Path] = None,
+        port: Optional[int] = None,
+        host: str = DEFAULT_HOST
+    ) -> None:
+        """
+        Start the worker pool and the listeners.
+
+        Args:
+            socket_path: Unix domain socket to listen on (default without
+                port: slatequill.sock in the runtime directory)
+            port: Localhost HTTP port to listen on (in addition to, or instead
+                of, the socket); 0 picks a free port
+            host: HTTP interface (localhost by default)
+
+        Raises:
+            OSError: If a server is already listening on socket_path, or
+                something other than a socket is there
+            SecurityError: If the runtime directory is not private
+        """
+        if socket_path is None and port is None:
+            socket_path = runtime_dir(create=True) / SOCKET_NAME
+        if socket_path is not None:
+            sock = await _bind_unix_socket(socket_path)
+            self._servers.append(await asyncio.start_unix_server(
+                self._handle_stream, sock=sock, limit=self._request_limit
+            ))
+            self._unix_path = socket_path
+            info = socket_path.stat()
+            self._unix_inode = (info.st_dev, info.st_ino)
+        if port is not None:
+            server = await asyncio.start_server(self._handle_http, host=host, port=port, limit=self._request_limit)
+            self._servers.append(server)
+            self._http_hosts.add(host)
+            self._token_path = _write_token(server.sockets[0].getsockname()[1], self.token)
+
+        self._stopped = asyncio.Event()
+        self._slots = asyncio.Condition()
+        self._pool = self._new_pool()
+        self._tasks.append(asyncio.ensure_future(self._watch_config()))
+
+    @property
+    def addresses(self) -> List[str]:
+        """Addresses the server listens on."""
+        addresses = []
+        for server in self._servers:
+            for sock in server.sockets:
+                name = sock.getsockname()
+                addresses.append(name if isinstance(name, str) else f"http://{name[0]}:{name[1]}")
+        return addresses
+
+    async def serve_forever(self) -> None:
+        """Serve until stop() is called, then shut down gracefully."""
+        assert self._stopped is not None
+        await self._stopped.wait()
+        await self.close()
+
+    def stop(self) -> None:
+        """Ask serve_forever to shut down."""
+        if self._stopped is not None:
+            self._stopped.set()
+
+    async def close(self) -> None:
+        """Stop listening, wait for pending conversions and stop the pool."""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+        for server in self._servers:
+            server.close()
+        while self.stats.pending:
+            await asyncio.sleep(0.05)
+        for connection in list(self._connections):
+            connection.close()
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers.clear()
+        if self._unix_path is not None:
+            # Only the server's own socket; another server may have replaced it
+            try:
+                info = self._unix_path.stat()
+                if (info.st_dev, info.st_ino) == self._unix_inode:
+                    self._unix_path.unlink()
+            except OSError:
+                pass
+            self._unix_path = None
+        if self._token_path is not None:
+            self._token_path.unlink(missing_ok=True)
+            self._token_path = None
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.get_running_loop().run_in_executor(None, pool.shutdown)
+
+    def reload(self) -> bool:
+        """
+        Load the configuration file again and switch to a new worker pool.
+
+        Conversions already submitted finish on the old pool. If the file is
+        invalid, the current configuration stays in effect.
+
+        Returns:
+            Whether the new configuration was applied
+        """
+        self._config_signature = _file_signature(self.config_path)
+        try:
+            config = load_config(self.config_path)
+            plan = compile_plan(config)
+        except (ValueError, OSError, SlateQuillError) as e:
+            self.stats.reload_errors += 1
+            print(f"Failed to reload {self.config_path}: {e}", file=sys.stderr)
+            return False
+
+        self.config = config
+        self.plan = plan
+        self.workers = resolve_worker_count(config, self._workers_option)
+        # Chunks waiting for a slot see the new worker count when the next one finishes
+        self._replace_pool()
+        self.stats.reloads += 1
+        return True
+
+    async def handle(self, request: Any) -> Dict[str, Any]:
+        """
+        Process one request (conversion, batch or operation).
+
+        Raises:
+            ServerBusyError: If the queue has no room for the request
+        """
+        if isinstance(request, dict) and "op" in request:
+            return self._operation(request)
+
+        if isinstance(request, dict) and "batch" in request:
+            batch = request["batch"]
+            if not isinstance(batch, list):
+                return error_result(request.get("id"), InvalidInputError("Request batch must be a list"))
+            self.stats.batches += 1
+            results = await self._dispatch(batch)
+            return {"id": request.get("id"), "ok": all(result["ok"] for result in results), "results": results}
+
+        return (await self._dispatch([request]))[0]
+
+    def health(self) -> Dict[str, Any]:
+        """Report whether the server is accepting requests."""
+        return {
+            "status": "ok" if self._pool is not None else "stopping",
+            "uptime": round(time.time() - self.stats.started, 3),
+            "workers": self.workers,
+        }
+
+    def stats_snapshot(self) -> Dict[str, Any]:
+        """Return the server counters and settings."""
+        stats = asdict(self.stats)
+        stats.update(
+            uptime=round(time.time() - self.stats.started, 3),
+            workers=self.workers,
+            max_queue=self.max_queue,
+            config=str(self.config_path),
+        )
+        return stats
+
+    def _operation(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request["op"]
+        if op == "health":
+            result = self.health()
+        elif op == "stats":
+            result = self.stats_snapshot()
+        elif op == "reload":
+            result = {"reloaded": self.reload()}
+        else:
+            return error_result(request.get("id"), InvalidInputError(f"Unknown operation: {op}"))
+        return {"id": request.get("id"), "ok": True, **result}
+
+    async def _dispatch(self, requests: List[Any]) -> List[Dict[str, Any]]:
+        """Convert requests on the pool, split into one chunk per worker."""
+        if self.stats.pending + len(requests) > self.max_queue:
+            self.stats.rejected += len(requests)
+            raise ServerBusyError(
+                "Conversion queue is full",
+                {"pending": self.stats.pending, "max_queue": self.max_queue}
+            )
+
+        size = -(-len(requests) // self.workers) if requests else 1
+        chunks = [requests[start:start + size] for start in range(0, len(requests), size)]
+        self.stats.pending += len(requests)
+        try:
+            results = await asyncio.gather(*(self._run_chunk(chunk) for chunk in chunks))
+        finally:
+            self.stats.pending -= len(requests)
+        flat = [result for chunk_results in results for result in chunk_results]
+
+        self.stats.requests += len(flat)
+        self.stats.failed += sum(1 for result in flat if not result["ok"])
+        return flat
+
+    async def _run_chunk(self, chunk: List[Any]) -> List[Dict[str, Any]]:
+        assert self._slots is not None
+        async with self._slots:
+            await self._slots.wait_for(lambda: self._busy < self.workers)
+            self._busy += 1
+        try:
+            pool = self._pool
+            if pool is None:
+                raise ServerBusyError("Server is shutting down")
+            self.stats.in_flight += len(chunk)
+            start = time.perf_counter()
+            try:
+                return await self._submit(pool, chunk)
+            except ServerBusyError:
+                raise
+            except BrokenProcessPool as e:
+                # A worker died (crash, OOM killer) while converting the chunk
+                self._replace_pool(pool)
+                return _chunk_errors(chunk, ConversionError(f"Worker process exited unexpectedly: {e}"))
+            except Exception as e:
+                return _chunk_errors(chunk, ConversionError(f"Unexpected error: {e}"))
+            finally:
+                self.stats.busy_seconds += time.perf_counter() - start
+                self.stats.in_flight -= len(chunk)
+        finally:
+            self._busy -= 1
+            await self._notify_slots()
+
+    async def _submit(self, pool: ProcessPoolExecutor, chunk: List[Any]) -> List[Dict[str, Any]]:
+        """Convert a chunk on pool, or on a new pool if a worker died while idle."""
+        try:
+            future = pool.submit(_handle_requests, chunk)
+        except BrokenProcessPool:
+            # Nothing of the chunk ran yet, so it is safe to submit again
+            new_pool = self._replace_pool(pool)
+            if new_pool is None:
+                raise ServerBusyError("Server is shutting down")
+            future = new_pool.submit(_handle_requests, chunk)
+        return await asyncio.wrap_future(future)
+
+    async def _notify_slots(self) -> None:
+        assert self._slots is not None
+        async with self._slots:
+            self._slots.notify_all()
+
+    def _replace_pool(self, broken: Optional[ProcessPoolExecutor] = None) -> Optional[ProcessPoolExecutor]:
+        """
+        Switch to a new worker pool; the old one finishes what it has.
+
+        With broken, the pool is only replaced if it is still current, so
+        chunks failing on the same broken pool start one new pool.
+
+        Returns:
+            The current pool (None once the server is closed)
+        """
+        old_pool = self._pool
+        if broken is not None and old_pool is not broken:
+            return old_pool
+        self._pool = self._new_pool()
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+        return self._pool
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_initialize_worker,
+            initargs=(self.config, self.plan, self.roots)
+        )
+
+    async def _watch_config(self) -> None:
+        """Reload when the configuration file is created, changed or removed."""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            if _file_signature(self.config_path) != self._config_signature:
+                self.reload()
+
+    async def _handle_stream(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve NDJSON requests on a socket connection, one line at a time."""
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Longer than the request limit; the stream can't be resynchronized
+                    await _write_line(writer, error_result(None, InvalidInputError("Request is too large")))
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                await _write_line(writer, await self._handle_payload(line))
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _handle_payload(self, payload: bytes) -> Dict[str, Any]:
+        try:
+            request = json.loads(payload)
+        except ValueError as e:
+            return error_result(None, InvalidInputError(f"Invalid JSON request: {e}"))
+        try:
+            return await self.handle(request)
+        except SlateQuillError as e:
+            return error_result(request.get("id") if isinstance(request, dict) else None, e)
+
+    async def _handle_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP/1.1 requests (with keep-alive) on a connection."""
+        self._connections.add(writer)
+        try:
+            while True:
+                request = await _read_http_request(reader, self._request_limit)
+                if request is None:
+                    break
+                method, target, headers, body, status = request
+                if status is None:
+                    status = self._check_http(method, headers)
+                if status is None:
+                    status, result = await self._route(method, target, body)
+                elif status in (401, 403):
+                    result = error_result(None, SecurityError(_HTTP_REASONS[status]))
+                else:
+                    result = error_result(None, InvalidInputError(_HTTP_REASONS[status]))
+                keep_alive = status != 413 and headers.get("connection", "").lower() != "close"
+                await _write_http_response(writer, status, result, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    def _check_http(self, method: str, headers: Dict[str, str]) -> Optional[int]:
+        """Return the error status of a request that may not use the server, or None."""
+        # Browsers send Origin with cross-site requests; the server has no web clients
+        if "origin" in headers:
+            return 403
+        # A name other than localhost means the page's DNS name was rebound to 127.0.0.1
+        if _host_name(headers.get("host", "")) not in self._http_hosts:
+            return 403
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode(), self.token.encode()):
+            return 401
+        # Forms can't send JSON, and cross-site scripts can't without a preflight
+        if method == "POST" and headers.get("content-type", "").split(";")[0].strip().lower() != "application/json":
+            return 415
+        return None
+
+    async def _route(self, method: str, target: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        path = target.split("?", 1)[0]
+        routes = {"/convert": "POST", "/reload": "POST", "/health": "GET", "/stats": "GET"}
+        if path not in routes:
+            return 404, error_result(None, InvalidInputError(f"Not found: {path}"))
+        if method != routes[path]:
+            return 405, error_result(None, InvalidInputError(f"Use {routes[path]} for {path}"))
+
+        if path != "/convert":
+            return 200, self._operation({"op": path.lstrip("/")})
+
+        try:
+            request = json.loads(body)
+        except ValueError as e:
+            return 400, error_result(None, InvalidInputError(f"Invalid JSON request: {e}"))
+        try:
+            return 200, await self.handle(request)
+        except ServerBusyError as e:
+            return 503, error_result(request.get("id") if isinstance(request, dict) else None, e)
+
+
+async def _bind_unix_socket(path: Path) -> socket.socket:
+    """
+    Bind a Unix domain socket at path with mode 0600.
+
+    A socket left behind by a server that is no longer running is replaced.
+
+    Raises:
+        OSError: If a server is listening on path, or path is not a socket
+    """
+    try:
+        info = path.lstat()
+    except FileNotFoundError:
+        pass
+    else:
+        if not stat.S_ISSOCK(info.st_mode):
+            raise FileExistsError(errno.EEXIST, "Not a socket, refusing to replace it", str(path))
+        try:
+            _, writer = await asyncio.open_unix_connection(str(path))
+        except OSError:
+            path.unlink()
+        else:
+            writer.close()
+            raise OSError(errno.EADDRINUSE, "A server is already listening on the socket", str(path))
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Created with the umask's mode; clear the group and other bits before it exists
+    umask = os.umask(0o177)
+    try:
+        sock.bind(str(path))
+    except OSError:
+        sock.close()
+        raise
+    finally:
+        os.umask(umask)
+    os.chmod(path, 0o600)
+    return sock
+
+
+def _write_token(port: int, token: str) -> Path:
+    """Write the token of the HTTP server on port, readable by the user only."""
+    runtime_dir(create=True)
+    path = token_path(port)
+    path.unlink(missing_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="ascii") as f:
+        f.write(token + "\n")
+    return path
+
+
+def _host_name(host: str) -> str:
+    """Host name of a Host header, without the port."""
+    if host.startswith("["):
+        return host[1:].partition("]")[0]
+    return host.rpartition(":")[0] if host.count(":") == 1 else host
+
+
+def _chunk_errors(chunk: List[Any], error: SlateQuillError) -> List[Dict[str, Any]]:
+    """Error results of the requests of a chunk that failed as a whole."""
+    return [error_result(request.get("id") if isinstance(request, dict) else None, error) for request in chunk]
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        info = path.stat()
+    except OSError:
+        return None
+    return info.st_mtime_ns, info.st_size
+
+
+async def _write_line(writer: asyncio.StreamWriter, result: Dict[str, Any]) -> None:
+    writer.write(json.dumps(result, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+    await writer.drain()
+
+
+async def _read_http_request(
+    reader: asyncio.StreamReader,
+    limit: int
+) -> Optional[Tuple[str, str, Dict[str, str], bytes, Optional[int]]]:
+    """
+    Read one HTTP request.
+
+    Returns:
+        (method, target, headers, body, error status) or None at end of stream
+    """
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    parts = request_line.decode("latin-1").split()
+    if len(parts) != 3:
+        return "", "", {"connection": "close"}, b"", 400
+    method, target, _ = parts
+
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        return method, target, {"connection": "close"}, b"", 400
+    if length > limit:
+        return method, target, headers, b"", 413
+    body = await reader.readexactly(length) if length > 0 else b""
+    return method, target, headers, body, None
+
+
+async def _write_http_response(
+    writer: asyncio.StreamWriter,
+    status: int,
+    result: Dict[str, Any],
+    keep_alive: bool
+) -> None:
+    body = json.dumps(result, ensure_ascii=False, default=str).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {_HTTP_REASONS.get(status, '')}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+async def serve(
+    config_path: Optional[Path] = None,
+    socket_path: Optional[Path] = None,
+    port: Optional[int] = None,
+    host: str = DEFAULT_HOST,
+    workers: Optional[int] = None,
+    max_queue: int = 1024,
+    roots: Optional[Sequence[Path]] = None
+) -> None:
+    """
+    Run a conversion server until SIGINT or SIGTERM.
+
+    SIGHUP reloads the configuration.
+    """
+    import signal
+
+    server = ConversionServer(config_path=config_path, workers=workers, max_queue=max_queue, roots=roots)
+    await server.start(socket_path=socket_path, port=port, host=host)
+
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, server.stop)
+    if hasattr(signal, "SIGHUP"):
+        loop.add_signal_handler(signal.SIGHUP, server.reload)
+
+    print(f"SlateQuill server (pid {os.getpid()}) listening on {', '.join(server.addresses)}", file=sys.stderr)
+    await server.serve_forever()
@@ -0,0 +1,306 @@
+"""
+SlateQuill sharded directory conversions.
+
+A directory conversion can be split over several machines by running it with
+a shard i/n on each of them. Files are assigned to shards by a stable hash of
+their path relative to the input directory, so every machine independently
+picks the same partition without coordination. Each shard keeps its own build
+manifest and writes a shard report to the output directory; merging the
+reports gives the summary of the whole run and detects files that no shard
+or more than one shard converted.
+"""
+
+from dataclasses import dataclass, field
+import hashlib
+import json
+import os
+from pathlib import Path
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import __version__
+from .engine import ConversionResult
+from .exceptions import ConfigurationError, FileProcessingError
+
+SHARD_REPORT_FORMAT = 1
+
+_SHARD_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d+)\s*$")
+_REPORT_GLOB = ".slatequill-shard-*-of-*.json"
+# Tree digests are sums of path hashes modulo 2**64
+_DIGEST_MASK = (1 << 64) - 1
+
+
+def path_hash(rel_key: str) -> int:
+    """Stable 64-bit hash of a relative path (POSIX separators)."""
+    return int.from_bytes(hashlib.blake2b(rel_key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+@dataclass(frozen=True)
+class Shard:
+    """Shard index of count (1-based), owning the files whose path hash is index - 1 modulo count."""
+
+    index: int
+    count: int
+
+    def __post_init__(self) -> None:
+        if not 1 <= self.index <= self.count:
+            raise ConfigurationError(f"Invalid shard {self}: the index must be between 1 and {self.count}")
+
+    @classmethod
+    def parse(cls, spec: str) -> "Shard":
+        """
+        Parse a shard given as "i/n".
+
+        Raises:
+            ConfigurationError: If spec is not a valid shard
+        """
+        match = _SHARD_RE.match(spec)
+        if match is None:
+            raise ConfigurationError(f"Invalid shard {spec!r}: expected i/n, e.g. 1/4")
+        return cls(int(match.group(1)), int(match.group(2)))
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def owns(self, rel_key: str) -> bool:
+        """Check whether a file (path relative to the input directory) belongs to this shard."""
+        return path_hash(rel_key) % self.count == self.index - 1
+
+    @property
+    def manifest_name(self) -> str:
+        """File name of the shard's build manifest."""
+        return f".slatequill-manifest.shard-{self.index}-of-{self.count}.json"
+
+    @property
+    def report_name(self) -> str:
+        """File name of the shard's report."""
+        return f".slatequill-shard-{self.index}-of-{self.count}.json"
+
+
+class ShardReport:
+    """
+    What one shard of a directory conversion did.
+
+    Every file found in the input directory is counted and added to an
+    order-independent digest of the tree, so merging can tell whether the
+    shards saw the same inputs; only the shard's own files are recorded.
+    """
+
+    def __init__(self, shard: Shard, fingerprint: str) -> None:
+        self.shard = shard
+        self.fingerprint = fingerprint
+        # All files found, and those that belong to this shard
+        self.scanned = 0
+        self.owned = 0
+        self.tree_digest = 0
+        # Status of each file of the shard that was converted, skipped or failed
+        self.files: Dict[str, str] = {}
+        self.errors: Dict[str, str] = {}
+        self.deduplicated = 0
+        self.orphaned = 0
+        self.pruned = 0
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        # Whether the run went through all files (False if it was interrupted)
+        self.complete = False
+
+    def scan(self, rel_key: str) -> bool:
+        """Count a file found in the input directory and return whether it belongs to the shard."""
+        digest = path_hash(rel_key)
+        self.scanned += 1
+        self.tree_digest = (self.tree_digest + digest) & _DIGEST_MASK
+        if digest % self.shard.count != self.shard.index - 1:
+            return False
+        self.owned += 1
+        return True
+
+    def add(self, rel_key: str, result: ConversionResult) -> None:
+        """Record the result of a file."""
+        if result.status == "orphaned":
+            self.orphaned += 1
+        elif result.status == "pruned":
+            self.pruned += 1
+        else:
+            self.files[rel_key] = result.status
+            if result.error is not None:
+                self.errors[rel_key] = result.error.message
+            if result.duplicate_of is not None:
+                self.deduplicated += 1
+
+    def finish(self, complete: bool) -> None:
+        """Mark the end of the run."""
+        self.finished = time.time()
+        self.complete = complete
+
+    @property
+    def elapsed(self) -> float:
+        """Duration of the run in seconds."""
+        return (self.finished or time.time()) - self.started
+
+    def count(self, status: str) -> int:
+        """Number of files with a status."""
+        return sum(1 for file_status in self.files.values() if file_status == status)
+
+    def save(self, output_dir: Path) -> Path:
+        """
+        Write the report to output_dir atomically.
+
+        Raises:
+            FileProcessingError: If the report cannot be written
+        """
+        path = output_dir / self.shard.report_name
+        data = {
+            "format": SHARD_REPORT_FORMAT,
+            "version": __version__,
+            "shard": [self.shard.index, self.shard.count],
+            "fingerprint": self.fingerprint,
+            "scanned": self.scanned,
+            "owned": self.owned,
+            "tree_digest": format(self.tree_digest, "016x"),
+            "started": self.started,
+            "finished": self.finished,
+            "complete": self.complete,
+            "deduplicated": self.deduplicated,
+            "orphaned": self.orphaned,
+            "pruned": self.pruned,
+            "files": dict(sorted(self.files.items())),
+            "errors": dict(sorted(self.errors.items())),
+        }
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            raise FileProcessingError(f"Failed to write shard report {path}: {e}")
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "ShardReport":
+        """
+        Read a shard report.
+
+        Raises:
+            FileProcessingError: If the file cannot be read or is not a shard report
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") != SHARD_REPORT_FORMAT:
+                raise ValueError(f"unsupported format {data.get('format')!r}")
+            report = cls(Shard(*data["shard"]), data["fingerprint"])
+            report.scanned = data["scanned"]
+            report.owned = data["owned"]
+            report.tree_digest = int(data["tree_digest"], 16)
+            report.started = data["started"]
+            report.finished = data["finished"]
+            report.complete = data["complete"]
+            report.deduplicated = data["deduplicated"]
+            report.orphaned = data["orphaned"]
+            report.pruned = data["pruned"]
+            report.files = data["files"]
+            report.errors = data["errors"]
+        except (OSError, ValueError, KeyError, TypeError, ConfigurationError) as e:
+            raise FileProcessingError(f"Failed to read shard report {path}: {e}")
+        return report
+
+
+@dataclass
+class MergedReport:
+    """Summary of a sharded run, combined from its shard reports."""
+
+    shard_count: int
+    reports: List[ShardReport]
+    # Number of files per status over all shards
+    counts: Dict[str, int] = field(default_factory=dict)
+    # (relative path, error message) of failed files
+    failed: List[Tuple[str, str]] = field(default_factory=list)
+    # Shards without a report, and shards with more than one
+    missing_shards: List[int] = field(default_factory=list)
+    duplicate_shards: List[int] = field(default_factory=list)
+    # Files reported by more than one shard
+    overlaps: List[str] = field(default_factory=list)
+    # Number of files found in the input directory that no shard processed
+    gaps: int = 0
+    # Reports that don't belong to the same run (other shard counts, settings or inputs)
+    problems: List[str] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        """Whether every file was processed by exactly one shard of the same run."""
+        return not (self.missing_shards or self.duplicate_shards or self.overlaps or self.gaps or self.problems)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary as a JSON-serializable dict."""
+        return {
+            "shards": self.shard_count,
+            "complete": self.complete,
+            "counts": self.counts,
+            "failed": [{"path": rel_key, "error": error} for rel_key, error in self.failed],
+            "missing_shards": self.missing_shards,
+            "duplicate_shards": self.duplicate_shards,
+            "overlaps": self.overlaps,
+            "gaps": self.gaps,
+            "problems": self.problems,
+            "elapsed": max((report.elapsed for report in self.reports), default=0.0),
+        }
+
+
+def find_shard_reports(paths: Iterable[Path]) -> List[Path]:
+    """Expand output directories into the shard reports they contain; files are kept as they are."""
+    found: List[Path] = []
+    for path in paths:
+        if path.is_dir():
+            found.extend(sorted(path.glob(_REPORT_GLOB)))
+        else:
+            found.append(path)
+    return found
+
+
+def merge_shard_reports(paths: Iterable[Path]) -> MergedReport:
+    """
+    Combine the reports of the shards of a run.
+
+    Raises:
+        FileProcessingError: If a report cannot be read, or there is none
+    """
+    reports = [ShardReport.load(path) for path in paths]
+    if not reports:
+        raise FileProcessingError("No shard reports found")
+
+    first = reports[0]
+    merged = MergedReport(first.shard.count, reports)
+    for report in reports[1:]:
+        if report.shard.count != first.shard.count:
+            merged.problems.append(f"Shard {report.shard} is from a run with another number of shards than {first.shard}")
+        if report.fingerprint != first.fingerprint:
+            merged.problems.append(f"Shard {report.shard} was converted with other settings than shard {first.shard}")
+        if (report.scanned, report.tree_digest) != (first.scanned, first.tree_digest):
+            merged.problems.append(f"Shard {report.shard} found other input files than shard {first.shard}")
+
+    indexes: Dict[int, int] = {}
+    for report in reports:
+        indexes[report.shard.index] = indexes.get(report.shard.index, 0) + 1
+    merged.missing_shards = [index for index in range(1, merged.shard_count + 1) if index not in indexes]
+    merged.duplicate_shards = sorted(index for index, count in indexes.items() if count > 1)
+
+    # Shard of each processed file
+    owners: Dict[str, Shard] = {}
+    overlaps = set()
+    for report in reports:
+        for rel_key, status in report.files.items():
+            if rel_key in owners:
+                overlaps.add(rel_key)
+            else:
+                owners[rel_key] = report.shard
+            merged.counts[status] = merged.counts.get(status, 0) + 1
+        merged.failed.extend(sorted(report.errors.items()))
+    merged.overlaps = sorted(overlaps)
+    for name in ("deduplicated", "orphaned", "pruned"):
+        merged.counts[name] = sum(getattr(report, name) for report in reports)
+
+    if not merged.problems:
+        merged.gaps = max(first.scanned - len(owners), 0)
+    return merged
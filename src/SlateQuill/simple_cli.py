@@ -4,13 +4,12 @@ Simple CLI interface for SlateQuill.
 This module provides a basic command-line interface for testing purposes.
 """
 
-import asyncio
 import sys
 from pathlib import Path
 
+# Only what --version and --help need is imported here: the converters,
+# bs4 and pydantic are imported once a conversion actually runs
 from . import __version__
-from .config import Config, load_config
-from .core import convert_file, list_supported_formats
 from .exceptions import SlateQuillError
 
 
@@ -19,6 +18,7 @@ def main():
     if len(sys.argv) < 2:
         print(f"SlateQuill v{__version__}")
         print("Usage: SlateQuill <input_file> [output_file]")
+        print("       SlateQuill --worker [config_file]")
         print("       SlateQuill --version")
         print("       SlateQuill --help")
         return
@@ -28,27 +28,59 @@ def main():
         return
     
     if sys.argv[1] == "--help":
+        from .plugins.registry import list_supported_formats
+        
         print(f"SlateQuill v{__version__}")
         print("A robust Python CLI tool for converting HTML documents to clean, standards-compliant Markdown")
         print()
         print("Usage:")
         print("  SlateQuill <input_file> [output_file]")
+        print("  SlateQuill --worker [config_file]")
         print("  SlateQuill --version")
         print("  SlateQuill --help")
         print()
+        print("--worker reads NDJSON conversion requests on stdin and writes one")
+        print("NDJSON result per request to stdout (see SlateQuill.worker).")
+        print()
         print("Supported formats:")
         for fmt in list_supported_formats():
             print(f"  {fmt}")
         return
     
+    if sys.argv[1] == "--worker":
+        import json
+        
+        from .config import load_config
+        from .exceptions import ConfigurationError
+        from .worker import error_result, run_worker
+        
+        try:
+            config = load_config(Path(sys.argv[2]) if len(sys.argv) > 2 else None)
+        except SlateQuillError as e:
+            error = e
+        except Exception as e:
+            # Config.from_file raises ValueError for TOML syntax and validation errors
+            error = ConfigurationError(str(e))
+        else:
+            run_worker(config)
+            return
+        # The client reads the error like any other result
+        print(json.dumps(error_result(None, error), ensure_ascii=False, default=str), flush=True)
+        sys.exit(1)
+    
+    import asyncio
+    
+    from .config import load_config
+    from .core import convert_file
+    
     input_file = Path(sys.argv[1])
     output_file = Path(sys.argv[2]) if len(sys.argv) > 2 else input_file.with_suffix('.md')
     
     try:
         config = load_config()
-        result = asyncio.run(convert_file(input_file, output_file, config))
+        asyncio.run(convert_file(input_file, output_file, config, return_content=False))
         print(f"✅ Successfully converted {input_file} to {output_file}")
-        print(f"📊 Output length: {len(result)} characters")
+        print(f"📊 Output size: {output_file.stat().st_size} bytes")
     except SlateQuillError as e:
         print(f"❌ Error: {e.message}")
         sys.exit(1)
@@ -0,0 +1,345 @@
+"""
+SlateQuill supervised worker processes.
+
+A pathological document (megabytes of nested markup, a giant table) can keep
+the parser busy for minutes or exhaust memory. When resource budgets are
+configured, batches run on supervised workers: each worker process converts
+one file at a time while a thread in the parent watches the wall time, CPU
+time and resident memory the file takes. A worker that exceeds a budget is
+killed and replaced, its file fails with a ConversionError naming the stage
+it was in and the resources it used, and the other workers carry on. The
+memory budget limits how much a file adds to the worker's resident memory; a
+worker whose memory grew by more than the budget over several files is
+replaced between files.
+
+CPU time and memory are read from /proc. Where it is not available, only
+the wall time is watched, and CPU time is limited by the kernel
+(RLIMIT_CPU) where the resource module exists.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+import math
+import multiprocessing
+from multiprocessing.connection import Connection
+import os
+import queue
+import signal
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+from .config import Config, PerformanceConfig
+from .exceptions import ConversionError, SlateQuillError
+from .fileio import Job
+from .plan import ConversionPlan
+
+# Seconds between two checks of a busy worker
+_POLL_INTERVAL = 0.05
+# Size of the buffer through which a worker shares its current stage
+_STAGE_SIZE = 32
+# Seconds a worker is given to exit when the pool is closed
+_STOP_TIMEOUT = 2.0
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+@dataclass(frozen=True)
+class ResourceBudget:
+    """Resources one file of a batch may use; 0 means unlimited."""
+
+    cpu_time: float = 0.0
+    wall_time: float = 0.0
+    # Growth of the worker's resident memory during the file, in bytes
+    memory: int = 0
+
+    @classmethod
+    def from_config(cls, performance: PerformanceConfig) -> "ResourceBudget":
+        """Budget configured in the performance settings."""
+        return cls(performance.max_cpu_time, performance.max_wall_time, performance.max_memory)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any resource is limited."""
+        return bool(self.cpu_time or self.wall_time or self.memory)
+
+    def exceeded(self, wall_time: float, cpu_time: float, memory: int) -> Optional[str]:
+        """Return the name of the first budget the figures exceed, if any."""
+        if self.wall_time and wall_time > self.wall_time:
+            return "wall_time"
+        if self.cpu_time and cpu_time > self.cpu_time:
+            return "cpu_time"
+        if self.memory and memory > self.memory:
+            return "memory"
+        return None
+
+    def describe(self, name: str) -> str:
+        """Describe one of the budgets, e.g. "CPU time budget of 30s"."""
+        if name == "memory":
+            return f"memory budget of {self.memory / 2**20:.0f} MB"
+        if name == "cpu_time":
+            return f"CPU time budget of {self.cpu_time:g}s"
+        return f"wall time budget of {self.wall_time:g}s"
+
+
+def _process_usage(pid: int) -> Optional[Tuple[float, int]]:
+    """Return the CPU seconds and resident bytes of a process, if /proc provides them."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            statm = f.read()
+    except OSError:
+        return None
+    # The command name may contain spaces; the other fields follow its ")"
+    fields = stat[stat.rindex(b")") + 2:].split()
+    cpu_time = (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+    return cpu_time, int(statm.split()[1]) * _PAGE_SIZE
+
+
+class _StageTracker:
+    """Stage listener publishing the innermost running stage in a shared buffer."""
+
+    def __init__(self, buffer: Any) -> None:
+        self.buffer = buffer
+        self.stack: List[str] = []
+
+    def __call__(self, stage: str, entering: bool) -> None:
+        if entering:
+            self.stack.append(stage)
+        elif self.stack:
+            self.stack.pop()
+        self.buffer.value = (self.stack[-1] if self.stack else "").encode("ascii", "replace")[:_STAGE_SIZE - 1]
+
+
+def _limit_cpu_time(seconds: float) -> None:
+    """Have the kernel stop this process once it spends seconds more CPU time."""
+    try:
+        import resource
+    except ImportError:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = math.ceil(usage.ru_utime + usage.ru_stime + seconds)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_main(connection: Connection, stage: Any, config: Config, plan: ConversionPlan, cpu_time: float) -> None:
+    """Convert the jobs received on connection until it is closed or None is received."""
+    from .engine import _convert_job, _initialize_worker
+    from .profiling import add_stage_listener
+
+    # Interrupts are handled by the parent, which stops its workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _initialize_worker(config, plan)
+    add_stage_listener(_StageTracker(stage))
+
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        if cpu_time > 0:
+            _limit_cpu_time(cpu_time)
+        connection.send(_convert_job(*job))
+
+
+class _Worker:
+    """A worker process and the parent's end of its connection."""
+
+    def __init__(self, context: Any, config: Config, plan: ConversionPlan, budget: ResourceBudget) -> None:
+        self.stage = context.RawArray("c", _STAGE_SIZE)
+        self.connection, child = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child, self.stage, config, plan, budget.cpu_time),
+            name="slatequill-worker",
+            daemon=True
+        )
+        self.process.start()
+        child.close()
+        # Resident bytes before the first job, and whether the worker should be replaced
+        self.baseline: Optional[int] = None
+        self.retired = False
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def run(
+        self,
+        job: Job,
+        budget: ResourceBudget,
+        closing: threading.Event
+    ) -> Tuple[Optional[SlateQuillError], float]:
+        """Convert a job, killing the worker if it exceeds the budget; return the job's error and seconds."""
+        self.stage.value = b""
+        start = time.monotonic()
+        usage = _process_usage(self.process.pid)
+        cpu_start, rss_start = usage if usage is not None else (0.0, 0)
+        if self.baseline is None:
+            self.baseline = rss_start
+        # Unknown without /proc
+        cpu_time: Optional[float] = None
+        memory: Optional[int] = None
+
+        try:
+            self.connection.send(job)
+            while True:
+                if self.connection.poll(_POLL_INTERVAL):
+                    outcome: Tuple[Optional[SlateQuillError], float] = self.connection.recv()
+                    self._check_growth(budget)
+                    return outcome
+
+                usage = _process_usage(self.process.pid)
+                if usage is not None:
+                    cpu_time = usage[0] - cpu_start
+                    memory = max(memory or 0, usage[1] - rss_start)
+                exceeded = budget.exceeded(time.monotonic() - start, cpu_time or 0.0, memory or 0)
+                if exceeded is not None or closing.is_set():
+                    stage = self.kill()
+                    wall_time = time.monotonic() - start
+                    if exceeded is None:
+                        return ConversionError(f"Conversion of {job[0]} was cancelled"), wall_time
+                    reason = f"exceeded its {budget.describe(exceeded)}"
+                    return _resource_error(job, reason, exceeded, stage, wall_time, cpu_time, memory), wall_time
+        except (EOFError, OSError):
+            # The worker died
+            stage = self.kill()
+            exitcode = self.process.exitcode
+            if hasattr(signal, "SIGXCPU") and exitcode == -signal.SIGXCPU:
+                reason, exceeded = f"exceeded its {budget.describe('cpu_time')}", "cpu_time"
+            else:
+                reason, exceeded = f"crashed the worker (exit code {exitcode})", None
+            wall_time = time.monotonic() - start
+            return _resource_error(job, reason, exceeded, stage, wall_time, cpu_time, memory), wall_time
+
+    def _check_growth(self, budget: ResourceBudget) -> None:
+        """Retire the worker if memory kept by earlier files exceeds the budget."""
+        usage = _process_usage(self.process.pid)
+        if budget.memory and usage is not None and self.baseline is not None:
+            self.retired = usage[1] - self.baseline > budget.memory
+
+    def kill(self) -> str:
+        """Kill the worker process and return the stage it was in."""
+        stage = self.stage.value.decode("ascii", "replace")
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+        return stage
+
+    def stop(self) -> None:
+        """Let the worker process exit, killing it if it doesn't."""
+        if self.alive:
+            try:
+                self.connection.send(None)
+            except OSError:
+                pass
+            self.process.join(_STOP_TIMEOUT)
+        if self.alive:
+            self.kill()
+        else:
+            self.connection.close()
+
+
+def _resource_error(
+    job: Job,
+    reason: str,
+    budget: Optional[str],
+    stage: str,
+    wall_time: float,
+    cpu_time: Optional[float],
+    memory: Optional[int]
+) -> ConversionError:
+    """Error of a file whose worker was killed; its partial output is removed."""
+    input_path, output_path = job
+    try:
+        output_path.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+    figures = f"wall {wall_time:.1f}s"
+    if cpu_time is not None and memory is not None:
+        figures += f", CPU {cpu_time:.1f}s, RSS +{memory / 2**20:.0f} MB"
+    return ConversionError(
+        f"Failed to convert {input_path}: {reason} during stage {stage or 'startup'} ({figures})",
+        {
+            "budget": budget,
+            "stage": stage or None,
+            "wall_time": round(wall_time, 3),
+            "cpu_time": round(cpu_time, 3) if cpu_time is not None else None,
+            "memory": memory,
+        }
+    )
+
+
+class SupervisedPool:
+    """
+    Worker processes converting one file each at a time within a resource budget.
+
+    submit() runs a job on the next idle worker; a supervising thread per
+    busy worker enforces the budget. Workers that are killed or crash are
+    replaced right away, and so are workers retired for their memory growth.
+    """
+
+    def __init__(self, workers: int, config: Config, plan: ConversionPlan, budget: ResourceBudget) -> None:
+        self.budget = budget
+        self.config = config
+        self.plan = plan
+        # Number of workers that were killed or crashed and replaced
+        self.restarts = 0
+        self._context = multiprocessing.get_context()
+        self._closing = threading.Event()
+        self._lock = threading.Lock()
+        self._workers: List[_Worker] = []
+        self._idle: "queue.SimpleQueue[_Worker]" = queue.SimpleQueue()
+        for _ in range(max(workers, 1)):
+            self._idle.put(self._spawn())
+        self._threads = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="slatequill-supervisor")
+
+    def __enter__(self) -> "SupervisedPool":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def submit(self, job: Job) -> "Future[Tuple[Optional[SlateQuillError], float]]":
+        """Convert a job on the next idle worker; the future holds the job's error, if any, and its seconds."""
+        return self._threads.submit(self._run, job)
+
+    def close(self) -> None:
+        """Stop all workers; jobs that are still running are cancelled."""
+        self._closing.set()
+        self._threads.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.stop()
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._context, self.config, self.plan, self.budget)
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _run(self, job: Job) -> Tuple[Optional[SlateQuillError], float]:
+        worker = self._idle.get()
+        outcome = worker.run(job, self.budget, self._closing)
+        if worker.alive and not worker.retired:
+            self._idle.put(worker)
+            return outcome
+
+        crashed = not worker.alive
+        worker.stop()
+        with self._lock:
+            self._workers.remove(worker)
+        if not self._closing.is_set():
+            if crashed:
+                self.restarts += 1
+            self._idle.put(self._spawn())
+        return outcome
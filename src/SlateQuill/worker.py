@@ -0,0 +1,232 @@
+"""
+SlateQuill NDJSON worker.
+
+A long-lived process that reads conversion requests as newline-delimited
+JSON on stdin and writes one JSON result line per request to stdout, in
+request order. The interpreter, the converters and the configuration stay
+loaded between requests, so a build system pays startup once instead of
+once per document.
+
+Requests:
+
+    {"id": 1, "html": "<p>Hello</p>"}
+    {"id": 2, "input": "page.html"}
+    {"id": 3, "input": "page.html", "output": "page.md"}
+    {"id": 4, "html": "...", "config": {"conversion": {"line_length": 0}}}
+
+Results:
+
+    {"id": 1, "ok": true, "markdown": "Hello"}
+    {"id": 3, "ok": true, "output": "page.md"}
+    {"id": 4, "ok": false, "error": {"type": "SecurityError", "message": "...", "details": {}}}
+
+"id" is optional and echoed back unchanged. "config" overrides settings
+of the worker's configuration for that request only.
+
+Workers serving other processes (see SlateQuill.server) are given the
+directories requests may read and write; paths outside them are refused,
+and so are overrides of anything but the conversion settings, which would
+let a request relax the security limits or move the cache.
+"""
+
+import asyncio
+import json
+from pathlib import Path
+import sys
+from typing import Any, Dict, Optional, Sequence, TextIO, Tuple
+
+from pydantic import ValidationError
+
+from .charset import decode_html
+from .config import Config
+from .core import convert_file, convert_html
+from .exceptions import ConfigurationError, ConversionError, InvalidInputError, SecurityError, SlateQuillError
+from .fileio import read_input, release_input
+from .plan import ConversionPlan, compile_plan
+from .security import validate_file_path, validate_file_size
+
+# Configurations built from request overrides are kept for reuse
+_MAX_CACHED_CONFIGS = 64
+
+# Sections requests may override when the worker is restricted to roots
+_RESTRICTED_OVERRIDES = frozenset(["conversion"])
+
+
+def _merge(base: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Recursively merge overrides into a copy of base."""
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class ConversionWorker:
+    """Handle conversion requests with a warm configuration."""
+
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        plan: Optional[ConversionPlan] = None,
+        roots: Optional[Sequence[Path]] = None
+    ) -> None:
+        """
+        Args:
+            config: Base configuration of the requests
+            plan: Plan compiled from config, if the caller has one
+            roots: Directories that input and output paths must be in, for
+                workers serving other processes; this also limits config
+                overrides to the conversion settings (default: unrestricted)
+        """
+        self.config = config or Config()
+        self.plan = plan or compile_plan(self.config)
+        self.roots = [Path(root).resolve() for root in roots] if roots is not None else None
+        self._configs: Dict[str, Tuple[Config, ConversionPlan]] = {}
+
+    def config_for(self, overrides: Optional[Dict[str, Any]]) -> Config:
+        """
+        Return the configuration for a request.
+
+        Raises:
+            ConfigurationError: If the overrides are not a valid configuration
+        """
+        return self._resolve(overrides)[0]
+
+    def reload(self, config: Config) -> None:
+        """Replace the base configuration (and forget derived ones)."""
+        self.plan = compile_plan(config)
+        self.config = config
+        self._configs.clear()
+
+    def _resolve(self, overrides: Optional[Dict[str, Any]]) -> Tuple[Config, ConversionPlan]:
+        """Return the configuration and its compiled plan for a request."""
+        if not overrides:
+            return self.config, self.plan
+        if not isinstance(overrides, dict):
+            raise ConfigurationError("Request config must be an object")
+        if self.roots is not None:
+            refused = sorted(set(overrides) - _RESTRICTED_OVERRIDES)
+            if refused:
+                raise SecurityError(f"Request config may not override {', '.join(refused)}", {"sections": refused})
+
+        key = json.dumps(overrides, sort_keys=True)
+        resolved = self._configs.get(key)
+        if resolved is None:
+            try:
+                config = Config.model_validate(_merge(self.config.model_dump(), overrides))
+            except ValidationError as e:
+                raise ConfigurationError(f"Invalid config override: {e}")
+            resolved = (config, compile_plan(config))
+            if len(self._configs) >= _MAX_CACHED_CONFIGS:
+                self._configs.pop(next(iter(self._configs)))
+            self._configs[key] = resolved
+        return resolved
+
+    async def handle(self, request: Any) -> Dict[str, Any]:
+        """Process one request and return its result."""
+        request_id = request.get("id") if isinstance(request, dict) else None
+        try:
+            result = await self._convert(request)
+        except SlateQuillError as e:
+            return error_result(request_id, e)
+        except Exception as e:
+            return error_result(request_id, ConversionError(f"Unexpected error: {e}"))
+        return {"id": request_id, "ok": True, **result}
+
+    async def handle_line(self, line: str) -> Dict[str, Any]:
+        """Process one NDJSON request line."""
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return error_result(None, InvalidInputError(f"Invalid JSON request: {e}"))
+        return await self.handle(request)
+
+    async def _convert(self, request: Any) -> Dict[str, Any]:
+        if not isinstance(request, dict):
+            raise InvalidInputError("Request must be a JSON object")
+
+        config, plan = self._resolve(request.get("config"))
+
+        if "html" in request:
+            html = request["html"]
+            if not isinstance(html, str):
+                raise InvalidInputError("Request html must be a string")
+            return {"markdown": await convert_html(html, config, plan)}
+
+        if "input" not in request:
+            raise InvalidInputError("Request needs either html or input")
+        input_path = self._path(request["input"])
+
+        if request.get("output") is not None:
+            output_path = self._path(request["output"])
+            await convert_file(input_path, output_path, config, return_content=False, plan=plan)
+            return {"output": str(output_path)}
+
+        validate_file_path(input_path)
+        validate_file_size(input_path, plan.security.max_file_size)
+        content = await read_input(input_path, config.performance.mmap_threshold)
+        try:
+            html = decode_html(content)
+        finally:
+            release_input(content)
+        return {"markdown": await convert_html(html, config, plan)}
+
+    def _path(self, value: Any) -> Path:
+        """
+        Return a request path, checking that it is inside the roots.
+
+        Raises:
+            InvalidInputError: If the path is not a string
+            SecurityError: If the path is outside the roots
+        """
+        if not isinstance(value, str):
+            raise InvalidInputError("Request paths must be strings")
+        path = Path(value)
+        if self.roots is None:
+            return path
+        # Symbolic links and ".." are resolved before checking
+        resolved = path.resolve()
+        if not any(resolved.is_relative_to(root) for root in self.roots):
+            raise SecurityError(f"Path is outside the server's directories: {value}", {"path": value})
+        return resolved
+
+
+def error_result(request_id: Any, error: SlateQuillError) -> Dict[str, Any]:
+    """Build the result line for a failed request."""
+    return {
+        "id": request_id,
+        "ok": False,
+        "error": {
+            "type": type(error).__name__,
+            "message": error.message,
+            "details": error.details,
+        },
+    }
+
+
+def run_worker(
+    config: Optional[Config] = None,
+    stdin: Optional[TextIO] = None,
+    stdout: Optional[TextIO] = None
+) -> None:
+    """
+    Serve NDJSON requests from stdin until it is closed.
+
+    Each result is written and flushed as soon as its request is done.
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    worker = ConversionWorker(config)
+
+    loop = asyncio.new_event_loop()
+    try:
+        for line in stdin:
+            if not line.strip():
+                continue
+            result = loop.run_until_complete(worker.handle_line(line))
+            stdout.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+            stdout.flush()
+    finally:
+        loop.close()
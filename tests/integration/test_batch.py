@@ -0,0 +1,248 @@
+"""Tests for the streaming batch APIs."""
+
+import os
+from pathlib import Path
+import threading
+from typing import Any, Callable, Dict, Iterator, List
+
+import pytest
+
+from SlateQuill import dedup
+from SlateQuill.config import Config
+from SlateQuill.core import iter_batch_convert, iter_convert_directory
+from SlateQuill.engine import BatchReport, ConversionEngine
+
+
+def _config() -> Config:
+    config = Config()
+    config.performance.cache_results = False
+    return config
+
+
+def _write_inputs(directory: Path, count: int) -> List[Path]:
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index in range(count):
+        path = directory / f"page{index}.html"
+        path.write_text(f"<h1>Page {index}</h1>", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [1, 2], ids=["inline", "pool"])
+@pytest.mark.parametrize("schedule_window", [0, 8], ids=["batch-window", "schedule-window"])
+async def test_iter_batch_convert_pulls_inputs_lazily(tmp_path: Path, workers: int, schedule_window: int) -> None:
+    inputs = _write_inputs(tmp_path / "in", 40)
+    (tmp_path / "in" / "broken.html").write_bytes(b"<meta charset=utf-8>\xff")
+    inputs.append(tmp_path / "in" / "broken.html")
+    config = _config()
+    config.performance.batch_window = 4
+    # The scheduler orders the upcoming files of its window before starting any
+    config.performance.schedule_window = schedule_window
+    pulled: List[Path] = []
+
+    def input_files() -> Iterator[Path]:
+        for path in inputs:
+            pulled.append(path)
+            yield path
+
+    statuses: Dict[str, int] = {}
+    async for result in iter_batch_convert(input_files(), tmp_path / "out", config, workers):
+        if not statuses:
+            # The first result arrives before the whole input list was consumed
+            assert len(pulled) < len(inputs)
+        statuses[result.status] = statuses.get(result.status, 0) + 1
+
+    assert statuses == {"converted": 40, "failed": 1}
+    assert (tmp_path / "out" / "page39.md").read_text(encoding="utf-8") == "# Page 39"
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_iter_convert_directory_reports_incremental_statuses(tmp_path: Path) -> None:
+    _write_inputs(tmp_path / "in", 3)
+    config = _config()
+
+    first = [result.status async for result in iter_convert_directory(
+        tmp_path / "in", tmp_path / "out", config, max_workers=1, incremental=True
+    )]
+    (tmp_path / "in" / "page0.html").unlink()
+    second = sorted([result.status async for result in iter_convert_directory(
+        tmp_path / "in", tmp_path / "out", config, max_workers=1, incremental=True, prune=True
+    )])
+
+    assert first == ["converted"] * 3
+    assert second == ["pruned", "skipped", "skipped"]
+    assert not (tmp_path / "out" / "page0.md").exists()
+
+
+def _write_mirror(directory: Path) -> None:
+    pages = {
+        "index.html": "<h1>Home</h1>",
+        "print/index.html": "<h1>Home</h1>",
+        "de/index.html": "<h1>Home</h1>",
+        "about.html": "<h1>About</h1>",
+        # Same size as the home page, different content
+        "other.html": "<h1>Else</h1>",
+    }
+    for rel_path, html in pages.items():
+        path = directory / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(html, encoding="utf-8")
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [1, 2], ids=["inline", "pool"])
+async def test_iter_convert_directory_converts_identical_inputs_once(tmp_path: Path, workers: int) -> None:
+    _write_mirror(tmp_path / "in")
+    config = _config()
+    config.performance.dedup_method = "copy"
+
+    results = [result async for result in iter_convert_directory(
+        tmp_path / "in", tmp_path / "out", config, max_workers=workers
+    )]
+
+    assert sorted(result.status for result in results) == ["converted"] * 5
+    assert len([result for result in results if result.duplicate_of is not None]) == 2
+    for rel_path in ["index.md", "print/index.md", "de/index.md"]:
+        assert (tmp_path / "out" / rel_path).read_text(encoding="utf-8") == "# Home"
+    assert (tmp_path / "out" / "other.md").read_text(encoding="utf-8") == "# Else"
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_duplicates_are_hashed_and_linked_off_the_event_loop(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _write_mirror(tmp_path / "in")
+    threads = set()
+
+    def recording(function: Callable[..., Any]) -> Callable[..., Any]:
+        def wrapper(*args: Any) -> Any:
+            threads.add(threading.current_thread())
+            return function(*args)
+        return wrapper
+
+    monkeypatch.setattr(dedup, "file_digest", recording(dedup.file_digest))
+    monkeypatch.setattr(dedup, "link_file", recording(dedup.link_file))
+
+    report = BatchReport()
+    async for result in iter_convert_directory(tmp_path / "in", tmp_path / "out", _config(), max_workers=1):
+        report.add(result)
+
+    assert len(report.deduplicated) == 2
+    assert threads and threading.current_thread() not in threads
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_hardlinked_duplicates_are_unshared_when_rewritten(tmp_path: Path) -> None:
+    _write_mirror(tmp_path / "in")
+    config = _config()
+    config.performance.dedup_method = "hardlink"
+
+    report = BatchReport()
+    async for result in iter_convert_directory(tmp_path / "in", tmp_path / "out", config, max_workers=1):
+        report.add(result)
+
+    assert len(report.deduplicated) == 2
+    assert os.stat(tmp_path / "out" / "index.md").st_nlink == 3
+
+    (tmp_path / "in" / "de" / "index.html").write_text("<h1>Start</h1>", encoding="utf-8")
+    async for result in iter_convert_directory(tmp_path / "in", tmp_path / "out", config, max_workers=1):
+        pass
+
+    assert (tmp_path / "out" / "de" / "index.md").read_text(encoding="utf-8") == "# Start"
+    assert (tmp_path / "out" / "index.md").read_text(encoding="utf-8") == "# Home"
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_duplicates_of_a_failed_input_are_converted_on_their_own(tmp_path: Path) -> None:
+    _write_mirror(tmp_path / "in")
+    # The first output can't be written
+    (tmp_path / "out" / "first.md").mkdir(parents=True)
+    jobs = [
+        (tmp_path / "in" / "index.html", tmp_path / "out" / "first.md"),
+        (tmp_path / "in" / "de" / "index.html", tmp_path / "out" / "second.md"),
+        (tmp_path / "in" / "print" / "index.html", tmp_path / "out" / "third.md"),
+    ]
+
+    results = [result async for result in ConversionEngine(_config(), max_workers=1).iter_run(jobs)]
+
+    assert [(result.output_path.name, result.status) for result in results] == [
+        ("first.md", "failed"), ("second.md", "converted"), ("third.md", "converted")
+    ]
+    assert results[2].duplicate_of == tmp_path / "in" / "de" / "index.html"
+    assert (tmp_path / "out" / "third.md").read_text(encoding="utf-8") == "# Home"
+
+
+def _write_pathological_page(path: Path) -> None:
+    # Takes the parser and sanitizer far longer than any budget below
+    path.write_text(
+        "<div>" * 20000 + "x" + "</div>" * 20000
+        + "<table>" + "<tr><td>a</td><td>b</td></tr>" * 60000 + "</table>",
+        encoding="utf-8"
+    )
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [1, 2], ids=["single", "pool"])
+async def test_files_over_their_time_budget_are_killed(tmp_path: Path, workers: int) -> None:
+    _write_inputs(tmp_path / "in", 6)
+    _write_pathological_page(tmp_path / "in" / "huge.html")
+    config = _config()
+    config.performance.max_wall_time = 0.5
+
+    report = BatchReport()
+    async for result in iter_convert_directory(tmp_path / "in", tmp_path / "out", config, max_workers=workers):
+        report.add(result)
+
+    assert len(report.converted) == 6
+    [(input_path, error)] = report.failed
+    assert input_path.name == "huge.html"
+    assert "exceeded its wall time budget of 0.5s" in error.message
+    assert error.details["budget"] == "wall_time"
+    assert error.details["stage"] in {"scan", "sanitize", "parse", "emit"}
+    assert error.details["wall_time"] >= 0.5
+    assert not (tmp_path / "out" / "huge.md").exists()
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+@pytest.mark.skipif(not Path("/proc/self/statm").exists(), reason="memory is measured through /proc")
+async def test_files_over_their_memory_budget_are_killed(tmp_path: Path) -> None:
+    (tmp_path / "in").mkdir()
+    _write_pathological_page(tmp_path / "in" / "huge.html")
+    config = _config()
+    config.performance.max_memory = 1
+
+    results = [result async for result in iter_batch_convert([tmp_path / "in" / "huge.html"], tmp_path / "out", config)]
+
+    [result] = results
+    assert result.status == "failed"
+    assert result.error is not None and result.error.details["budget"] == "memory"
+    assert result.error.details["memory"] > 1
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+@pytest.mark.skipif(not Path("/proc/self/statm").exists(), reason="memory is measured through /proc")
+async def test_memory_budget_counts_growth_over_the_worker_baseline(tmp_path: Path) -> None:
+    inputs = _write_inputs(tmp_path / "in", 3)
+    # Takes long enough for the memory to be checked
+    (tmp_path / "in" / "long.html").write_text("<p>Some <em>text</em></p>" * 3000, encoding="utf-8")
+    inputs.append(tmp_path / "in" / "long.html")
+    config = _config()
+    # Less than an idle worker process takes
+    config.performance.max_memory = 16 * 2**20
+
+    report = BatchReport()
+    async for result in iter_batch_convert(inputs, tmp_path / "out", config, max_concurrent=1):
+        report.add(result)
+
+    assert len(report.converted) == 4
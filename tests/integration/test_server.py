@@ -0,0 +1,181 @@
+"""Tests for the conversion server and its client."""
+
+import asyncio
+import errno
+import os
+from pathlib import Path
+import shutil
+import signal
+import socket
+import stat
+import tempfile
+from typing import Any, AsyncIterator, Dict, Iterator, List, Tuple
+
+import pytest
+import pytest_asyncio
+
+from SlateQuill.client import SlateQuillClient, default_socket_path, runtime_dir, token_path
+from SlateQuill.config import Config
+from SlateQuill import server as server_module
+from SlateQuill.exceptions import ConversionError, SecurityError
+from SlateQuill.server import ConversionServer
+
+
+@pytest.fixture
+def runtime(monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    # Socket paths are limited to about 100 bytes, too short for tmp_path
+    base = Path(tempfile.mkdtemp(prefix="sq"))
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(base))
+    yield base / "slatequill"
+    shutil.rmtree(base)
+
+
+def _server(root: Path) -> ConversionServer:
+    config = Config()
+    config.performance.cache_results = False
+    return ConversionServer(config, config_path=root / "absent.toml", workers=1, roots=[root])
+
+
+@pytest_asyncio.fixture
+async def server(runtime: Path, tmp_path: Path) -> AsyncIterator[ConversionServer]:
+    server = _server(tmp_path)
+    await server.start(socket_path=runtime_dir(create=True) / "slatequill.sock", port=0)
+    yield server
+    await server.close()
+
+
+def _port(server: ConversionServer) -> int:
+    return next(int(address.rsplit(":", 1)[1]) for address in server.addresses if address.startswith("http"))
+
+
+async def _http(port: int, head: Dict[str, str], body: bytes = b"{}") -> Tuple[int, bytes]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    lines = ["POST /convert HTTP/1.1", *(f"{name}: {value}" for name, value in head.items())]
+    writer.write(("\r\n".join(lines) + f"\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode() + body)
+    response = await reader.read()
+    writer.close()
+    return int(response.split()[1]), response
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_socket_is_private_to_the_user(server: ConversionServer, runtime: Path, tmp_path: Path) -> None:
+    (tmp_path / "page.html").write_text("<h1>Page</h1>", encoding="utf-8")
+
+    async with SlateQuillClient() as client:
+        assert await client.convert("<p>Hello <em>world</em></p>") == "Hello *world*"
+        assert await client.convert(input_path=tmp_path / "page.html") == "# Page"
+        assert (await client.health())["status"] == "ok"
+
+    assert stat.S_IMODE(runtime.stat().st_mode) == 0o700
+    assert stat.S_IMODE((runtime / "slatequill.sock").stat().st_mode) == 0o600
+    assert stat.S_IMODE(token_path(_port(server)).stat().st_mode) == 0o600
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_requests_are_confined_to_the_roots(server: ConversionServer, tmp_path: Path) -> None:
+    outside = Path(tempfile.gettempdir()) / "outside.html"
+
+    async with SlateQuillClient() as client:
+        with pytest.raises(SecurityError):
+            await client.convert(input_path=Path("/etc/hostname"))
+        with pytest.raises(SecurityError):
+            await client.convert("<p>x</p>", config={"security": {"allowed_tags": ["script"]}})
+        (tmp_path / "page.html").write_text("<h1>Page</h1>", encoding="utf-8")
+        with pytest.raises(SecurityError):
+            await client.convert(input_path=tmp_path / "page.html", output_path=outside)
+
+    assert not outside.exists()
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_live_servers_are_not_replaced(server: ConversionServer, runtime: Path, tmp_path: Path) -> None:
+    second = _server(tmp_path)
+    with pytest.raises(OSError) as excinfo:
+        await second.start()
+    assert excinfo.value.errno == errno.EADDRINUSE
+
+    async with SlateQuillClient() as client:
+        assert await client.convert("<p>still here</p>") == "still here"
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_stale_sockets_are_replaced_and_files_are_not(runtime: Path, tmp_path: Path) -> None:
+    path = runtime_dir(create=True) / "slatequill.sock"
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()
+
+    server = _server(tmp_path)
+    await server.start()
+    try:
+        async with SlateQuillClient() as client:
+            assert await client.convert("<p>new</p>") == "new"
+    finally:
+        await server.close()
+    assert not path.exists()
+
+    path.write_text("not a socket", encoding="utf-8")
+    with pytest.raises(FileExistsError):
+        await _server(tmp_path).start()
+    assert path.read_text(encoding="utf-8") == "not a socket"
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_http_requests_need_the_token(server: ConversionServer) -> None:
+    port = _port(server)
+    head = {
+        "Host": f"127.0.0.1:{port}",
+        "Authorization": f"Bearer {server.token}",
+        "Content-Type": "application/json",
+    }
+
+    async with SlateQuillClient(port=port) as client:
+        assert await client.convert("<p>over http</p>") == "over http"
+    assert (await _http(port, head, b'{"html": "<p>x</p>"}'))[0] == 200
+    assert (await _http(port, {**head, "Authorization": "Bearer wrong"}))[0] == 401
+    assert (await _http(port, {name: value for name, value in head.items() if name != "Authorization"}))[0] == 401
+    assert (await _http(port, {**head, "Origin": "http://example.com"}))[0] == 403
+    assert (await _http(port, {**head, "Host": f"attacker.example:{port}"}))[0] == 403
+    assert (await _http(port, {**head, "Content-Type": "text/plain"}))[0] == 415
+
+    await server.close()
+    assert not token_path(port).exists()
+
+
+@pytest.mark.integration
+def test_shared_runtime_directories_are_refused(runtime: Path) -> None:
+    runtime.mkdir(mode=0o777)
+    runtime.chmod(0o777)
+
+    with pytest.raises(SecurityError):
+        default_socket_path()
+
+
+def _kill_worker(requests: List[Any]) -> List[Dict[str, Any]]:
+    """Pool task killing the worker running it, as the OOM killer would."""
+    os.kill(os.getpid(), signal.SIGKILL)
+    return []
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_servers_recover_from_dead_workers(
+    server: ConversionServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async with SlateQuillClient() as client:
+        assert await client.convert("<p>before</p>") == "before"
+
+        with monkeypatch.context() as patch:
+            patch.setattr(server_module, "_handle_requests", _kill_worker)
+            with pytest.raises(ConversionError, match="exited unexpectedly"):
+                await client.convert("<p>killed</p>")
+
+        assert await client.convert("<p>after</p>") == "after"
+        results = await client.convert_batch([{"html": "<p>a</p>"}, {"html": "<p>b</p>"}])
+        assert [result["markdown"] for result in results] == ["a", "b"]
+        assert (await client.stats())["failed"] == 1
@@ -0,0 +1,150 @@
+"""
+Fixtures and regression gates for the performance benchmarks.
+
+Every benchmark records its throughput (input megabytes per second, from the
+fastest round) and the peak memory traced during one run, and compares them
+with the stored baselines in baselines.json. A benchmark fails when its
+throughput drops more than SLATEQUILL_BENCH_TOLERANCE (default 0.5) below the
+baseline, or its peak memory grows more than SLATEQUILL_BENCH_MEMORY_TOLERANCE
+(default 0.25) above it.
+
+Throughput baselines depend on the machine. To record new baselines, run:
+
+    SLATEQUILL_UPDATE_BASELINES=1 poetry run pytest tests/performance/
+"""
+
+import asyncio
+import json
+import os
+from pathlib import Path
+import tracemalloc
+from typing import Any, Callable, Coroutine, Dict, Iterator, Optional
+
+import pytest
+
+from .corpus import generate_corpus
+
+BASELINES_FILE = Path(__file__).parent / "baselines.json"
+
+THROUGHPUT_TOLERANCE = float(os.environ.get("SLATEQUILL_BENCH_TOLERANCE", "0.5"))
+MEMORY_TOLERANCE = float(os.environ.get("SLATEQUILL_BENCH_MEMORY_TOLERANCE", "0.25"))
+# Small peaks are allowed to grow by this much regardless of the tolerance
+MEMORY_SLACK_MB = 1.0
+UPDATE_BASELINES = os.environ.get("SLATEQUILL_UPDATE_BASELINES", "") not in ("", "0")
+
+# Measurements of this session, keyed by test name
+_results: Dict[str, Dict[str, float]] = {}
+
+
+def _load_baselines() -> Dict[str, Dict[str, float]]:
+    if not BASELINES_FILE.exists():
+        return {}
+    return json.loads(BASELINES_FILE.read_text(encoding="utf-8"))
+
+
+def _peak_memory_mb(func: Callable[[], Any]) -> float:
+    """Run func once and return the peak memory it allocated, in megabytes."""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1_000_000
+
+
+class RegressionGate:
+    """Benchmark a callable and check it against its stored baseline."""
+
+    def __init__(self, name: str, benchmark: Any, baseline: Optional[Dict[str, float]]) -> None:
+        self.name = name
+        self.benchmark = benchmark
+        self.baseline = baseline
+
+    def __call__(self, func: Callable[[], Any], size: int, rounds: int = 3) -> Any:
+        """
+        Benchmark func, which processes size bytes of input per call.
+
+        Returns:
+            The result of the last benchmarked call
+        """
+        result = self.benchmark.pedantic(func, rounds=rounds, iterations=1)
+
+        measured = {"peak_memory_mb": round(_peak_memory_mb(func), 2)}
+        stats = getattr(self.benchmark, "stats", None)
+        if stats is not None:
+            # Benchmarking is disabled with --benchmark-disable
+            measured["throughput_mb_s"] = round(size / 1_000_000 / stats.stats.min, 3)
+        _results[self.name] = measured
+
+        if self.baseline is not None and not UPDATE_BASELINES:
+            self._check(measured)
+        return result
+
+    def _check(self, measured: Dict[str, float]) -> None:
+        assert self.baseline is not None
+        failures = []
+
+        throughput = measured.get("throughput_mb_s")
+        expected = self.baseline.get("throughput_mb_s")
+        if throughput is not None and expected is not None:
+            minimum = expected * (1 - THROUGHPUT_TOLERANCE)
+            if throughput < minimum:
+                failures.append(
+                    f"throughput {throughput:.3f} MB/s is below {minimum:.3f} MB/s "
+                    f"(baseline {expected:.3f} MB/s)"
+                )
+
+        peak = measured["peak_memory_mb"]
+        expected = self.baseline.get("peak_memory_mb")
+        if expected is not None:
+            maximum = max(expected * (1 + MEMORY_TOLERANCE), expected + MEMORY_SLACK_MB)
+            if peak > maximum:
+                failures.append(
+                    f"peak memory {peak:.2f} MB is above {maximum:.2f} MB "
+                    f"(baseline {expected:.2f} MB)"
+                )
+
+        if failures:
+            pytest.fail(f"Performance regression in {self.name}: " + "; ".join(failures))
+
+
+@pytest.fixture(scope="session")
+def baselines() -> Dict[str, Dict[str, float]]:
+    """Stored baselines, keyed by test name."""
+    return _load_baselines()
+
+
+@pytest.fixture(scope="session")
+def corpus() -> Dict[str, str]:
+    """The synthetic benchmark corpus, keyed by document name."""
+    return generate_corpus()
+
+
+@pytest.fixture
+def regression_gate(
+    request: pytest.FixtureRequest,
+    benchmark: Any,
+    baselines: Dict[str, Dict[str, float]]
+) -> RegressionGate:
+    """Benchmark a callable and fail on throughput or memory regressions."""
+    return RegressionGate(request.node.name, benchmark, baselines.get(request.node.name))
+
+
+@pytest.fixture
+def run() -> Iterator[Callable[[Coroutine[Any, Any, Any]], Any]]:
+    """Run a coroutine to completion on an event loop kept for the whole test."""
+    loop = asyncio.new_event_loop()
+    try:
+        yield loop.run_until_complete
+    finally:
+        loop.close()
+
+
+def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+    """Write the measurements of this session when updating the baselines."""
+    if not UPDATE_BASELINES or not _results:
+        return
+    baselines = _load_baselines()
+    baselines.update(_results)
+    BASELINES_FILE.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n", encoding="utf-8")
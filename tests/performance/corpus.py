@@ -0,0 +1,150 @@
+"""Deterministic synthetic HTML corpus for the performance benchmarks."""
+
+import random
+from pathlib import Path
+from typing import Callable, Dict, List
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud "
+    "exercitation ullamco laboris nisi aliquip ex ea commodo consequat"
+).split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _inline(rng: random.Random) -> str:
+    parts: List[str] = []
+    for _ in range(rng.randint(3, 8)):
+        kind = rng.random()
+        if kind < 0.55:
+            parts.append(_text(rng, rng.randint(3, 12)))
+        elif kind < 0.7:
+            parts.append(f"<strong>{_text(rng, 2)}</strong>")
+        elif kind < 0.8:
+            parts.append(f"<em>{_text(rng, 2)}</em>")
+        elif kind < 0.9:
+            parts.append(f'<a href="https://example.com/{rng.randint(0, 999)}">{_text(rng, 2)}</a>')
+        else:
+            parts.append(f"<code>{rng.choice(WORDS)}_{rng.randint(0, 99)}()</code>")
+    return " ".join(parts)
+
+
+def _section(rng: random.Random) -> str:
+    blocks = [f"<h2>{_text(rng, 4)}</h2>"]
+    for _ in range(rng.randint(2, 5)):
+        kind = rng.random()
+        if kind < 0.6:
+            blocks.append(f"<p>{_inline(rng)}</p>")
+        elif kind < 0.75:
+            tag = rng.choice(["ul", "ol"])
+            items = "".join(f"<li>{_inline(rng)}</li>" for _ in range(rng.randint(2, 6)))
+            blocks.append(f"<{tag}>{items}</{tag}>")
+        elif kind < 0.85:
+            blocks.append(f"<blockquote><p>{_inline(rng)}</p></blockquote>")
+        else:
+            code = "\n".join(f"    {rng.choice(WORDS)} = {rng.randint(0, 99)}" for _ in range(rng.randint(2, 8)))
+            blocks.append(f"<pre><code>{code}</code></pre>")
+    return "\n".join(blocks)
+
+
+def _page(body: str, title: str) -> str:
+    return (
+        "<!DOCTYPE html>\n<html>\n<head>\n"
+        f"<meta charset=\"utf-8\">\n<title>{title}</title>\n"
+        "</head>\n<body>\n"
+        f"{body}\n"
+        "</body>\n</html>\n"
+    )
+
+
+def small_page(rng: random.Random) -> str:
+    """A typical CMS article of a few kilobytes."""
+    return _page("\n".join(_section(rng) for _ in range(4)), "Small page")
+
+
+def huge_page(rng: random.Random) -> str:
+    """A single article of about 250 kilobytes."""
+    return _page("\n".join(_section(rng) for _ in range(200)), "Huge page")
+
+
+def deep_nesting(rng: random.Random) -> str:
+    """Repeated blocks of nested containers, quotes and lists."""
+    blocks = [_nest(rng, depth=60) for _ in range(20)]
+    return _page("\n".join(blocks), "Deep nesting")
+
+
+def _nest(rng: random.Random, depth: int) -> str:
+    opened: List[str] = []
+    html: List[str] = []
+    for _ in range(depth):
+        tag = rng.choice(["div", "blockquote", "ul"])
+        html.append("<ul><li>" if tag == "ul" else f"<{tag}>")
+        opened.append(tag)
+        if rng.random() < 0.3:
+            html.append(f"<p>{_inline(rng)}</p>")
+    html.append(f"<p>{_inline(rng)}</p>")
+    for tag in reversed(opened):
+        html.append("</li></ul>" if tag == "ul" else f"</{tag}>")
+    return "".join(html)
+
+
+def giant_table(rng: random.Random) -> str:
+    """One table with hundreds of rows."""
+    columns = 8
+    header = "".join(f"<th>{_text(rng, 2)}</th>" for _ in range(columns))
+    rows = "\n".join(
+        "<tr>" + "".join(f"<td>{_text(rng, rng.randint(1, 4))}</td>" for _ in range(columns)) + "</tr>"
+        for _ in range(800)
+    )
+    return _page(f"<table>\n<thead><tr>{header}</tr></thead>\n<tbody>\n{rows}\n</tbody>\n</table>", "Giant table")
+
+
+def comment_heavy(rng: random.Random) -> str:
+    """Content interleaved with template and tracking comments."""
+    blocks = []
+    for index in range(400):
+        blocks.append(f"<!-- block {index}: {_text(rng, 20)} -->")
+        blocks.append(f"<p>{_inline(rng)}<!-- {_text(rng, 5)} --></p>")
+    return _page("\n".join(blocks), "Comment heavy")
+
+
+def script_heavy(rng: random.Random) -> str:
+    """Content interleaved with scripts, styles and event handlers."""
+    blocks = []
+    for index in range(300):
+        blocks.append(
+            "<script>window.dataLayer = window.dataLayer || [];"
+            f" dataLayer.push({{'event': 'block{index}', 'value': '{_text(rng, 8)}'}});</script>"
+        )
+        blocks.append(f"<style>.block{index} {{ color: #{rng.randint(0, 0xffffff):06x}; }}</style>")
+        blocks.append(f'<p class="block{index}" onclick="track({index})">{_inline(rng)}</p>')
+    return _page("\n".join(blocks), "Script heavy")
+
+
+GENERATORS: Dict[str, Callable[[random.Random], str]] = {
+    "small_page": small_page,
+    "huge_page": huge_page,
+    "deep_nesting": deep_nesting,
+    "giant_table": giant_table,
+    "comment_heavy": comment_heavy,
+    "script_heavy": script_heavy,
+}
+
+
+def generate_corpus(seed: int = 0) -> Dict[str, str]:
+    """Generate every corpus document; the same seed yields the same documents."""
+    return {name: generator(random.Random(f"{seed}:{name}")) for name, generator in GENERATORS.items()}
+
+
+def write_corpus(directory: Path, seed: int = 0) -> List[Path]:
+    """Write the corpus to directory as <name>.html files."""
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, html in generate_corpus(seed).items():
+        path = directory / f"{name}.html"
+        path.write_text(html, encoding="utf-8")
+        paths.append(path)
+    return paths
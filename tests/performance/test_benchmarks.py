@@ -0,0 +1,112 @@
+"""Benchmarks of the conversion hot path on the synthetic corpus."""
+
+import asyncio
+import random
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from SlateQuill.config import Config, ConversionConfig, SecurityConfig
+from SlateQuill.core import batch_convert, convert_file
+from SlateQuill.html2md import html_to_markdown
+from SlateQuill.postprocess import post_process
+from SlateQuill.security import sanitize_html
+
+from .conftest import RegressionGate
+from .corpus import GENERATORS, small_page
+
+DOCUMENTS = list(GENERATORS)
+
+# Documents converted by the batch benchmark
+BATCH_SIZE = 40
+
+
+def _uncached_config() -> Config:
+    config = Config()
+    config.performance.cache_results = False
+    return config
+
+
+@pytest.fixture(scope="module")
+def raw_markdown(corpus: Dict[str, str]) -> Dict[str, str]:
+    """Markdown of each corpus document before whitespace cleanup and wrapping."""
+    config = ConversionConfig(clean_whitespace=False, line_length=0)
+    return {
+        name: asyncio.run(html_to_markdown(html, config))
+        for name, html in corpus.items()
+    }
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_html_to_markdown(document: str, corpus: Dict[str, str], regression_gate: RegressionGate, run) -> None:
+    html = corpus[document]
+    config = ConversionConfig()
+
+    markdown = regression_gate(lambda: run(html_to_markdown(html, config)), len(html.encode("utf-8")))
+
+    assert markdown
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_sanitize_html(document: str, corpus: Dict[str, str], regression_gate: RegressionGate) -> None:
+    html = corpus[document]
+    config = SecurityConfig()
+
+    sanitized = regression_gate(lambda: sanitize_html(html, config), len(html.encode("utf-8")))
+
+    assert "<script" not in sanitized
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_post_process(document: str, raw_markdown: Dict[str, str], regression_gate: RegressionGate) -> None:
+    markdown = raw_markdown[document]
+
+    processed = regression_gate(lambda: post_process(markdown, line_length=80), len(markdown.encode("utf-8")), rounds=5)
+
+    assert "\n\n\n" not in processed
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_convert_file(
+    document: str,
+    corpus: Dict[str, str],
+    regression_gate: RegressionGate,
+    run,
+    tmp_path: Path
+) -> None:
+    input_path = tmp_path / f"{document}.html"
+    input_path.write_text(corpus[document], encoding="utf-8")
+    config = _uncached_config()
+
+    regression_gate(
+        lambda: run(convert_file(input_path, tmp_path / f"{document}.md", config, return_content=False)),
+        input_path.stat().st_size
+    )
+
+    assert (tmp_path / f"{document}.md").stat().st_size > 0
+
+
+@pytest.mark.performance
+def test_batch_convert(regression_gate: RegressionGate, run, tmp_path: Path) -> None:
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    input_files = []
+    for seed in range(BATCH_SIZE):
+        path = input_dir / f"page_{seed}.html"
+        path.write_text(small_page(random.Random(seed)), encoding="utf-8")
+        input_files.append(path)
+    size = sum(path.stat().st_size for path in input_files)
+    config = _uncached_config()
+
+    # One worker: the in-process pipeline, without pool start-up noise
+    converted = regression_gate(
+        lambda: run(batch_convert(input_files, tmp_path / "output", config, max_concurrent=1)),
+        size
+    )
+
+    assert len(converted) == BATCH_SIZE
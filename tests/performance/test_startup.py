@@ -0,0 +1,123 @@
+"""
+Startup budget of the command-line entry point.
+
+Shell tooling runs SlateQuill once per document, so the import cost of the
+entry point is paid on every call. These tests measure it with
+python -X importtime in a fresh interpreter and check that --version and
+--help don't import the conversion pipeline.
+
+The budget is generous against interpreter noise; set
+SLATEQUILL_IMPORT_BUDGET_MS to tighten it on a known machine.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from typing import List, Set
+
+import pytest
+
+IMPORT_BUDGET_MS = float(os.environ.get("SLATEQUILL_IMPORT_BUDGET_MS", "100"))
+
+# Best of this many fresh interpreters, to ignore one-off stalls
+IMPORT_RUNS = 3
+
+# Modules that only a conversion may import
+HEAVY_MODULES = (
+    "bs4",
+    "markdownify",
+    "bleach",
+    "lxml",
+    "html5lib",
+    "pydantic",
+    "aiofiles",
+    "asyncio",
+    "typer",
+    "rich",
+    "SlateQuill.core",
+    "SlateQuill.config",
+    "SlateQuill.html2md",
+    "SlateQuill.security",
+)
+
+
+def _run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+
+
+def _import_time_ms(module: str) -> float:
+    """Cumulative import time of module's package in a fresh interpreter."""
+    result = _run_python("-X", "importtime", "-c", f"import {module}")
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Top-level entries (one space of indent) include everything they imported
+        depth = len(name) - len(name.lstrip())
+        if depth == 1 and name.strip().split(".")[0] == "SlateQuill":
+            total_us += int(cumulative)
+    return total_us / 1000
+
+
+def _loaded_modules(argv: List[str]) -> Set[str]:
+    """Modules loaded after the entry point handled argv."""
+    script = (
+        "import contextlib, io, json, sys\n"
+        f"sys.argv = {argv!r}\n"
+        "from SlateQuill.simple_cli import main\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        "    main()\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    return set(json.loads(_run_python("-c", script).stdout))
+
+
+def _heavy(modules: Set[str]) -> List[str]:
+    return sorted(
+        module for module in modules
+        if any(module == heavy or module.startswith(heavy + ".") for heavy in HEAVY_MODULES)
+    )
+
+
+@pytest.mark.performance
+def test_entry_point_import_budget() -> None:
+    elapsed = min(_import_time_ms("SlateQuill.simple_cli") for _ in range(IMPORT_RUNS))
+
+    assert elapsed <= IMPORT_BUDGET_MS, (
+        f"Importing SlateQuill.simple_cli took {elapsed:.1f} ms (budget {IMPORT_BUDGET_MS:.0f} ms); "
+        "run python -X importtime -c 'import SlateQuill.simple_cli' to see what it imports"
+    )
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("argv", [
+    ["SlateQuill"],
+    ["SlateQuill", "--version"],
+    ["SlateQuill", "--help"],
+], ids=["usage", "version", "help"])
+def test_entry_point_skips_conversion_modules(argv: List[str]) -> None:
+    assert _heavy(_loaded_modules(argv)) == []
+
+
+@pytest.mark.performance
+def test_package_exports_resolve_lazily() -> None:
+    script = (
+        "import json, sys\n"
+        "import SlateQuill\n"
+        "before = sorted(sys.modules)\n"
+        "exports = {name: getattr(SlateQuill, name).__module__ for name in SlateQuill.__all__}\n"
+        "print(json.dumps([before, exports]))\n"
+    )
+    before, exports = json.loads(_run_python("-c", script).stdout)
+
+    assert _heavy(set(before)) == []
+    assert exports["convert_file"] == "SlateQuill.core"
+    assert exports["Config"] == "SlateQuill.config"
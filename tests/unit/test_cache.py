@@ -0,0 +1,102 @@
+"""Tests for the conversion result cache."""
+
+import os
+from pathlib import Path
+import time
+
+import pytest
+
+from SlateQuill.cache import ConversionCache, content_key, get_cache
+from SlateQuill.config import Config
+from SlateQuill.core import convert_file
+from SlateQuill.plan import compile_plan, source_mtime
+
+
+@pytest.mark.unit
+def test_cache_returns_stored_results(tmp_path: Path) -> None:
+    cache = ConversionCache(tmp_path)
+    key = content_key(b"<h1>Title</h1>", compile_plan().fingerprint, "HTMLConverter")
+
+    assert cache.get(key) is None
+    cache.put(key, "# Title")
+
+    assert cache.get(key) == "# Title"
+    assert cache.stats()["entries"] == 1
+
+
+@pytest.mark.unit
+def test_keys_depend_on_the_conversion_settings() -> None:
+    setext = Config()
+    setext.conversion.heading_style = "setext"
+
+    default_key = content_key(b"<h1>Title</h1>", compile_plan().fingerprint)
+    setext_key = content_key(b"<h1>Title</h1>", compile_plan(setext).fingerprint)
+
+    assert default_key != setext_key
+
+
+@pytest.mark.unit
+def test_entries_expire_after_their_ttl(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = ConversionCache(tmp_path, ttl=60)
+    cache.put("key", "# Title")
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.unit
+def test_least_recently_used_entries_are_evicted(tmp_path: Path) -> None:
+    cache = ConversionCache(tmp_path, ttl=0, max_size=250)
+    for index in range(4):
+        cache.put(f"key{index}", str(index) * 60)
+        time.sleep(0.01)
+    # Used recently, so kept
+    assert cache.get("key0") is not None
+
+    cache.put("key4", "4" * 60)
+
+    assert cache.stats()["total_size"] <= 250
+    assert cache.get("key0") is not None
+    assert cache.get("key1") is None
+    assert cache.get("key4") is not None
+
+
+@pytest.mark.unit
+def test_corrupt_databases_are_cache_misses(tmp_path: Path) -> None:
+    (tmp_path / "cache.sqlite3").write_bytes(b"not a database" * 100)
+    cache = ConversionCache(tmp_path)
+
+    cache.put("key", "# Title")
+
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_conversions_are_served_from_the_configured_cache(tmp_path: Path) -> None:
+    (tmp_path / "page.html").write_text("<h1>Title</h1>", encoding="utf-8")
+    config = Config()
+    config.performance.cache_dir = str(tmp_path / "cache")
+
+    assert await convert_file(tmp_path / "page.html", tmp_path / "first.md", config) == "# Title"
+    cache = get_cache(config)
+    assert cache is not None and cache.stats()["entries"] == 1
+    assert await convert_file(tmp_path / "page.html", tmp_path / "second.md", config) == "# Title"
+
+
+@pytest.mark.unit
+def test_source_changes_are_noticed(tmp_path: Path) -> None:
+    (tmp_path / "module.py").write_text("", encoding="utf-8")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "other.py").write_text("", encoding="utf-8")
+    os.utime(tmp_path / "module.py", ns=(0, 1_000))
+    os.utime(tmp_path / "sub" / "other.py", ns=(0, 2_000))
+    before = source_mtime(tmp_path)
+
+    os.utime(tmp_path / "module.py", ns=(0, 3_000))
+
+    assert (before, source_mtime(tmp_path)) == (2_000, 3_000)
@@ -0,0 +1,67 @@
+"""Tests for input encoding detection and decoding."""
+
+import codecs
+import mmap
+from pathlib import Path
+
+import pytest
+
+from SlateQuill.charset import decode_html, detect_encoding
+from SlateQuill.config import Config
+from SlateQuill.core import convert_file
+from SlateQuill.exceptions import SecurityError
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("data, encoding", [
+    (codecs.BOM_UTF8 + b"<p>x</p>", "utf-8"),
+    (codecs.BOM_UTF16_LE + "<p>x</p>".encode("utf-16-le"), "utf-16-le"),
+    (b'<meta charset="Shift_JIS"><p>x</p>', "shift_jis"),
+    (b'<meta http-equiv="Content-Type" content="text/html; charset=koi8-r">', "koi8-r"),
+    (b"<meta charset=iso-8859-1>", "cp1252"),
+    (b"<meta charset=utf-16>", "utf-8"),
+    (b"<meta charset=no-such-charset>", "utf-8"),
+    (b"<p>x</p>", "utf-8"),
+], ids=["utf-8-bom", "utf-16-bom", "meta", "http-equiv", "latin-1-label", "utf-16-label", "unknown", "undeclared"])
+def test_detect_encoding(data: bytes, encoding: str) -> None:
+    assert detect_encoding(data).encoding == encoding
+
+
+@pytest.mark.unit
+def test_decode_html_skips_byte_order_mark() -> None:
+    assert decode_html(codecs.BOM_UTF16_BE + "<p>Grüße</p>".encode("utf-16-be")) == "<p>Grüße</p>"
+
+
+@pytest.mark.unit
+def test_undeclared_legacy_document_falls_back_to_windows_1252() -> None:
+    assert decode_html("<p>naïve “quotes”</p>".encode("cp1252")) == "<p>naïve “quotes”</p>"
+
+
+@pytest.mark.unit
+def test_invalid_declared_encoding_is_rejected() -> None:
+    with pytest.raises(SecurityError):
+        decode_html(b"<meta charset=utf-8><p>\xff</p>")
+
+
+@pytest.mark.unit
+def test_decode_html_reads_memory_mapped_file(tmp_path: Path) -> None:
+    path = tmp_path / "page.html"
+    path.write_bytes("<p>Café</p>".encode("utf-8"))
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        assert decode_html(data) == "<p>Café</p>"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mmap_threshold", [0, 1])
+async def test_convert_file_decodes_declared_charset(tmp_path: Path, mmap_threshold: int) -> None:
+    input_path = tmp_path / "page.html"
+    input_path.write_bytes('<meta charset="windows-1252"><p>Café crème</p>'.encode("cp1252"))
+    config = Config()
+    config.performance.cache_results = False
+    config.performance.mmap_threshold = mmap_threshold
+
+    markdown = await convert_file(input_path, tmp_path / "page.md", config)
+
+    assert markdown == "Café crème"
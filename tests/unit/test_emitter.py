@@ -0,0 +1,69 @@
+"""Golden-corpus parity tests for the native Markdown emitter."""
+
+from pathlib import Path
+import pickle
+
+import pytest
+
+from SlateQuill.config import Config, ConversionConfig
+from SlateQuill.core import convert_file
+from SlateQuill.html2md import html_to_markdown, html_to_markdown_sync
+from SlateQuill.plan import compile_plan
+
+FIXTURES = Path(__file__).parent.parent / "fixtures"
+GOLDEN_CORPUS = sorted((FIXTURES / "golden").glob("*.html")) + [FIXTURES / "test_input.html"]
+
+CONFIGS = [
+    {},
+    {"heading_style": "setext"},
+    {"emphasis_style": "underscore"},
+    {"preserve_html": True, "strip_comments": False},
+    {"clean_whitespace": False, "line_length": 0},
+]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize("options", CONFIGS, ids=lambda options: ",".join(options) or "default")
+@pytest.mark.parametrize("html_file", GOLDEN_CORPUS, ids=lambda path: path.name)
+async def test_native_emitter_matches_markdownify(html_file: Path, options: dict) -> None:
+    html = html_file.read_text(encoding="utf-8")
+
+    native = await html_to_markdown(html, ConversionConfig(emitter="native", **options))
+    reference = await html_to_markdown(html, ConversionConfig(emitter="markdownify", **options))
+
+    assert native == reference
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_convert_file_matches_fixture_output(tmp_path: Path) -> None:
+    expected = (FIXTURES / "test_output.md").read_text(encoding="utf-8")
+
+    markdown = await convert_file(FIXTURES / "test_input.html", tmp_path / "out.md")
+
+    assert markdown == expected
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_commonmark_flavor_drops_github_extensions() -> None:
+    html = "<p><del>old</del> new</p><table><tr><th>A</th></tr><tr><td>1</td></tr></table>"
+
+    markdown = await html_to_markdown(html, ConversionConfig(markdown_flavor="commonmark"))
+
+    assert "~~" not in markdown
+    assert "| --- |" not in markdown
+    assert "<table>" in markdown
+
+
+@pytest.mark.unit
+def test_plans_can_be_pickled_after_converting_headings() -> None:
+    plan = compile_plan(Config())
+    html = "<h1>Title</h1><h2>Part</h2><h7>Deep</h7><p>Text</p>"
+    markdown = html_to_markdown_sync(html, plan=plan)
+
+    copy = pickle.loads(pickle.dumps(plan))
+
+    assert html_to_markdown_sync(html, plan=copy) == markdown
+    assert markdown.startswith("# Title\n\n## Part\n\n")
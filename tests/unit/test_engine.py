@@ -0,0 +1,150 @@
+"""Tests for the conversion engine."""
+
+import pickle
+from pathlib import Path
+import threading
+from typing import Any, AsyncIterator, Iterator, List, Union
+
+import pytest
+
+from SlateQuill.config import Config
+from SlateQuill.engine import ConversionEngine, ConversionResult
+from SlateQuill.exceptions import ConversionError, FileProcessingError, SecurityError
+from SlateQuill.fileio import Job, SizedJob
+
+
+def _config() -> Config:
+    config = Config()
+    config.performance.cache_results = False
+    config.performance.deduplicate = False
+    return config
+
+
+def _write_inputs(directory: Path, count: int) -> List[Job]:
+    directory.mkdir(parents=True, exist_ok=True)
+    jobs = []
+    for index in range(count):
+        path = directory / f"page{index}.html"
+        path.write_text(f"<h1>Page {index}</h1>", encoding="utf-8")
+        jobs.append((path, directory.parent / "out" / f"page{index}.md"))
+    return jobs
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_inline_results_follow_job_order(tmp_path: Path) -> None:
+    jobs: List[Union[Job, ConversionResult]] = list(_write_inputs(tmp_path / "in", 6))
+    skipped = ConversionResult(tmp_path / "in" / "old.html", tmp_path / "out" / "old.md", "skipped")
+    jobs.insert(3, skipped)
+
+    results = [result async for result in ConversionEngine(_config(), max_workers=1).iter_run(iter(jobs))]
+
+    # Skipped files need no work and pass through at once
+    assert [result.output_path.name for result in results if result.status == "converted"] == [
+        f"page{index}.md" for index in range(6)
+    ]
+    assert [result for result in results if result.status == "skipped"] == [skipped]
+    assert all(result.seconds is not None for result in results if result.status == "converted")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [1, 2], ids=["inline", "pool"])
+async def test_failures_are_reported_per_file(tmp_path: Path, workers: int) -> None:
+    jobs = _write_inputs(tmp_path / "in", 4)
+    (tmp_path / "in" / "broken.html").write_bytes(b"<meta charset=utf-8>\xff")
+    jobs.insert(1, (tmp_path / "in" / "broken.html", tmp_path / "out" / "broken.md"))
+    jobs.append((tmp_path / "in" / "missing.html", tmp_path / "out" / "missing.md"))
+
+    report = await ConversionEngine(_config(), max_workers=workers).run(jobs)
+
+    assert sorted(path.name for path, _ in report.converted) == [f"page{index}.html" for index in range(4)]
+    errors = {path.name: error for path, error in report.failed}
+    assert isinstance(errors["broken.html"], SecurityError)
+    assert "invalid utf-8" in errors["broken.html"].message
+    assert isinstance(errors["missing.html"], ConversionError)
+    assert (tmp_path / "out" / "page3.md").read_text(encoding="utf-8") == "# Page 3"
+    assert not (tmp_path / "out" / "broken.md").exists()
+
+
+@pytest.mark.unit
+def test_errors_keep_their_details_when_pickled() -> None:
+    error = FileProcessingError("Can't write out.md", {"path": "out.md", "errno": 13})
+
+    copy = pickle.loads(pickle.dumps(error))
+
+    assert type(copy) is FileProcessingError
+    assert copy.message == "Can't write out.md"
+    assert copy.details == {"path": "out.md", "errno": 13}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_skipped_files_do_not_start_the_pool(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # An incremental run where only one of many files changed
+    [job] = _write_inputs(tmp_path / "in", 1)
+    items: List[Union[Job, ConversionResult]] = [
+        ConversionResult(tmp_path / "in" / f"same{index}.html", tmp_path / "out" / f"same{index}.md", "skipped")
+        for index in range(8)
+    ]
+    items.append(job)
+
+    def no_pool(*args: Any) -> AsyncIterator[ConversionResult]:
+        raise AssertionError("a single job is converted inline")
+
+    engine = ConversionEngine(_config(), max_workers=4)
+    monkeypatch.setattr(engine, "_iter_pool", no_pool)
+    results = [result async for result in engine.iter_run(iter(items))]
+
+    assert [result.status for result in results] == ["skipped"] * 8 + ["converted"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [1, 2], ids=["inline", "pool"])
+async def test_jobs_are_pulled_off_the_event_loop(tmp_path: Path, workers: int) -> None:
+    jobs = _write_inputs(tmp_path / "in", 6)
+    threads = set()
+
+    def source() -> Iterator[Job]:
+        for input_path, output_path in jobs:
+            # Job iterators may block, e.g. scanning a directory
+            threads.add(threading.current_thread())
+            yield SizedJob(input_path, output_path, input_path.stat().st_size)
+
+    report = await ConversionEngine(_config(), max_workers=workers).run(source())
+
+    assert len(report.converted) == 6
+    assert threading.current_thread() not in threads
+
+
+@pytest.mark.unit
+def test_sized_jobs_survive_pickling(tmp_path: Path) -> None:
+    job = SizedJob(tmp_path / "in.html", tmp_path / "out.md", 42)
+
+    copy = pickle.loads(pickle.dumps(job))
+
+    assert copy == (tmp_path / "in.html", tmp_path / "out.md")
+    assert copy.size == 42
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_skipped_files_are_reported_before_the_scan_ends(tmp_path: Path) -> None:
+    pulled = 0
+
+    def scan() -> Iterator[ConversionResult]:
+        nonlocal pulled
+        # An incremental run where nothing changed
+        for index in range(1000):
+            pulled += 1
+            yield ConversionResult(tmp_path / f"same{index}.html", tmp_path / f"same{index}.md", "skipped")
+
+    results = ConversionEngine(_config(), max_workers=4).iter_run(scan())
+    first = await results.__anext__()
+    seen_at_first = pulled
+    rest = [result async for result in results]
+
+    assert first.status == "skipped"
+    assert seen_at_first <= 4
+    assert len(rest) == 999
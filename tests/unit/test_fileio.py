@@ -0,0 +1,26 @@
+"""Tests for asynchronous file I/O."""
+
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pytest
+
+from SlateQuill.exceptions import ConversionError, SlateQuillError
+from SlateQuill.fileio import BackgroundWriter
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_background_writer_keeps_writing_after_a_failure(tmp_path: Path) -> None:
+    written: List[Tuple[str, Optional[SlateQuillError]]] = []
+
+    async with BackgroundWriter(2, lambda path, error: written.append((path.name, error))) as writer:
+        await writer.submit(tmp_path / "first.md", "# First")
+        # A lone surrogate can't be encoded as UTF-8
+        await writer.submit(tmp_path / "broken.md", "# \ud800")
+        await writer.submit(tmp_path / "last.md", "# Last")
+
+    assert [name for name, _ in written] == ["first.md", "broken.md", "last.md"]
+    assert isinstance(written[1][1], ConversionError)
+    assert writer.errors.keys() == {tmp_path / "broken.md"}
+    assert (tmp_path / "last.md").read_text(encoding="utf-8") == "# Last"
@@ -0,0 +1,103 @@
+"""Tests for incremental directory conversions and the build manifest."""
+
+import os
+from pathlib import Path
+import threading
+from typing import Any, Dict
+
+import pytest
+
+from SlateQuill.config import Config
+from SlateQuill.core import iter_convert_directory
+from SlateQuill.manifest import BuildManifest
+
+
+def _config() -> Config:
+    config = Config()
+    config.performance.cache_results = False
+    return config
+
+
+async def _run(input_dir: Path, output_dir: Path, config: Config) -> Dict[str, str]:
+    return {
+        result.input_path.name: result.status
+        async for result in iter_convert_directory(input_dir, output_dir, config, max_workers=1, incremental=True)
+    }
+
+
+def _write_pages(directory: Path) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    for name in ("same", "edited", "resized", "touched", "deleted_output"):
+        (directory / f"{name}.html").write_text(f"<h1>{name}</h1>", encoding="utf-8")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_second_run_skips_unchanged_files(tmp_path: Path) -> None:
+    _write_pages(tmp_path / "in")
+    assert set((await _run(tmp_path / "in", tmp_path / "out", _config())).values()) == {"converted"}
+
+    # Same size, other content
+    (tmp_path / "in" / "edited.html").write_text("<h1>EDITED</h1>", encoding="utf-8")
+    (tmp_path / "in" / "resized.html").write_text("<h1>Resized page</h1>", encoding="utf-8")
+    for name in ("edited", "touched"):
+        # Whatever the file system's timestamp resolution; touched keeps its content
+        stat = os.stat(tmp_path / "in" / f"{name}.html")
+        os.utime(tmp_path / "in" / f"{name}.html", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    (tmp_path / "out" / "deleted_output.md").unlink()
+
+    statuses = await _run(tmp_path / "in", tmp_path / "out", _config())
+
+    assert statuses == {
+        "same.html": "skipped",
+        "edited.html": "converted",
+        "resized.html": "converted",
+        "touched.html": "skipped",
+        "deleted_output.html": "converted",
+    }
+    assert (tmp_path / "out" / "edited.md").read_text(encoding="utf-8") == "# EDITED"
+    assert (tmp_path / "out" / "deleted_output.md").exists()
+    assert set((await _run(tmp_path / "in", tmp_path / "out", _config())).values()) == {"skipped"}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_changed_settings_reconvert_everything(tmp_path: Path) -> None:
+    _write_pages(tmp_path / "in")
+    await _run(tmp_path / "in", tmp_path / "out", _config())
+    setext = _config()
+    setext.conversion.heading_style = "setext"
+
+    statuses = await _run(tmp_path / "in", tmp_path / "out", setext)
+
+    assert set(statuses.values()) == {"converted"}
+    assert (tmp_path / "out" / "same.md").read_text(encoding="utf-8") == "same\n===="
+
+
+@pytest.mark.unit
+def test_manifests_of_other_settings_are_ignored(tmp_path: Path) -> None:
+    (tmp_path / "page.html").write_text("<p>x</p>", encoding="utf-8")
+    (tmp_path / "page.md").write_text("x", encoding="utf-8")
+    manifest = BuildManifest.load(tmp_path, "one")
+    manifest.record("page.html", tmp_path / "page.html", tmp_path / "page.md", 0.5)
+    manifest.save()
+
+    assert BuildManifest.load(tmp_path, "one").entries["page.html"].seconds == 0.5
+    assert BuildManifest.load(tmp_path, "two").entries == {}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_files_are_hashed_off_the_event_loop(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _write_pages(tmp_path / "in")
+    threads = set()
+    record = BuildManifest.record
+
+    def spy(self: BuildManifest, *args: Any) -> None:
+        threads.add(threading.current_thread())
+        record(self, *args)
+
+    monkeypatch.setattr(BuildManifest, "record", spy)
+    await _run(tmp_path / "in", tmp_path / "out", _config())
+
+    assert threads and threading.current_thread() not in threads
@@ -0,0 +1,138 @@
+"""Parity tests for the HTML parser backends."""
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pytest
+
+from SlateQuill import parsers as parsers_module
+from SlateQuill.config import Config, ConversionConfig, SecurityConfig
+from SlateQuill.core import convert_file
+from SlateQuill.exceptions import ConfigurationError
+from SlateQuill.html2md import html_to_markdown, html_to_markdown_sync, stream_html_file, stream_html_to_markdown
+from SlateQuill.parsers import PARSERS, available_parsers, parse_html, resolve_parser
+
+FIXTURES = Path(__file__).parent.parent / "fixtures"
+GOLDEN_CORPUS = sorted((FIXTURES / "golden").glob("*.html")) + [FIXTURES / "test_input.html"]
+
+BACKENDS = [
+    pytest.param(
+        parser,
+        marks=pytest.mark.skipif(parser not in available_parsers(), reason=f"{parser} is not installed"),
+    )
+    for parser in PARSERS
+    if parser != "html.parser"
+]
+
+
+def _config(parser: str, single_parse: bool) -> Config:
+    config = Config()
+    config.conversion.parser = parser
+    config.performance.single_parse = single_parse
+    config.performance.cache_results = False
+    return config
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize("single_parse", [False, True], ids=["bleach", "single-parse"])
+@pytest.mark.parametrize("parser", BACKENDS)
+@pytest.mark.parametrize("html_file", GOLDEN_CORPUS, ids=lambda path: path.name)
+async def test_backend_matches_html_parser(
+    html_file: Path, parser: str, single_parse: bool, tmp_path: Path
+) -> None:
+    reference = await convert_file(html_file, tmp_path / "reference.md", _config("html.parser", single_parse))
+
+    markdown = await convert_file(html_file, tmp_path / "out.md", _config(parser, single_parse))
+
+    assert markdown == reference
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize("parser", ["html.parser", *BACKENDS])
+@pytest.mark.parametrize("html_file", GOLDEN_CORPUS, ids=lambda path: path.name)
+async def test_streaming_matches_whole_document(html_file: Path, parser: str) -> None:
+    html = html_file.read_text(encoding="utf-8")
+    config = ConversionConfig(parser=parser)
+    security = SecurityConfig()
+
+    reference = await html_to_markdown(html, ConversionConfig(parser="html.parser"), security_config=security)
+    chunks = [html[i:i + 97] for i in range(0, len(html), 97)]
+
+    assert "".join(stream_html_to_markdown(chunks, config, security)) == reference
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("chunk_size", [64, 1 << 16], ids=["small-chunks", "one-chunk"])
+@pytest.mark.parametrize("html_file", GOLDEN_CORPUS, ids=lambda path: path.name)
+def test_streamed_files_match_in_memory_conversion(tmp_path: Path, html_file: Path, chunk_size: int) -> None:
+    reference = html_to_markdown_sync(html_file.read_text(encoding="utf-8"))
+
+    written = stream_html_file(html_file, tmp_path / "out.md", chunk_size=chunk_size)
+
+    markdown = (tmp_path / "out.md").read_text(encoding="utf-8")
+    assert markdown == reference
+    assert written == len(markdown)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_convert_file_streams_large_files_with_the_same_output(tmp_path: Path) -> None:
+    html_file = FIXTURES / "golden" / "blocks.html"
+    config = Config()
+    config.performance.cache_results = False
+    reference = await convert_file(html_file, tmp_path / "whole.md", config)
+    config.performance.streaming_threshold = 1
+
+    # Streamed files are not returned, only written
+    assert await convert_file(html_file, tmp_path / "streamed.md", config, return_content=False) == ""
+
+    assert (tmp_path / "streamed.md").read_text(encoding="utf-8") == reference
+
+
+@pytest.mark.unit
+def test_auto_resolves_to_installed_backend() -> None:
+    assert resolve_parser("auto") in available_parsers()
+    assert resolve_parser("html.parser") == "html.parser"
+
+
+@pytest.mark.unit
+def test_html_parser_stays_the_default() -> None:
+    # lxml closes <pre> before the list, which would lose the code block
+    html = "<pre><ul><li>x</li></ul></pre>"
+
+    assert ConversionConfig().parser == "html.parser"
+    assert parse_html(html).pre.ul is not None
+
+
+@pytest.mark.unit
+@pytest.mark.skipif("lxml" not in available_parsers(), reason="lxml is not installed")
+@pytest.mark.parametrize("winner", ["lxml", "html.parser"])
+def test_auto_picks_the_fastest_backend(monkeypatch: pytest.MonkeyPatch, winner: str) -> None:
+    def benchmark(sample: Optional[str] = None, rounds: int = 5, parsers: Any = None) -> Dict[str, float]:
+        assert list(parsers) == ["lxml", "html.parser"]
+        return {parser: 2.0 if parser == winner else 1.0 for parser in parsers}
+
+    monkeypatch.setattr(parsers_module, "benchmark_parsers", benchmark)
+    parsers_module.fastest_parser.cache_clear()
+    try:
+        assert resolve_parser("auto") == winner
+    finally:
+        parsers_module.fastest_parser.cache_clear()
+
+
+@pytest.mark.unit
+@pytest.mark.skipif("html5lib" not in available_parsers(), reason="html5lib is not installed")
+def test_incremental_falls_back_from_html5lib() -> None:
+    assert resolve_parser("html5lib") == "html5lib"
+    assert resolve_parser("html5lib", incremental=True) != "html5lib"
+
+
+@pytest.mark.unit
+def test_unknown_parser_is_rejected() -> None:
+    with pytest.raises(ConfigurationError):
+        resolve_parser("tagsoup")
+
+    with pytest.raises(ValueError):
+        ConversionConfig(parser="tagsoup")
@@ -0,0 +1,190 @@
+"""Tests for converter plugins: entry-point discovery and batch conversions."""
+
+import sys
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Union
+
+import pytest
+
+from SlateQuill.config import Config
+from SlateQuill.core import convert_file
+from SlateQuill.engine import ConversionEngine
+from SlateQuill.exceptions import ConversionError, PluginError
+from SlateQuill.plugins import registry
+from SlateQuill.plugins.base import BaseConverter
+
+_CONVERTER = '''
+from SlateQuill.plugins.base import BaseConverter
+
+
+class {name}Converter(BaseConverter):
+    async def convert(self, content, options=None):
+        return "# {name}"
+
+    def can_handle(self, file_path):
+        return file_path.suffix == "{suffix}"
+
+    def validate_input(self, content):
+        return True
+
+    @property
+    def supported_formats(self):
+        return ["{suffix}"]
+'''
+
+
+def _install(site: Path, name: str, suffix: str, value: str = "") -> None:
+    """Install a plugin distribution into site."""
+    module = f"{name.lower()}_converter"
+    (site / f"{module}.py").write_text(_CONVERTER.format(name=name, suffix=suffix), encoding="utf-8")
+    dist_info = site / f"{module}-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(
+        f"Metadata-Version: 2.1\nName: {module}\nVersion: 1.0\n", encoding="utf-8"
+    )
+    (dist_info / "entry_points.txt").write_text(
+        f"[SlateQuill.plugins]\n{name.lower()} = {value or f'{module}:{name}Converter'}\n", encoding="utf-8"
+    )
+
+
+@pytest.fixture
+def site(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    site = tmp_path / "site"
+    site.mkdir()
+    monkeypatch.syspath_prepend(str(site))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(registry, "_converters", dict(registry._converters))
+    monkeypatch.setattr(registry, "_plugins", None)
+    yield site
+    for module in ("docx_converter", "rtf_converter", "broken_converter"):
+        sys.modules.pop(module, None)
+
+
+def _forget_plugins(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Start over as a new process would, with only the cached index."""
+    builtin = {ext: converter for ext, converter in registry._converters.items() if ext not in (".docx", ".rtf")}
+    monkeypatch.setattr(registry, "_converters", builtin)
+    monkeypatch.setattr(registry, "_plugins", None)
+    sys.modules.pop("docx_converter", None)
+
+
+@pytest.mark.unit
+def test_plugins_are_imported_on_first_use_only(site: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _install(site, "Docx", ".docx")
+    assert ".docx" in registry.list_supported_formats()
+
+    _forget_plugins(monkeypatch)
+
+    assert registry.list_supported_formats() == [".docx", ".htm", ".html", ".xhtml"]
+    assert registry.get_converter(Path("page.html")) is not None
+    assert "docx_converter" not in sys.modules
+    converter = registry.get_converter(Path("report.DOCX"))
+    assert converter is not None and converter.name == "DocxConverter"
+    assert "docx_converter" in sys.modules
+
+
+@pytest.mark.unit
+def test_plugin_index_is_rebuilt_when_distributions_change(site: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _install(site, "Docx", ".docx")
+    assert ".rtf" not in registry.list_supported_formats()
+
+    _install(site, "Rtf", ".rtf")
+    _forget_plugins(monkeypatch)
+
+    assert registry.discover_plugins()[".rtf"].distribution == "rtf_converter"
+
+
+@pytest.mark.unit
+def test_broken_plugins_are_reported(site: Path) -> None:
+    _install(site, "Broken", ".broken", value="broken_converter:Missing")
+
+    assert ".broken" not in registry.list_supported_formats()
+    assert "Missing" in registry.plugin_errors()["broken"]
+    with pytest.raises(PluginError):
+        registry._load_plugin(registry.PluginSpec("broken", "broken_converter:Missing", "broken_converter"))
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_plugins_convert_files(site: Path, tmp_path: Path) -> None:
+    _install(site, "Docx", ".docx")
+    (tmp_path / "report.docx").write_bytes(b"PK")
+
+    assert await convert_file(tmp_path / "report.docx", tmp_path / "report.md") == "# Docx"
+
+
+class _BatchConverter(BaseConverter):
+    """Converter of .txt documents counting its convert_many() calls."""
+
+    accepts_text = True
+    batch_size = 3
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches: List[int] = []
+
+    async def convert(self, content: Any, options: Any = None) -> str:
+        raise AssertionError("batch conversions call convert_many()")
+
+    def convert_many(self, contents: Iterable[Any], options: Any = None) -> List[Union[str, Exception]]:
+        documents = list(contents)
+        self.batches.append(len(documents))
+        return [ConversionError("empty") if not text else text.upper() for text in documents]
+
+    def can_handle(self, file_path: Path) -> bool:
+        return file_path.suffix == ".txt"
+
+    def validate_input(self, content: bytes) -> bool:
+        return True
+
+    @property
+    def supported_formats(self) -> List[str]:
+        return [".txt"]
+
+
+@pytest.mark.unit
+def test_default_sync_and_batch_conversions_use_convert() -> None:
+    class Upper(_BatchConverter):
+        async def convert(self, content: Any, options: Any = None) -> str:
+            if not content:
+                raise ConversionError("empty")
+            return content.upper()
+
+    converter = Upper()
+
+    assert converter.convert_sync("a") == "A"
+    results = BaseConverter.convert_many(converter, ["a", "", "b"])
+    assert results[0::2] == ["A", "B"]
+    assert isinstance(results[1], ConversionError)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [1, 2], ids=["inline", "pool"])
+async def test_batch_converters_convert_many_documents_per_call(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, workers: int
+) -> None:
+    converter = _BatchConverter()
+    monkeypatch.setattr(registry, "_converters", dict(registry._converters))
+    registry.register_converter(converter)
+    (tmp_path / "in").mkdir()
+    jobs = []
+    for index in range(7):
+        path = tmp_path / "in" / f"note{index}.txt"
+        path.write_text(f"note {index}" if index != 4 else "", encoding="utf-8")
+        jobs.append((path, tmp_path / "out" / f"note{index}.md"))
+    (tmp_path / "in" / "page.html").write_text("<h1>Page</h1>", encoding="utf-8")
+    jobs.append((tmp_path / "in" / "page.html", tmp_path / "out" / "page.md"))
+    config = Config()
+    config.performance.cache_results = False
+    config.performance.deduplicate = False
+
+    report = await ConversionEngine(config, workers).run(jobs)
+
+    assert sorted(path.name for path, _ in report.converted) == sorted(
+        [f"note{index}.txt" for index in range(7) if index != 4] + ["page.html"]
+    )
+    assert [path.name for path, _ in report.failed] == ["note4.txt"]
+    assert (tmp_path / "out" / "note6.md").read_text(encoding="utf-8") == "NOTE 6"
+    if workers == 1:
+        assert converter.batches == [3, 3, 1]
@@ -0,0 +1,90 @@
+"""Tests for the Markdown-aware whitespace cleanup and line wrapping."""
+
+import random
+
+import pytest
+
+from SlateQuill.postprocess import MarkdownPostProcessor, post_process
+
+DOCUMENT = """
+
+# A heading that is much longer than the line length but must stay on one line
+
+Paragraph text that is long enough to be wrapped, with 5 - 3 = 2 in it.
+
+
+
+```
+code = "a line in a fenced code block that is far too long, kept as it is"
+
+
+```
+| cell | a table row that is far too long for the line length but is kept |
+| --- | --- |
+- a list item that is long enough to be wrapped with a hanging indent
+\t- a nested item that is long enough to be wrapped with a hanging indent
+> a quoted paragraph that is long enough to be wrapped, quote and all
+
+    indented code that is far too long for the line length but is kept as it is
+"""
+
+
+@pytest.mark.unit
+def test_cleans_whitespace_and_wraps_markdown_aware() -> None:
+    assert post_process(DOCUMENT, line_length=40) == (
+        "# A heading that is much longer than the line length but must stay on one line\n"
+        "\n"
+        "Paragraph text that is long enough to be\n"
+        "wrapped, with 5 - 3 = 2 in it.\n"
+        "\n"
+        "```\n"
+        'code = "a line in a fenced code block that is far too long, kept as it is"\n'
+        "\n"
+        "\n"
+        "```\n"
+        "| cell | a table row that is far too long for the line length but is kept |\n"
+        "| --- | --- |\n"
+        "- a list item that is long enough to be\n"
+        "  wrapped with a hanging indent\n"
+        "\t- a nested item that is long enough to\n"
+        "\t  be wrapped with a hanging indent\n"
+        "> a quoted paragraph that is long enough\n"
+        "> to be wrapped, quote and all\n"
+        "\n"
+        "    indented code that is far too long for the line length but is kept as it is"
+    )
+
+
+@pytest.mark.unit
+def test_never_starts_a_line_with_block_syntax() -> None:
+    markdown = "intro text " + "x" * 20 + " - not a list item, # not a heading > not a quote"
+
+    for line in post_process(markdown, line_length=20).split("\n")[1:]:
+        assert not line.startswith(("-", "#", ">"))
+
+
+@pytest.mark.unit
+def test_keeps_whitespace_without_cleanup() -> None:
+    markdown = "\n\ntext  \n\n\n\nmore\t\n"
+
+    assert post_process(markdown, clean_whitespace=False) == markdown
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("clean_whitespace", [True, False])
+@pytest.mark.parametrize("line_length", [0, 40])
+def test_output_does_not_depend_on_chunking(clean_whitespace: bool, line_length: int) -> None:
+    expected = post_process(DOCUMENT, clean_whitespace, line_length)
+    rng = random.Random(0)
+
+    for _ in range(20):
+        post = MarkdownPostProcessor(clean_whitespace, line_length)
+        pieces = []
+        start = 0
+        while start < len(DOCUMENT):
+            stop = start + rng.randint(0, 12)
+            pieces.append(post.feed(DOCUMENT[start:stop]))
+            start = stop
+        pieces.append(post.finish())
+
+        assert "".join(pieces) == expected
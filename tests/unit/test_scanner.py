@@ -0,0 +1,96 @@
+"""Tests for the parallel directory scanner."""
+
+import os
+from pathlib import Path
+from typing import List, Set
+
+import pytest
+
+from SlateQuill.scanner import compile_globs, scan_directory
+
+
+def _make_tree(root: Path) -> None:
+    for rel_path in [
+        "index.html",
+        "README.md",
+        "docs/guide.HTM",
+        "docs/api/ref.xhtml",
+        "docs/api/notes.txt",
+        "assets/img/logo.png",
+        "assets/embed.html",
+        "drafts/wip.html",
+        ".hidden",
+    ]:
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("<p>x</p>", encoding="utf-8")
+
+
+def _scan(root: Path, **kwargs: object) -> Set[str]:
+    return {
+        Path(entry.path).relative_to(root).as_posix()
+        for entry in scan_directory(root, [".html", ".htm", ".xhtml"], **kwargs)  # type: ignore[arg-type]
+    }
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("workers", [1, 4], ids=["sequential", "parallel"])
+def test_scan_directory_matches_extensions(tmp_path: Path, workers: int) -> None:
+    _make_tree(tmp_path)
+
+    assert _scan(tmp_path, workers=workers) == {
+        "index.html", "docs/guide.HTM", "docs/api/ref.xhtml", "assets/embed.html", "drafts/wip.html"
+    }
+    assert _scan(tmp_path, recursive=False, workers=workers) == {"index.html"}
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("workers", [1, 4], ids=["sequential", "parallel"])
+def test_scan_directory_applies_include_and_exclude(tmp_path: Path, workers: int) -> None:
+    _make_tree(tmp_path)
+
+    assert _scan(tmp_path, include=["docs/*"], exclude=["*.xhtml"], workers=workers) == {"docs/guide.HTM"}
+    assert _scan(tmp_path, exclude=["assets", "drafts/"], workers=workers) == {
+        "index.html", "docs/guide.HTM", "docs/api/ref.xhtml"
+    }
+
+
+@pytest.mark.unit
+def test_scan_directory_does_not_enter_excluded_directories(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _make_tree(tmp_path)
+    listed: List[str] = []
+    scandir = os.scandir
+
+    def recording_scandir(path: str) -> "os._ScandirIterator[str]":
+        listed.append(Path(path).relative_to(tmp_path).as_posix())
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", recording_scandir)
+    _scan(tmp_path, exclude=["assets"], workers=1)
+
+    assert sorted(listed) == [".", "docs", "docs/api", "drafts"]
+
+
+@pytest.mark.unit
+def test_scan_directory_stops_walking_when_closed(tmp_path: Path) -> None:
+    for index in range(50):
+        directory = tmp_path / f"d{index}"
+        directory.mkdir()
+        (directory / "page.html").write_text("x", encoding="utf-8")
+
+    entries = scan_directory(tmp_path, [".html"], workers=4)
+    first = next(entries)
+    entries.close()
+
+    assert first.is_file()
+
+
+@pytest.mark.unit
+def test_compile_globs_matches_names_and_relative_paths() -> None:
+    assert compile_globs([]) is None
+    matches = compile_globs(["*.min.html", "docs/api/*"])
+    assert matches is not None
+
+    assert matches("site/app.min.html", "app.min.html")
+    assert matches("docs/api/v1/index.html", "index.html")
+    assert not matches("site/api/index.html", "index.html")
@@ -0,0 +1,109 @@
+"""Tests for batch scheduling."""
+
+from pathlib import Path
+from typing import Iterator, List, Union
+
+import pytest
+
+from SlateQuill.config import Config
+from SlateQuill.core import iter_convert_directory
+from SlateQuill.engine import BatchReport, ConversionResult
+from SlateQuill.fileio import Job, SizedJob
+from SlateQuill.manifest import BuildManifest
+from SlateQuill.plan import compile_plan
+from SlateQuill.scheduler import LargestFirstScheduler
+
+
+def _write_jobs(directory: Path, sizes: List[int]) -> List[Job]:
+    directory.mkdir(parents=True, exist_ok=True)
+    jobs = []
+    for index, size in enumerate(sizes):
+        path = directory / f"page{index}.html"
+        path.write_text("x" * size, encoding="utf-8")
+        jobs.append((path, path.with_suffix(".md")))
+    return jobs
+
+
+def _names(items: List[Union[Job, ConversionResult]]) -> List[str]:
+    return [item[0].name if isinstance(item, tuple) else item.input_path.name for item in items]
+
+
+@pytest.mark.unit
+def test_largest_first_orders_whole_batch(tmp_path: Path) -> None:
+    jobs = _write_jobs(tmp_path, [10, 300, 20, 300, 5000])
+    scheduler = LargestFirstScheduler(window=0)
+
+    ordered = list(scheduler.order(iter(jobs)))
+
+    # Jobs of equal cost keep their order
+    assert _names(ordered) == ["page4.html", "page1.html", "page3.html", "page2.html", "page0.html"]
+    assert scheduler.overhead > 0
+
+
+@pytest.mark.unit
+def test_largest_first_pulls_only_its_window(tmp_path: Path) -> None:
+    jobs = _write_jobs(tmp_path, [10, 20, 30, 40, 50])
+    pulled: List[Job] = []
+
+    def source() -> Iterator[Job]:
+        for job in jobs:
+            pulled.append(job)
+            yield job
+
+    ordered = LargestFirstScheduler(window=2).order(source())
+
+    assert _names([next(ordered)]) == ["page1.html"]
+    assert len(pulled) == 2
+    assert _names(list(ordered)) == ["page2.html", "page3.html", "page4.html", "page0.html"]
+
+
+@pytest.mark.unit
+def test_largest_first_passes_results_through(tmp_path: Path) -> None:
+    jobs = _write_jobs(tmp_path, [10, 20])
+    skipped = ConversionResult(tmp_path / "old.html", tmp_path / "old.md", "skipped")
+
+    ordered = list(LargestFirstScheduler().order(iter([jobs[0], skipped, jobs[1]])))
+
+    assert _names(ordered) == ["old.html", "page1.html", "page0.html"]
+
+
+@pytest.mark.unit
+def test_largest_first_uses_the_cost_estimate(tmp_path: Path) -> None:
+    jobs = _write_jobs(tmp_path, [10, 20, 30])
+    slow = {"page0.html": 100.0}
+
+    ordered = LargestFirstScheduler(estimate=lambda path, size: slow.get(path.name, size)).order(iter(jobs))
+
+    assert _names(list(ordered)) == ["page0.html", "page2.html", "page1.html"]
+
+
+@pytest.mark.unit
+def test_largest_first_uses_scanned_sizes(tmp_path: Path) -> None:
+    # The files don't exist: their sizes come from the scan
+    jobs = [SizedJob(tmp_path / f"page{index}.html", tmp_path / f"page{index}.md", size)
+            for index, size in enumerate([10, 30, 20])]
+
+    ordered = list(LargestFirstScheduler().order(iter(jobs)))
+
+    assert _names(ordered) == ["page1.html", "page2.html", "page0.html"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_directory_runs_record_times_for_the_next_schedule(tmp_path: Path) -> None:
+    _write_jobs(tmp_path / "in", [100, 2000, 300])
+    config = Config()
+    config.performance.cache_results = False
+    report = BatchReport()
+
+    async for result in iter_convert_directory(
+        tmp_path / "in", tmp_path / "out", config, max_workers=2, incremental=True
+    ):
+        report.add(result)
+
+    assert report.scheduling_overhead > 0
+    manifest = BuildManifest.load(tmp_path / "out", compile_plan(config).fingerprint)
+    assert all(entry.seconds > 0 for entry in manifest.entries.values())
+    estimate = manifest.cost_estimator(tmp_path / "in")
+    assert estimate is not None
+    assert estimate(tmp_path / "in" / "new.html", 1000) > 0
@@ -0,0 +1,69 @@
+"""Tests for the sanitizer's scan fast path."""
+
+from typing import List
+
+import pytest
+
+from SlateQuill import security
+from SlateQuill.config import SecurityConfig
+from SlateQuill.security import sanitize_content, scan_html
+
+UNSAFE = {
+    "event attribute": '<p onclick="steal()">Hi</p>',
+    "javascript url": '<p><a href="javascript:steal()">Hi</a></p>',
+    "mixed-case javascript url": '<p><a href=" JaVaScRiPt:steal()">Hi</a></p>',
+    "script tag": "<p>Hi</p><script>steal()</script>",
+    "iframe tag": '<p>Hi</p><iframe src="https://example.com"></iframe>',
+    "unknown tag": "<p>Hi <blink>there</blink></p>",
+    "comment": "<p>Hi</p><!-- <script>steal()</script> -->",
+    "cdata": "<p>Hi</p><![CDATA[<script>steal()</script>]]>",
+    "unclosed tag": "<p>Hi <em",
+}
+
+
+@pytest.fixture
+def sanitized(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    """Documents passed on to bleach."""
+    calls: List[str] = []
+    sanitize_html = security.sanitize_html
+
+    def spy(content: str, config: SecurityConfig, parser: str = "html.parser") -> str:
+        calls.append(content)
+        return sanitize_html(content, config, parser)
+
+    monkeypatch.setattr(security, "sanitize_html", spy)
+    return calls
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("html", UNSAFE.values(), ids=UNSAFE.keys())
+def test_unsafe_markup_falls_through_to_bleach(html: str, sanitized: List[str]) -> None:
+    config = SecurityConfig()
+
+    assert not scan_html(html, config).clean
+    content = sanitize_content(html, config)
+
+    assert sanitized == [html]
+    assert content == security.sanitize_html(html, config)
+    for marker in ("onclick", "javascript:", "<script", "<iframe", "<blink", "<!--", "<![cdata"):
+        assert marker not in content.lower()
+
+
+@pytest.mark.unit
+def test_clean_markup_skips_bleach(sanitized: List[str]) -> None:
+    html = '<h1>Title</h1>\r\n<p>Some <em>text</em> and <a href="https://example.com">a link</a>.</p>'
+
+    content = sanitize_content(html, SecurityConfig())
+
+    assert sanitized == []
+    assert content == html.replace("\r\n", "\n")
+
+
+@pytest.mark.unit
+def test_external_links_fall_through_when_disallowed(sanitized: List[str]) -> None:
+    html = '<p><a href="https://example.com">a link</a></p>'
+
+    content = sanitize_content(html, SecurityConfig(allow_external_links=False))
+
+    assert sanitized == [html]
+    assert "example.com" not in content
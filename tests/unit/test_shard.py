@@ -0,0 +1,93 @@
+"""Tests for sharded directory conversions."""
+
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from SlateQuill.config import Config
+from SlateQuill.core import convert_directory
+from SlateQuill.exceptions import ConfigurationError
+from SlateQuill.shard import Shard, find_shard_reports, merge_shard_reports, path_hash
+
+
+def _write_inputs(directory: Path, count: int) -> None:
+    for index in range(count):
+        path = directory / f"section{index % 4}" / f"page{index}.html"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"<h1>Page {index}</h1>", encoding="utf-8")
+
+
+async def _run_shards(tmp_path: Path, shards: List[Shard]) -> None:
+    config = Config()
+    config.performance.cache_results = False
+    for shard in shards:
+        await convert_directory(tmp_path / "in", tmp_path / "out", config, max_workers=1, shard=shard)
+
+
+@pytest.mark.unit
+def test_shards_partition_paths_stably() -> None:
+    paths = [f"docs/page{index}.html" for index in range(1000)]
+    shards = [Shard(index, 4) for index in range(1, 5)]
+
+    owners = [[shard for shard in shards if shard.owns(path)] for path in paths]
+
+    assert all(len(owner) == 1 for owner in owners)
+    # Every machine must agree on the partition: the hash doesn't depend on the process
+    assert path_hash("docs/page0.html") == 16055678115017446995
+    assert owners[0] == [Shard(4, 4)]
+    assert min(sum(1 for owner in owners if owner[0] is shard) for shard in shards) > 200
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("spec", ["0/4", "5/4", "1", "a/b", "1/0"])
+def test_shard_parse_rejects_invalid_shards(spec: str) -> None:
+    with pytest.raises(ConfigurationError):
+        Shard.parse(spec)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_merge_combines_complete_shards(tmp_path: Path) -> None:
+    _write_inputs(tmp_path / "in", 40)
+    await _run_shards(tmp_path, [Shard(index, 3) for index in range(1, 4)])
+
+    merged = merge_shard_reports(find_shard_reports([tmp_path / "out"]))
+
+    assert merged.complete
+    assert merged.counts["converted"] == 40
+    assert len(list((tmp_path / "out").rglob("*.md"))) == 40
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_merge_detects_gaps_and_overlaps(tmp_path: Path) -> None:
+    _write_inputs(tmp_path / "in", 40)
+    await _run_shards(tmp_path, [Shard(1, 3), Shard(2, 3)])
+    (tmp_path / "other").mkdir()
+    await convert_directory(
+        tmp_path / "in", tmp_path / "other", max_workers=1, shard=Shard(1, 2)
+    )
+
+    merged = merge_shard_reports(find_shard_reports([tmp_path / "out"]))
+    assert not merged.complete
+    assert merged.missing_shards == [3]
+    assert merged.gaps == 40 - merged.counts["converted"] > 0
+
+    merged = merge_shard_reports(find_shard_reports([tmp_path / "out", tmp_path / "other"]))
+    assert merged.problems
+    assert merged.overlaps
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_merge_detects_shards_of_different_inputs(tmp_path: Path) -> None:
+    _write_inputs(tmp_path / "in", 10)
+    await _run_shards(tmp_path, [Shard(1, 2)])
+    (tmp_path / "in" / "late.html").write_text("<p>late</p>", encoding="utf-8")
+    await _run_shards(tmp_path, [Shard(2, 2)])
+
+    merged = merge_shard_reports(find_shard_reports([tmp_path / "out"]))
+
+    assert merged.problems == ["Shard 2/2 found other input files than shard 1/2"]
+    assert not merged.complete
@@ -0,0 +1,117 @@
+"""Tests for the NDJSON worker protocol."""
+
+import io
+import json
+from pathlib import Path
+import sys
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from SlateQuill import simple_cli
+from SlateQuill.config import Config
+from SlateQuill.worker import run_worker
+
+
+def _run(requests: List[Any], config: Optional[Config] = None) -> List[Dict[str, Any]]:
+    lines = [request if isinstance(request, str) else json.dumps(request) for request in requests]
+    stdout = io.StringIO()
+    run_worker(config, io.StringIO("\n".join(lines) + "\n"), stdout)
+    return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+
+@pytest.mark.unit
+def test_results_are_written_in_request_order(tmp_path: Path) -> None:
+    (tmp_path / "page.html").write_text("<h1>Page</h1>", encoding="utf-8")
+
+    results = _run([
+        {"id": 1, "html": "<p>Hello <em>world</em></p>"},
+        "",
+        {"id": "two", "input": str(tmp_path / "page.html")},
+        {"id": 3, "input": str(tmp_path / "page.html"), "output": str(tmp_path / "page.md")},
+    ])
+
+    assert results == [
+        {"id": 1, "ok": True, "markdown": "Hello *world*"},
+        {"id": "two", "ok": True, "markdown": "# Page"},
+        {"id": 3, "ok": True, "output": str(tmp_path / "page.md")},
+    ]
+    assert (tmp_path / "page.md").read_text(encoding="utf-8") == "# Page"
+
+
+@pytest.mark.unit
+def test_config_overrides_apply_to_their_request_only() -> None:
+    results = _run([
+        {"id": 1, "html": "<h1>Title</h1>", "config": {"conversion": {"heading_style": "setext"}}},
+        {"id": 2, "html": "<h1>Title</h1>"},
+    ])
+
+    assert [result["markdown"] for result in results] == ["Title\n=====", "# Title"]
+
+
+@pytest.mark.unit
+def test_bad_requests_get_error_lines() -> None:
+    results = _run([
+        "{not json",
+        "[1, 2]",
+        {"id": 1},
+        {"id": 2, "html": 42},
+        {"id": 3, "html": "<p>x</p>", "config": {"conversion": {"heading_style": "fancy"}}},
+        {"id": 4, "input": "missing.html"},
+        {"id": 5, "html": "<p>still served</p>"},
+    ])
+
+    errors = [(result["id"], result["error"]["type"]) for result in results if not result["ok"]]
+    assert errors == [
+        (None, "InvalidInputError"),
+        (None, "InvalidInputError"),
+        (1, "InvalidInputError"),
+        (2, "InvalidInputError"),
+        (3, "ConfigurationError"),
+        (4, "SecurityError"),
+    ]
+    assert results[-1] == {"id": 5, "ok": True, "markdown": "still served"}
+
+
+@pytest.mark.unit
+def test_worker_reports_invalid_config_files_as_ndjson(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    config_path = tmp_path / "slatequill.toml"
+    config_path.write_text('[conversion]\nheading_style = "fancy"\n', encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["SlateQuill", "--worker", str(config_path)])
+
+    with pytest.raises(SystemExit) as exit_info:
+        simple_cli.main()
+
+    assert exit_info.value.code == 1
+    [line] = capsys.readouterr().out.splitlines()
+    result = json.loads(line)
+    assert result["ok"] is False
+    assert result["error"]["type"] == "ConfigurationError"
+    assert "heading_style" in result["error"]["message"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_workers_with_roots_confine_paths_and_overrides(tmp_path: Path) -> None:
+    from SlateQuill.worker import ConversionWorker
+
+    (tmp_path / "root").mkdir()
+    (tmp_path / "root" / "page.html").write_text("<h1>Page</h1>", encoding="utf-8")
+    (tmp_path / "secret.html").write_text("<p>secret</p>", encoding="utf-8")
+    worker = ConversionWorker(roots=[tmp_path / "root"])
+
+    results = [await worker.handle(request) for request in [
+        {"input": str(tmp_path / "root" / "page.html"), "output": str(tmp_path / "root" / "page.md")},
+        {"input": str(tmp_path / "secret.html")},
+        {"input": str(tmp_path / "root" / ".." / "secret.html")},
+        {"input": str(tmp_path / "root" / "page.html"), "output": str(tmp_path / "page.md")},
+        {"html": "<p>x</p>", "config": {"security": {"max_file_size": 1 << 40}}},
+        {"html": "<p>x</p>", "config": {"conversion": {"heading_style": "setext"}}},
+    ]]
+
+    assert results[0]["ok"] and (tmp_path / "root" / "page.md").exists()
+    assert [result["error"]["type"] for result in results[1:5]] == ["SecurityError"] * 4
+    assert not (tmp_path / "page.md").exists()
+    assert results[5]["ok"]